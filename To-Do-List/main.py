@@ -1,20 +1,203 @@
+import sys
+import time
 from pathlib import Path
-from tkinter import Tk, Canvas, Toplevel, Entry, Button, PhotoImage
-import json
+from tkinter import Tk, Canvas, Toplevel, Entry, Button, PhotoImage, StringVar, messagebox
+
+from todo_store import TodoStore, parse_due, format_due
+
+# the asset loader is shared with the other Tk apps at the repo's top level
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tk_assets import AssetLoader
 
-STATE_PATH = Path(__file__).parent / "todo_state.json"
 ASSETS_PATH = Path(__file__).parent / "assets"
+IMAGE_FILES = {
+    "bg1":      "entry_1.png",
+    "bg2":      "entry_2.png",
+    "box":      "minibox.png",
+    "tick":     "tick.png",
+    "bin":      "dustbin.png",
+    "plus":     "plus.png",
+    "input_bg": "new_input.png",
+    "enter":    "Enter.png",
+    "cancel":   "Cancel.png",
+}
+# rows a section shows at once, and the pixel pitch between rows
 MAX_ROWS = 4
+ROW_HEIGHT = 26
+# scrolling redraws at most once per frame
+FRAME_MS = 16
+# share of the remaining distance a smooth scroll covers each frame
+SCROLL_EASE = 0.35
+# pixels one wheel notch scrolls
+WHEEL_PX = ROW_HEIGHT
+THUMB_MIN = 12
+# longest single reminder wait, so a changed clock or a sleeping machine is noticed within a minute
+REMINDER_MAX_MS = 60_000
+# tasks a reminder names before "and N more"
+REMINDER_LINES = 5
+OVERDUE_FILL = "#C24141"
+
+
+class SectionView:
+    """One section's list: a canvas over the section's background that
+    clips the rows and scrolls them by the pixel.
+
+    A fixed ring of row slots is re-pointed at whichever tasks are in view,
+    so a scroll frame costs a few moves and at most a few text changes,
+    however long the list is.
+    """
+    WIDTH, HEIGHT = 298, 119
+
+    def __init__(self, app, section, background, x, y, text_x, text_y, box_y):
+        self.app = app
+        self.section = section
+        self.text_y = text_y
+        # offset of the list in pixels, and where a smooth scroll is heading
+        self.scroll = 0.0
+        self.target = 0.0
+        self._drawn = None
+        self._drag_from = None
+
+        self.canvas = Canvas(app.window, bg="#778DA9",
+                             width=self.WIDTH, height=self.HEIGHT,
+                             bd=0, highlightthickness=0, relief="ridge")
+        self.canvas.place(x=x, y=y)
+        self.canvas.create_image(0, 0, anchor="nw", image=app.images[background])
+
+        # a page of rows plus the two partly scrolled out at the top and bottom
+        self.slots = [self._build_slot(idx, text_x, text_y, box_y)
+                      for idx in range(self.HEIGHT // ROW_HEIGHT + 2)]
+
+        self.thumb = self.canvas.create_rectangle(0, 0, 0, 0, fill="#778DA9", width=0,
+                                                  state="hidden", tags=("thumb",))
+        self.canvas.tag_bind("thumb", "<Button-1>", self._start_drag)
+        self.canvas.tag_bind("thumb", "<B1-Motion>", self._drag)
+        # the wheel and the paging keys act on the section under the pointer or last clicked
+        self.canvas.bind("<Enter>", lambda e: app._set_active(section))
+        self.canvas.bind("<Button-1>", lambda e: app._set_active(section))
+
+    def _build_slot(self, idx, text_x, text_y, box_y):
+        CX, DX = 19.5, 273
+        row = f"row_{idx}"
+        slot = {"row": row, "item": None, "y": 0, "fill": "#000000"}
+        images = self.app.images
+
+        self.canvas.create_image(CX, box_y, image=images["box"],
+                                 state="hidden", tags=(row, f"{row}_box"))
+        if self.section == "completed":
+            self.canvas.create_image(CX, box_y, image=images["tick"],
+                                     state="hidden", tags=(row, f"{row}_box"))
+        slot["text"] = self.canvas.create_text(text_x, text_y,
+                                               anchor="nw",
+                                               text="",
+                                               fill="#000000",
+                                               font=("Inter", -20),
+                                               state="hidden",
+                                               tags=(row, f"{row}_text"))
+        self.canvas.create_image(DX, box_y, image=images["bin"],
+                                 state="hidden", tags=(row, f"{row}_del"))
+
+        # bound once; the handlers act on whichever item the slot shows
+        self.canvas.tag_bind(f"{row}_box", "<Button-1>",
+                             lambda e: slot["item"] is not None and self.app.toggle_item(slot["item"]))
+        self.canvas.tag_bind(f"{row}_del", "<Button-1>",
+                             lambda e: slot["item"] is not None and self.app.delete_item(slot["item"]))
+        for event in ("<Double-Button-1>", "<Button-3>"):
+            self.canvas.tag_bind(f"{row}_text", event,
+                                 lambda e: slot["item"] is not None and self.app._open_popup(slot["item"]))
+        return slot
+
+    def max_scroll(self):
+        return max(0, (len(self.app.listed(self.section)) - MAX_ROWS) * ROW_HEIGHT)
+
+    def scroll_to(self, offset, smooth=True):
+        self.target = min(max(offset, 0), self.max_scroll())
+        if not smooth:
+            self.scroll = self.target
+        self.app._request_frame()
+
+    def scroll_by(self, pixels):
+        self.scroll_to(self.target + pixels)
+
+    def clamp(self):
+        limit = self.max_scroll()
+        self.target = min(self.target, limit)
+        self.scroll = min(self.scroll, limit)
+
+    def step(self):
+        """Eases one frame towards the target; returns whether the rows moved."""
+        remaining = self.target - self.scroll
+        if remaining:
+            self.scroll = self.target if abs(remaining) < 1 else self.scroll + remaining * SCROLL_EASE
+        return round(self.scroll) != self._drawn
+
+    def render(self):
+        top = round(self.scroll)
+        self._drawn = top
+        # the first row whose text (about a row high) still reaches into view
+        first = max(0, (top - self.text_y - ROW_HEIGHT) // ROW_HEIGHT + 1)
+        count = len(self.slots)
+        shown = self.app.listed(self.section)[first:first + count]
+        # row n always uses slot n % count, so scrolling by a row re-points one slot
+        for idx, row in enumerate(range(first, first + count)):
+            item_id = shown[idx] if idx < len(shown) else None
+            self._show_slot(self.slots[row % count], item_id, row * ROW_HEIGHT - top)
+        self._place_thumb(top)
+
+    def _show_slot(self, slot, item_id, y):
+        if slot["item"] != item_id:
+            if item_id is None:
+                self.canvas.itemconfigure(slot["row"], state="hidden")
+            else:
+                self.canvas.itemconfigure(slot["text"], text=self.app.store.items[item_id]["text"])
+                if slot["item"] is None:
+                    self.canvas.itemconfigure(slot["row"], state="normal")
+            slot["item"] = item_id
+        fill = OVERDUE_FILL if item_id in self.app.overdue else "#000000"
+        if item_id is not None and slot["fill"] != fill:
+            self.canvas.itemconfigure(slot["text"], fill=fill)
+            slot["fill"] = fill
+        if item_id is not None and slot["y"] != y:
+            self.canvas.move(slot["row"], 0, y - slot["y"])
+            slot["y"] = y
+
+    def _thumb_length(self, limit):
+        return max(THUMB_MIN, self.HEIGHT * self.HEIGHT / (limit + self.HEIGHT))
+
+    def _place_thumb(self, top):
+        limit = self.max_scroll()
+        if not limit:
+            self.canvas.itemconfigure(self.thumb, state="hidden")
+            return
+        length = self._thumb_length(limit)
+        y = top / limit * (self.HEIGHT - length)
+        self.canvas.coords(self.thumb, self.WIDTH - 8, y, self.WIDTH - 4, y + length)
+        self.canvas.itemconfigure(self.thumb, state="normal")
+
+    def _start_drag(self, e):
+        self._drag_from = (e.y, self.scroll)
+
+    def _drag(self, e):
+        if self._drag_from is None:
+            return
+        y0, scroll0 = self._drag_from
+        limit = self.max_scroll()
+        track = self.HEIGHT - self._thumb_length(limit)
+        self.scroll_to(scroll0 + (e.y - y0) * limit / max(1, track), smooth=False)
+
 
 class TodoApp:
-    def __init__(self):
-        self.items = []
-        self._id_counter = 0
-        self.today_offset = 0
-        self.comp_offset = 0
+    def __init__(self, store=None):
+        # the tasks and their persistence; the app only draws them
+        self.store = store if store is not None else TodoStore()
+        self._frame = None
+        # tasks are listed only if they have words starting with each word typed here
+        self.filter_text = ""
         self.popup_open = False
         self.active_section = None 
-        self._load_state()
+        # open tasks whose due time has passed; drawn in red until done or rescheduled
+        self.overdue = set()
+        self._reminder = None
 
         # — UI setup —
         self.window = Tk()
@@ -22,6 +205,7 @@ class TodoApp:
         self.window.geometry("350x421")
         self.window.configure(bg="#778DA9")
         self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # optional window icon
         logo_path = ASSETS_PATH / "logo.png"
@@ -29,78 +213,104 @@ class TodoApp:
             icon_img = PhotoImage(master=self.window, file=logo_path)
             self.window.iconphoto(True, icon_img)
 
-        # load all other images
-        def R(fn): return ASSETS_PATH / fn
-        self.images = {
-            "bg1":      PhotoImage(master=self.window, file=R("entry_1.png")),
-            "bg2":      PhotoImage(master=self.window, file=R("entry_2.png")),
-            "box":      PhotoImage(master=self.window, file=R("minibox.png")),
-            "tick":     PhotoImage(master=self.window, file=R("tick.png")),
-            "bin":      PhotoImage(master=self.window, file=R("dustbin.png")),
-            "plus":     PhotoImage(master=self.window, file=R("plus.png")),
-            "input_bg": PhotoImage(master=self.window, file=R("new_input.png")),
-            "enter":    PhotoImage(master=self.window, file=R("Enter.png")),
-            "cancel":   PhotoImage(master=self.window, file=R("Cancel.png")),
-        }
+        # decoded on first use, from the folder's atlas when it has one
+        self.assets = AssetLoader.shared(ASSETS_PATH, self.window)
+        self.images = self.assets.lazy(IMAGE_FILES)
 
         self._build_main_canvas()
         self.redraw_items()
         self.window.bind_all("<MouseWheel>", self._on_mousewheel)
-
-    def _load_state(self):
-        try:
-            data = json.loads(STATE_PATH.read_text())
-            self.items = data["items"]
-            self._id_counter = data["next_id"]
-        except (FileNotFoundError, json.JSONDecodeError, KeyError):
-            self.items = []
-            self._id_counter = 0
-
-    def _save_state(self):
-        payload = {
-            "items": self.items,
-            "next_id": self._id_counter
-        }
-        STATE_PATH.write_text(json.dumps(payload, indent=2))
+        # X11 reports the wheel as buttons 4 and 5
+        self.window.bind_all("<Button-4>", lambda e: self._scroll(1))
+        self.window.bind_all("<Button-5>", lambda e: self._scroll(-1))
+        for key, rows in (("<Up>", -1), ("<Down>", 1),
+                          ("<Prior>", -MAX_ROWS), ("<Next>", MAX_ROWS),
+                          ("<Home>", float("-inf")), ("<End>", float("inf"))):
+            self.window.bind(key, lambda e, rows=rows: self._on_page_key(e, rows))
+        for key, step in (("<Control-z>", self.undo), ("<Control-y>", self.redo), ("<Control-Z>", self.redo)):
+            self.window.bind(key, lambda e, step=step: step())
+        # tasks already overdue at startup are only highlighted, as are those
+        # the saved list marks as already reminded of
+        self.overdue.update(self.store.overdue())
+        self._fire_reminders(quiet=True)
 
     def _on_close(self):
-        self._save_state()
+        if self._reminder is not None:
+            self.window.after_cancel(self._reminder)
+        self.store.close()
         self.window.destroy()
 
-    def _new_id(self):
-        i = self._id_counter
-        self._id_counter += 1
-        return i
-
-    def add_item(self, text, state="today"):
-        self.items.append({"id": self._new_id(), "text": text, "state": state})
-        total = sum(1 for i in self.items if i["state"] == "today")
-        if total > MAX_ROWS:
-            self.today_offset = total - MAX_ROWS
-        self._clamp_offsets()
+    def add_item(self, text, state="today", due=None):
+        self.store.add(text, state, due)
+        # show the new task at the bottom of today's list
+        today = self.views["today"]
+        today.scroll_to(today.max_scroll(), smooth=False)
         self.redraw_items()
-        self._save_state()       
+        self._arm_reminders()
 
     def delete_item(self, item_id):
-        self.items = [i for i in self.items if i["id"] != item_id]
-        self._clamp_offsets()
+        self.store.delete(item_id)
+        self.overdue.discard(item_id)
         self.redraw_items()
-        self._save_state()           
+        self._arm_reminders()
 
     def toggle_item(self, item_id):
-        for i in self.items:
-            if i["id"] == item_id:
-                i["state"] = "completed" if i["state"] == "today" else "today"
-                break
-        self._clamp_offsets()
+        self.store.toggle(item_id)
+        # a task reopened after its due time is reminded of again
+        self.overdue.discard(item_id)
+        self.redraw_items()
+        self._arm_reminders()
+
+    def set_due(self, item_id, due):
+        self.store.set_due(item_id, due)
+        self.overdue.discard(item_id)
         self.redraw_items()
-        self._save_state()           
+        self._arm_reminders()
+
+    def undo(self):
+        self._after_history(self.store.undo())
 
-    def _clamp_offsets(self):
-        tcount = sum(1 for i in self.items if i["state"] == "today")
-        dcount = sum(1 for i in self.items if i["state"] == "completed")
-        self.today_offset = max(0, min(self.today_offset, max(0, tcount - MAX_ROWS)))
-        self.comp_offset  = max(0, min(self.comp_offset,  max(0, dcount - MAX_ROWS)))
+    def redo(self):
+        self._after_history(self.store.redo())
+
+    def _after_history(self, item_ids):
+        if not item_ids:
+            return
+        # their due times may have changed back; the scheduler re-checks them.
+        # A task undone back to overdue keeps its notified flag, so it is
+        # highlighted again without a second reminder
+        items = self.store.items
+        self.overdue.difference_update(item_ids)
+        self.overdue.update(i for i in item_ids
+                            if i in items and items[i]["state"] == "today" and items[i].get("notified"))
+        self.redraw_items()
+        self._arm_reminders()
+
+    # ─── REMINDERS ───────────────────────────────────────────────
+
+    def _arm_reminders(self):
+        # one timer, for the earliest due task, however many tasks have due times
+        if self._reminder is not None:
+            self.window.after_cancel(self._reminder)
+            self._reminder = None
+        due = self.store.due.next_due()
+        if due is not None:
+            delay = max(0, int((due - time.time()) * 1000))
+            self._reminder = self.window.after(min(delay, REMINDER_MAX_MS), self._fire_reminders)
+
+    def _fire_reminders(self, quiet=False):
+        self._reminder = None
+        fired = self.store.due.pop_due(time.time())
+        if fired:
+            self.overdue.update(fired)
+            self.redraw_items()
+        self._arm_reminders()
+        if fired and not quiet:
+            lines = [f"{self.store.items[i]['text']}  (due {format_due(self.store.items[i]['due'])})"
+                     for i in fired[:REMINDER_LINES]]
+            if len(fired) > REMINDER_LINES:
+                lines.append(f"and {len(fired) - REMINDER_LINES} more")
+            messagebox.showinfo("Reminder", "\n".join(lines), parent=self.window)
 
     # ─── MAIN CANVAS ─────────────────────────────────────────────
 
@@ -117,98 +327,100 @@ class TodoApp:
                                 text="COMPLETED", fill="#000000",
                                 font=("Inter Medium", -20))
 
-        self.bg1_id = self.canvas.create_image(175, 105.5, image=self.images["bg1"])
-        self.bg2_id = self.canvas.create_image(175, 271.5, image=self.images["bg2"])
-
-        self.canvas.tag_bind(self.bg1_id, "<Button-1>",
-                             lambda e: self._set_active("today"))
-        self.canvas.tag_bind(self.bg2_id, "<Button-1>",
-                             lambda e: self._set_active("completed"))
-
         plus_id = self.canvas.create_image(175, 378, image=self.images["plus"])
         self.canvas.tag_bind(plus_id, "<Button-1>",
                              lambda e: self._open_popup())
 
-        self.drawn_ids = []
+        # each list sits exactly over its section's background image
+        self.views = {
+            "today": SectionView(self, "today", "bg1", 26, 46,
+                                 text_x=33, text_y=14, box_y=26),
+            "completed": SectionView(self, "completed", "bg2", 26, 212,
+                                     text_x=39, text_y=10, box_y=21),
+        }
+
+        self._build_filter_box()
+
+    def _build_filter_box(self):
+        PLACEHOLDER = "Filter tasks"
+        var = StringVar(master=self.window)
+        entry = Entry(self.window,
+                      textvariable=var,
+                      bd=0,
+                      bg="#EDEAE5",
+                      fg="#6B6B6B",
+                      highlightthickness=0,
+                      font=("Inter", 12))
+        entry.place(x=170, y=17, width=154, height=24)
+        entry.insert(0, PLACEHOLDER)
+        hint = {"shown": True}
+
+        def focus_in(e):
+            if hint["shown"]:
+                hint["shown"] = False
+                entry.delete(0, "end")
+                entry.configure(fg="#000716")
+
+        def focus_out(e):
+            if not var.get():
+                hint["shown"] = True
+                entry.insert(0, PLACEHOLDER)
+                entry.configure(fg="#6B6B6B")
+
+        def changed(*_):
+            self._set_filter("" if hint["shown"] else var.get())
+
+        entry.bind("<FocusIn>", focus_in)
+        entry.bind("<FocusOut>", focus_out)
+        entry.bind("<Escape>", lambda e: var.set(""))
+        var.trace_add("write", changed)
+        self.filter_entry = entry
+
+    def listed(self, section):
+        """Ids the section lists: all of its tasks, or those matching the filter."""
+        return self.store.matching(self.filter_text, section)
+
+    def _set_filter(self, text):
+        if text == self.filter_text:
+            return
+        self.filter_text = text
+        # a new filter starts both lists from the top
+        for view in self.views.values():
+            view.scroll_to(0, smooth=False)
+        self.redraw_items()
 
     def redraw_items(self):
-        for cid in self.drawn_ids:
-            self.canvas.delete(cid)
-        self.drawn_ids.clear()
-
-        # layout constants
-        R1T, R1O, R1B = 46, 14, 26
-        R2T, R2O, R2B = 212, 10, 21
-        SP = 26
-        CX = 45.5
-        LX1, LX2 = 59, 65
-        DX = 299
-
-        today = [i for i in self.items if i["state"] == "today"]
-        done  = [i for i in self.items if i["state"] == "completed"]
-
-        # TODAY slice
-        for idx, item in enumerate(today[self.today_offset:self.today_offset+MAX_ROWS]):
-            y_txt = R1T + R1O + idx*SP
-            y_box = R1T + R1B + idx*SP
-
-            bid = self.canvas.create_image(CX, y_box,
-                                           image=self.images["box"],
-                                           tags=(f"box_{item['id']}",))
-            lid = self.canvas.create_text(LX1, y_txt,
-                                          anchor="nw",
-                                          text=item["text"],
-                                          fill="#000000",
-                                          font=("Inter", -20))
-            did = self.canvas.create_image(DX, y_box,
-                                           image=self.images["bin"],
-                                           tags=(f"del_{item['id']}",))
-
-            self.drawn_ids += [bid, lid, did]
-
-            self.canvas.tag_bind(f"box_{item['id']}", "<Button-1>",
-                                 lambda e, i=item["id"]: self.toggle_item(i))
-            self.canvas.tag_bind(f"del_{item['id']}", "<Button-1>",
-                                 lambda e, i=item["id"]: self.delete_item(i))
-
-        # COMPLETED slice
-        for idx, item in enumerate(done[self.comp_offset:self.comp_offset+MAX_ROWS]):
-            y_txt = R2T + R2O + idx*SP
-            y_box = R2T + R2B + idx*SP
-
-            bid0 = self.canvas.create_image(CX, y_box,
-                                            image=self.images["box"],
-                                            tags=(f"box_{item['id']}",))
-            bid1 = self.canvas.create_image(CX, y_box,
-                                            image=self.images["tick"],
-                                            tags=(f"box_{item['id']}",))
-            lid  = self.canvas.create_text(LX2, y_txt,
-                                           anchor="nw",
-                                           text=item["text"],
-                                           fill="#000000",
-                                           font=("Inter", -20))
-            did  = self.canvas.create_image(DX, y_box,
-                                            image=self.images["bin"],
-                                            tags=(f"del_{item['id']}",))
-
-            self.drawn_ids += [bid0, bid1, lid, did]
-
-            self.canvas.tag_bind(f"box_{item['id']}", "<Button-1>",
-                                 lambda e, i=item["id"]: self.toggle_item(i))
-            self.canvas.tag_bind(f"del_{item['id']}", "<Button-1>",
-                                 lambda e, i=item["id"]: self.delete_item(i))
+        for view in self.views.values():
+            view.clamp()
+            view.render()
+
+    def _request_frame(self):
+        if self._frame is None:
+            self._frame = self.window.after(FRAME_MS, self._on_frame)
+
+    def _on_frame(self):
+        # every scroll request since the last frame is drawn here, once
+        self._frame = None
+        for view in self.views.values():
+            if view.step():
+                view.render()
+        if any(view.scroll != view.target for view in self.views.values()):
+            self._request_frame()
 
     def _set_active(self, section):
         self.active_section = section
 
-    def _open_popup(self):
+    def _open_popup(self, item_id=None):
+        # a new task and its optional due time, or, given item_id, that task's due time
         if self.popup_open:
             return
         self.popup_open = True
+        rescheduling = item_id is not None
+        height = 160 if rescheduling else 205
 
         pop = Toplevel(self.window)
         pop.title("")
-        pop.geometry("229x160")
+        pop.geometry(f"229x{height}")
         pop.configure(bg="#778DA9")
         pop.resizable(False, False)
 
@@ -220,32 +432,64 @@ class TodoApp:
         pop.bind("<Escape>", lambda e: close_popup())
 
         c2 = Canvas(pop, bg="#778DA9",
-                    width=229, height=160,
+                    width=229, height=height,
                     bd=0, highlightthickness=0, relief="ridge")
         c2.place(x=0, y=0)
         c2.create_image(114.5, 69.5, image=self.images["input_bg"])
         c2.create_text(22, 20,
                        anchor="nw",
-                       text="Input New Task",
+                       text="Due Time" if rescheduling else "Input New Task",
                        fill="#000000",
                        font=("Inter SemiBold", -20))
 
-        entry = Entry(pop,
+        def input_entry(y):
+            e = Entry(pop,
                       bd=0,
                       bg="#EDEAE5",
                       fg="#000716",
                       highlightthickness=0,
                       font=("Inter", 14))
-        entry.place(x=27, y=56, width=175, height=25)
+            e.place(x=27, y=y, width=175, height=25)
+            return e
+
+        entry = input_entry(56)
         entry.focus_set()
+        if rescheduling:
+            # a blank due time cancels the reminder
+            due_entry = entry
+            due_entry.insert(0, format_due(self.store.items[item_id].get("due")))
+            hint_y = 84
+        else:
+            c2.create_text(22, 94,
+                           anchor="nw",
+                           text="Due (optional)",
+                           fill="#000000",
+                           font=("Inter Medium", -14))
+            c2.create_image(114.5, 124.5, image=self.images["input_bg"])
+            due_entry = input_entry(111)
+            hint_y = 139
+        c2.create_text(27, hint_y,
+                       anchor="nw",
+                       text="+30m, 17:00 or 2025-06-01 09:00",
+                       fill="#EDEAE5",
+                       font=("Inter", -11))
 
         def do_add(event=None):
-            txt = entry.get().strip()
-            if txt:
-                self.add_item(txt, "today")
+            try:
+                due = parse_due(due_entry.get())
+            except ValueError as err:
+                messagebox.showerror("Due time", str(err), parent=pop)
+                return
+            if rescheduling:
+                self.set_due(item_id, due)
+            else:
+                txt = entry.get().strip()
+                if txt:
+                    self.add_item(txt, "today", due)
             close_popup()
 
         entry.bind("<Return>", do_add)
+        due_entry.bind("<Return>", do_add)
 
         b1 = Button(pop,
                     image=self.images["enter"],
@@ -254,7 +498,7 @@ class TodoApp:
                     relief="flat",
                     bg="#778DA9", activebackground="#778DA9",
                     command=do_add)
-        b1.place(x=22, y=103, width=82, height=24)
+        b1.place(x=22, y=height - 57, width=82, height=24)
 
         b2 = Button(pop,
                     image=self.images["cancel"],
@@ -263,27 +507,23 @@ class TodoApp:
                     relief="flat",
                     bg="#778DA9", activebackground="#778DA9",
                     command=close_popup)
-        b2.place(x=124, y=103, width=82, height=24)
+        b2.place(x=124, y=height - 57, width=82, height=24)
 
     def _scroll(self, delta):
-        sec = self.active_section
-        if sec == "today":
-            count = sum(1 for i in self.items if i["state"] == "today")
-            if delta < 0 and self.today_offset + MAX_ROWS < count:
-                self.today_offset += 1
-                self.redraw_items()
-            elif delta > 0 and self.today_offset > 0:
-                self.today_offset -= 1
-                self.redraw_items()
-
-        elif sec == "completed":
-            count = sum(1 for i in self.items if i["state"] == "completed")
-            if delta < 0 and self.comp_offset + MAX_ROWS < count:
-                self.comp_offset += 1
-                self.redraw_items()
-            elif delta > 0 and self.comp_offset > 0:
-                self.comp_offset -= 1
-                self.redraw_items()
+        view = self.views.get(self.active_section)
+        if view is not None:
+            view.scroll_by(-delta * WHEEL_PX)
+
+    def _on_page_key(self, e, rows):
+        # Home and End move the cursor while typing a filter
+        if e.widget is self.filter_entry and rows in (float("inf"), float("-inf")):
+            return
+        self._page(rows)
+
+    def _page(self, rows):
+        view = self.views.get(self.active_section)
+        if view is not None:
+            view.scroll_by(rows * ROW_HEIGHT)
 
     def _on_mousewheel(self, e):
         self._scroll(e.delta / 120)
@@ -293,4 +533,7 @@ class TodoApp:
 
 if __name__ == "__main__":
     app = TodoApp()
+    if "--profile-startup" in sys.argv:
+        # what the images cost before the first paint
+        app.window.after_idle(app.assets.report)
     app.run()
@@ -0,0 +1,662 @@
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import datetime, timedelta
+from heapq import heapify, heappop, heappush
+from pathlib import Path
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+
+STATE_PATH = Path(__file__).parent / "todo_state.json"
+STATES = ("today", "completed")
+# the snapshot is rewritten once the log holds this many records, or as many
+# as there are tasks if that is more, so each action costs O(1) writes on average
+COMPACT_MIN_RECORDS = 1000
+# actions undo can step back through; older ones are forgotten
+HISTORY_LIMIT = 100
+
+# a due date given without a time means this hour of that day
+DEFAULT_DUE_HOUR = 9
+
+_WORD = re.compile(r"\w+")
+_RELATIVE_DUE = re.compile(r"\+(\d+)\s*([mhd]?)$")
+
+
+def _words(text):
+    return _WORD.findall(text.lower())
+
+
+def parse_due(text, now=None):
+    """Reads a due time as a timestamp, or None for a blank.
+
+    Accepts "+30m", "+2h", "+1d" (a bare number is minutes), "HH:MM" (the
+    next time the clock shows it), "YYYY-MM-DD HH:MM" and "YYYY-MM-DD".
+    Raises ValueError for anything else.
+    """
+    text = text.strip()
+    if not text:
+        return None
+    now = time.time() if now is None else now
+    relative = _RELATIVE_DUE.match(text)
+    if relative:
+        return now + int(relative.group(1)) * {"": 60, "m": 60, "h": 3600, "d": 86400}[relative.group(2)]
+    for fmt in ("%H:%M", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        if fmt == "%H:%M":
+            today = datetime.fromtimestamp(now)
+            parsed = today.replace(hour=parsed.hour, minute=parsed.minute, second=0, microsecond=0)
+            if parsed.timestamp() <= now:
+                parsed += timedelta(days=1)
+        elif fmt == "%Y-%m-%d":
+            parsed = parsed.replace(hour=DEFAULT_DUE_HOUR)
+        return parsed.timestamp()
+    raise ValueError(f"cannot read due time {text!r}")
+
+
+def format_due(due):
+    return datetime.fromtimestamp(due).strftime("%Y-%m-%d %H:%M") if due is not None else ""
+
+
+def _is_time(value):
+    return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+
+def _check_record(record):
+    """Raises ValueError unless ``record`` is a well-formed change, before anything is applied."""
+    if not isinstance(record, dict):
+        raise ValueError("record must be a JSON object")
+    op = record.get("op")
+    if op not in ("add", "toggle", "due", "delete"):
+        raise ValueError(f"unknown op {op!r}")
+    if not isinstance(record.get("id"), int) or isinstance(record["id"], bool) or record["id"] < 0:
+        raise ValueError(f"bad id {record.get('id')!r}")
+    if op in ("add", "toggle") and record.get("state") not in STATES:
+        raise ValueError(f"unknown state {record.get('state')!r}")
+    if op == "add" and not isinstance(record.get("text"), str):
+        raise ValueError("'text' must be a string")
+    if op == "add" and not _is_time(record.get("due")):
+        raise ValueError(f"bad due time {record['due']!r}")
+    if op == "due" and ("due" not in record or not _is_time(record["due"])):
+        raise ValueError(f"bad due time {record.get('due')!r}")
+    if not isinstance(record.get("notified", False), bool):
+        raise ValueError(f"bad notified flag {record['notified']!r}")
+
+
+def _set_notified(item, record):
+    # a record that does not carry the flag clears it, so a rescheduled or reopened task is reminded of again
+    if record.get("notified"):
+        item["notified"] = True
+    else:
+        item.pop("notified", None)
+
+
+def _waiting(item):
+    """Whether ``item`` is an open task with a due time it has not been reminded of."""
+    return item["state"] == "today" and item.get("due") is not None and not item.get("notified")
+
+
+class DueQueue:
+    """Due times of the open (today) tasks as a min-heap, built on first use.
+
+    A change pushes a fresh entry and leaves the old one where it is;
+    entries that no longer match their task are dropped when they reach
+    the top. Scheduling, rescheduling and cancelling are O(log n), and
+    peeking at the next due task is amortized O(1).
+
+    pop_due marks each task it returns as "notified". A notified task is
+    left out of the heap until a change clears the flag, so undoing an
+    edit of an overdue task does not remind of it a second time.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._heap = None
+
+    def reset(self):
+        self._heap = None
+
+    def _current(self, entry):
+        item = self.store.items.get(entry[1])
+        return item is not None and _waiting(item) and item["due"] == entry[0]
+
+    def push(self, item):
+        if self._heap is None or not _waiting(item):
+            # nothing to do until the heap is built, which reads every task
+            return
+        heappush(self._heap, (item["due"], item["id"]))
+        if len(self._heap) > 2 * len(self.store.items) + 64:
+            # mostly stale entries; keep the live ones (tasks already popped stay out)
+            self._heap = list({entry for entry in self._heap if self._current(entry)})
+            heapify(self._heap)
+
+    def next_due(self):
+        """The earliest due time of an open task, or None."""
+        if self._heap is None:
+            self._heap = [(item["due"], item["id"]) for item in self.store.items.values() if _waiting(item)]
+            heapify(self._heap)
+        while self._heap and not self._current(self._heap[0]):
+            heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Ids of the open tasks due by ``now``, earliest first; each is marked notified and returned once."""
+        fired = []
+        while True:
+            due = self.next_due()
+            if due is None or due > now:
+                return fired
+            item_id = heappop(self._heap)[1]
+            # a second entry for the same task and time is dropped as stale
+            self.store.items[item_id]["notified"] = True
+            fired.append(item_id)
+
+
+class TodoStore:
+    """The task list, its ids and its persistence, with no UI.
+
+    The state is a JSON snapshot plus a log of the actions taken since it
+    was written (the snapshot's path with a .log suffix), one JSON record
+    per line. Every change goes through a batch method that applies its
+    records in memory and persists the whole batch with one write.
+
+    Each batch is one action for undo(). History holds the records that
+    reverse an action rather than copies of the list, so an entry costs
+    the size of the tasks it touched, not of the whole list.
+    """
+
+    def __init__(self, path=STATE_PATH):
+        self.path = Path(path)
+        self.log_path = self.path.with_suffix(".log")
+        # id -> item, in creation order
+        self.items = {}
+        # ids of each state's items, ascending; ids are handed out in creation
+        # order, so this is also display order. A task's position is found by
+        # bisection, but inserting or removing it shifts the ids after it, so
+        # a change is O(n): a memmove of up to n pointers (a toggle takes
+        # ~10 us at 50k tasks)
+        self.order = {s: [] for s in STATES}
+        # word -> ids of the tasks containing it, and every indexed word, sorted,
+        # so a prefix finds its words by bisection (a new or vanished word
+        # shifts the list, like order)
+        self._postings = {}
+        self._vocab = []
+        # bumped by every change; matching() caches its last answer against it
+        self.version = 0
+        self._match_cache = None
+        self.due = DueQueue(self)
+        # per action, the records that reverse it, newest action last
+        self.undo_stack = deque(maxlen=HISTORY_LIMIT)
+        self.redo_stack = deque(maxlen=HISTORY_LIMIT)
+        self.next_id = 0
+        self._log_records = 0
+        self.load()
+
+    # ─── QUERIES ─────────────────────────────────────────────────
+
+    def count(self, state):
+        return len(self.order.get(state, ()))
+
+    def ids(self, state, start=0, stop=None):
+        """Ids of the ``state`` tasks from position ``start`` to ``stop``, in display order."""
+        return self.order.get(state, [])[start:stop]
+
+    def get(self, item_id):
+        return self.items.get(item_id)
+
+    def matching(self, query, state):
+        """Ids of the ``state`` tasks that have, for every word of ``query``,
+        a word starting with it; in display order.
+
+        An empty query matches every task. The answer for both states is
+        cached until the query or the tasks change.
+        """
+        if not query.strip():
+            return self.order.get(state, [])
+        cache = self._match_cache
+        if cache is None or cache[0] != query or cache[1] != self.version:
+            cache = self._match_cache = (query, self.version, self._match(_words(query)))
+        return cache[2].get(state, [])
+
+    def _match(self, words):
+        ids = None
+        # longer prefixes match fewer words, so intersect from the longest
+        for word in sorted(set(words), key=len, reverse=True):
+            sets = []
+            i = bisect_left(self._vocab, word)
+            while i < len(self._vocab) and self._vocab[i].startswith(word):
+                sets.append(self._postings[self._vocab[i]])
+                i += 1
+            if ids is None:
+                ids = sets[0] if len(sets) == 1 else set().union(*sets)
+            elif len(ids) * len(sets) < sum(map(len, sets)):
+                # cheaper to check the few candidates left than to merge big postings
+                ids = {i for i in ids if any(i in found for found in sets)}
+            else:
+                ids = ids & set().union(*sets)
+            if not ids:
+                return {}
+        if ids is None:
+            # only punctuation: nothing to narrow by
+            return self.order
+        if len(ids) * 8 > len(self.items):
+            # most tasks match: walking the ordered lists beats sorting the ids
+            return {s: [i for i in order if i in ids] for s, order in self.order.items()}
+        result = {s: [] for s in self.order}
+        for i in sorted(ids):
+            result[self.items[i]["state"]].append(i)
+        return result
+
+    def overdue(self):
+        """Ids of the open tasks already reminded of, in display order."""
+        return [i for i in self.order["today"] if self.items[i].get("notified")]
+
+    def search(self, text, state=None):
+        """Tasks whose text contains ``text``, ignoring case, in display order."""
+        needle = text.lower()
+        items = self.items.values() if state is None else (self.items[i] for i in self.ids(state))
+        return [item for item in items if needle in item["text"].lower()]
+
+    # ─── CHANGES ─────────────────────────────────────────────────
+
+    def add(self, text, state="today", due=None):
+        return self.add_many([(text, state, due)])[0]
+
+    def add_many(self, tasks):
+        """Adds (text, state) or (text, state, due) tasks in order; returns their new ids."""
+        records, undo = [], []
+        first_id = self.next_id
+        try:
+            for text, state, *due in tasks:
+                if state not in STATES:
+                    raise ValueError(f"unknown state {state!r}")
+                record = {"op": "add", "id": self.next_id, "text": text, "state": state}
+                if due and due[0] is not None:
+                    record["due"] = due[0]
+                self._change(record, records, undo)
+        finally:
+            # keep what was added before a bad task
+            try:
+                self._commit(records, undo)
+            except OSError:
+                # nothing was added, so hand the ids out again
+                self.next_id = first_id
+                raise
+        return [record["id"] for record in records]
+
+    def toggle(self, item_id):
+        return self.toggle_many([item_id]) == 1
+
+    def toggle_many(self, item_ids):
+        """Moves tasks between today and completed; returns how many existed."""
+        records, undo = [], []
+        for item_id in item_ids:
+            item = self.items.get(item_id)
+            if item is not None:
+                state = "completed" if item["state"] == "today" else "today"
+                self._change({"op": "toggle", "id": item_id, "state": state}, records, undo)
+        self._commit(records, undo)
+        return len(records)
+
+    def set_due(self, item_id, due):
+        return self.set_due_many([(item_id, due)]) == 1
+
+    def set_due_many(self, changes):
+        """Reschedules (id, due) pairs; a due of None cancels. Returns how many tasks existed."""
+        records, undo = [], []
+        for item_id, due in changes:
+            if item_id in self.items:
+                self._change({"op": "due", "id": item_id, "due": due}, records, undo)
+        self._commit(records, undo)
+        return len(records)
+
+    def delete(self, item_id):
+        return self.delete_many([item_id]) == 1
+
+    def delete_many(self, item_ids):
+        """Removes tasks; returns how many existed."""
+        records, undo = [], []
+        for item_id in item_ids:
+            if item_id in self.items:
+                self._change({"op": "delete", "id": item_id}, records, undo)
+        self._commit(records, undo)
+        return len(records)
+
+    def undo(self):
+        """Reverses the last action; returns the ids it touched, or [] if there was none."""
+        return self._step_history(self.undo_stack, self.redo_stack)
+
+    def redo(self):
+        """Repeats the last undone action; returns the ids it touched, or []."""
+        return self._step_history(self.redo_stack, self.undo_stack)
+
+    def _step_history(self, source, target):
+        if not source:
+            return []
+        entry = source.pop()
+        records, undo = [], []
+        for record in entry:
+            self._change(record, records, undo)
+        try:
+            # logged like any other change, so an undo survives a restart
+            self._persist(records)
+        except OSError:
+            self._revert(undo)
+            source.append(entry)
+            raise
+        target.append(undo[::-1])
+        return [record["id"] for record in records]
+
+    def _change(self, record, records, undo):
+        inverse = self._inverse(record)
+        self._apply(record)
+        undo.append(inverse)
+        records.append(record)
+
+    def _commit(self, records, undo):
+        try:
+            self._persist(records)
+        except OSError:
+            # the change never reached the disk, so it must not stay in memory either
+            self._revert(undo)
+            raise
+        if undo:
+            # a batch is reversed newest record first
+            self.undo_stack.append(undo[::-1])
+            self.redo_stack.clear()
+
+    def _revert(self, undo):
+        for record in reversed(undo):
+            self._apply(record)
+
+    def _inverse(self, record):
+        """The record that reverses ``record``, read from the state before it is applied."""
+        if record["op"] == "add":
+            return {"op": "delete", "id": record["id"]}
+        item = self.items[record["id"]]
+        # the flag goes back with the task, so an undone edit of an overdue task is not reminded of again
+        notified = {"notified": True} if item.get("notified") else {}
+        if record["op"] == "toggle":
+            return {"op": "toggle", "id": item["id"], "state": item["state"], **notified}
+        if record["op"] == "due":
+            return {"op": "due", "id": item["id"], "due": item.get("due"), **notified}
+        # re-adding under the same id puts the task back in its place
+        return {"op": "add", **item}
+
+    # ─── PERSISTENCE ─────────────────────────────────────────────
+
+    def load(self):
+        try:
+            data = json.loads(self.path.read_text())
+            self._index(data["items"])
+            self.next_id = data["next_id"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            self._index([])
+            self.next_id = 0
+        self._log_records = self._replay_log()
+
+    def _index(self, items):
+        self.items = {}
+        self.order = {s: [] for s in STATES}
+        self._postings = {}
+        for item in sorted(items, key=lambda i: i["id"]):
+            self.items[item["id"]] = item
+            self.order.setdefault(item["state"], []).append(item["id"])
+            for word in _words(item["text"]):
+                self._postings.setdefault(word, set()).add(item["id"])
+        self._vocab = sorted(self._postings)
+        self.version += 1
+        self.due.reset()
+
+    def _index_words(self, item):
+        for word in set(_words(item["text"])):
+            ids = self._postings.get(word)
+            if ids is None:
+                ids = self._postings[word] = set()
+                insort(self._vocab, word)
+            ids.add(item["id"])
+
+    def _unindex_words(self, item):
+        for word in set(_words(item["text"])):
+            ids = self._postings[word]
+            ids.discard(item["id"])
+            if not ids:
+                del self._postings[word]
+                del self._vocab[bisect_left(self._vocab, word)]
+
+    def _unlist(self, item):
+        ids = self.order[item["state"]]
+        del ids[bisect_left(ids, item["id"])]
+
+    def _replay_log(self):
+        try:
+            raw = self.log_path.read_bytes()
+        except FileNotFoundError:
+            return 0
+        lines = raw.splitlines(keepends=True)
+        if lines and not lines[-1].endswith(b"\n"):
+            # torn by a crash mid-append; cut it off so new records start on a clean line
+            with self.log_path.open("r+b") as f:
+                f.truncate(len(raw) - len(lines.pop()))
+        for number, line in enumerate(lines, 1):
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                # a complete record was written, so the records after it are intact; keep them
+                print(f"Skipping bad record on line {number} of {self.log_path}: {e}", file=sys.stderr)
+        return len(lines)
+
+    def _apply(self, record):
+        # replaying the log over a snapshot that already has its records
+        # (a crash between compaction's two steps) ends in the same state
+        _check_record(record)
+        item_id = record["id"]
+        item = self.items.get(item_id)
+        self.version += 1
+        if record["op"] == "add":
+            if item is not None:
+                self._unlist(item)
+                self._unindex_words(item)
+            item = {"id": item_id, "text": record["text"], "state": record["state"]}
+            if record.get("due") is not None:
+                item["due"] = record["due"]
+            _set_notified(item, record)
+            self.items[item_id] = item
+            insort(self.order.setdefault(item["state"], []), item_id)
+            self._index_words(item)
+            self.due.push(item)
+            self.next_id = max(self.next_id, item_id + 1)
+        elif record["op"] == "toggle":
+            if item is not None:
+                self._unlist(item)
+                item["state"] = record["state"]
+                _set_notified(item, record)
+                insort(self.order.setdefault(item["state"], []), item_id)
+                self.due.push(item)
+        elif record["op"] == "due":
+            if item is not None:
+                _set_notified(item, record)
+                if record["due"] is None:
+                    item.pop("due", None)
+                else:
+                    item["due"] = record["due"]
+                    self.due.push(item)
+        elif item is not None:
+            del self.items[item_id]
+            self._unlist(item)
+            self._unindex_words(item)
+
+    def _persist(self, records):
+        if not records:
+            return
+        if self._log_records + len(records) >= max(COMPACT_MIN_RECORDS, len(self.items)):
+            # the snapshot will hold these records too, so skip logging them
+            self.compact()
+            return
+        with self.log_path.open("a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_records += len(records)
+
+    def compact(self):
+        """Writes the snapshot and drops the log."""
+        payload = {
+            "items": list(self.items.values()),
+            "next_id": self.next_id
+        }
+        # write aside and rename over, so a crash leaves the old snapshot or the new one
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(payload, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        # the snapshot now holds everything logged
+        self.log_path.unlink(missing_ok=True)
+        self._log_records = 0
+
+    def close(self):
+        if self._log_records:
+            self.compact()
+
+
+# ─── IMPORT / EXPORT ─────────────────────────────────────────────
+
+def _file_format(filename):
+    return "csv" if str(filename).lower().endswith(".csv") else "text"
+
+
+def read_tasks(stream, fmt="text"):
+    """Yields (text, state) pairs.
+
+    Text files hold one task per line; a "[x] " prefix marks it completed
+    and "[ ] " (or no prefix) leaves it for today. CSV files need a "text"
+    column and may have "state" and "due" columns; a bad state or due
+    time raises ValueError naming its line.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            text = (row.get("text") or "").strip()
+            if not text:
+                continue
+            state = (row.get("state") or "today").strip().lower()
+            try:
+                if state not in STATES:
+                    raise ValueError(f"unknown state {state!r}")
+                due = parse_due(row.get("due") or "")
+            except ValueError as e:
+                raise ValueError(f"line {reader.line_num}: {e}") from None
+            yield text, state, due
+        return
+    for line in stream:
+        text = line.strip()
+        state = "today"
+        if text[:4].lower() == "[x] ":
+            text, state = text[4:].strip(), "completed"
+        elif text.startswith("[ ] "):
+            text = text[4:].strip()
+        if text:
+            yield text, state
+
+
+def write_tasks(items, stream, fmt="text"):
+    """Writes ``items`` in the format read_tasks reads; returns how many."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(["id", "text", "state", "due"])
+        for item in items:
+            writer.writerow([item["id"], item["text"], item["state"], format_due(item.get("due"))])
+            count += 1
+        return count
+    for item in items:
+        stream.write(("[x] " if item["state"] == "completed" else "[ ] ") + item["text"] + "\n")
+        count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Script the To-Do-List without opening its window")
+    parser.add_argument("--state-file", default=STATE_PATH, help="snapshot to use (its log sits next to it)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("list", help="print tasks as id, state and text")
+    show.add_argument("--section", choices=STATES, help="only this section")
+    show.add_argument("--search", default="", help="only tasks containing this text")
+    show.add_argument("--limit", type=int, help="print at most this many")
+    commands.add_parser("count", help="print how many tasks each section has")
+    add = commands.add_parser("add", help="add tasks for today")
+    add.add_argument("texts", nargs="+")
+    add.add_argument("--due", default="", help="due time: +30m, +2h, HH:MM or YYYY-MM-DD [HH:MM]")
+    due = commands.add_parser("due", help="reschedule a task, or cancel its due time if WHEN is left out")
+    due.add_argument("id", type=int)
+    due.add_argument("when", nargs="?", default="")
+    commands.add_parser("overdue", help="list open tasks past their due time")
+    for name, text in (("toggle", "move tasks between today and completed"), ("delete", "delete tasks")):
+        command = commands.add_parser(name, help=text)
+        command.add_argument("ids", type=int, nargs="+")
+    load = commands.add_parser("import", help="add the tasks in a .txt or .csv file")
+    load.add_argument("file")
+    dump = commands.add_parser("export", help="write every task to a .txt or .csv file ('-' for stdout)")
+    dump.add_argument("file")
+    args = parser.parse_args(argv)
+
+    store = TodoStore(args.state_file)
+    if args.command == "list":
+        items = store.search(args.search, args.section)
+        for item in items[:args.limit]:
+            due = f"  (due {format_due(item['due'])})" if item.get("due") is not None else ""
+            print(f"{item['id']:>7}  {'[x]' if item['state'] == 'completed' else '[ ]'}  {item['text']}{due}")
+    elif args.command == "count":
+        for state in STATES:
+            print(f"{state}: {store.count(state)}")
+    elif args.command == "add":
+        try:
+            due = parse_due(args.due)
+        except ValueError as e:
+            parser.exit(1, f"Error: {e}\n")
+        ids = store.add_many((text, "today", due) for text in args.texts)
+        print(f"Added {len(ids)} tasks")
+    elif args.command == "due":
+        try:
+            found = store.set_due(args.id, parse_due(args.when))
+        except ValueError as e:
+            parser.exit(1, f"Error: {e}\n")
+        print(f"Rescheduled task {args.id}" if found else f"No task {args.id}")
+    elif args.command == "overdue":
+        store.due.pop_due(time.time())
+        for item_id in sorted(store.overdue(), key=lambda i: store.items[i]["due"]):
+            item = store.items[item_id]
+            print(f"{item_id:>7}  {format_due(item['due'])}  {item['text']}")
+    elif args.command == "toggle":
+        print(f"Toggled {store.toggle_many(args.ids)} tasks")
+    elif args.command == "delete":
+        print(f"Deleted {store.delete_many(args.ids)} tasks")
+    elif args.command == "import":
+        with open(args.file, newline="", encoding="utf-8") as f:
+            try:
+                # read the whole file first, so a bad row leaves the store untouched
+                tasks = list(read_tasks(f, _file_format(args.file)))
+            except ValueError as e:
+                parser.exit(1, f"Error importing {args.file}: {e}; nothing was imported\n")
+        ids = store.add_many(tasks)
+        print(f"Imported {len(ids)} tasks")
+    elif args.command == "export":
+        items = (store.items[i] for state in STATES for i in store.ids(state))
+        if args.file == "-":
+            count = write_tasks(items, sys.stdout)
+        else:
+            with open(args.file, "w", newline="", encoding="utf-8") as f:
+                count = write_tasks(items, f, _file_format(args.file))
+            print(f"Exported {count} tasks to {args.file}")
+
+
+if __name__ == "__main__":
+    main()
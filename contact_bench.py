@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import contact_book
+from contact_book import ContactManager
+
+SIZES = [1000, 10000, 100000, 1000000]
+# contacts added, looked up and deleted per repeat
+OPS = 1000
+# runs of each search query per repeat
+SEARCH_RUNS = 5
+# list refreshes timed per repeat
+REFRESH_RUNS = 20
+
+SYLLABLES = ["an", "bel", "cor", "da", "el", "fin", "gra", "hal", "is", "jo", "ka", "lin", "mar", "no", "or", "pe",
+             "qui", "ra", "sol", "ta", "ul", "ver", "wen", "xi", "yo", "zel"]
+DOMAINS = ["gmail.com", "yahoo.com", "outlook.com"] + [f"corp{i}.com" for i in range(200)]
+
+
+def _person(rng: random.Random, i: int) -> List[str]:
+    first = "".join(rng.choices(SYLLABLES, k=2)).title()
+    last = "".join(rng.choices(SYLLABLES, k=3)).title()
+    # the index keeps names unique, as add_contact would
+    name = f"{first} {last} {i}"
+    phone = f"+1 ({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}"
+    email = f"{first.lower()}.{last.lower()}{i}@{rng.choice(DOMAINS)}" if rng.random() < 0.8 else ""
+    address = f"{rng.randint(1, 9999)} {last} St" if rng.random() < 0.5 else ""
+    return [name, phone, email, address]
+
+
+def write_book(filename: str, size: int, seed: int) -> List[List[str]]:
+    """Writes a synthetic contacts.json of ``size`` contacts; returns their fields."""
+    rng = random.Random(seed)
+    rows = [_person(rng, i) for i in range(size)]
+    with open(filename, "w") as f:
+        contact_book._dump_contacts(f, rows)
+    return rows
+
+
+def _queries(rows: List[List[str]], rng: random.Random) -> Dict[str, str]:
+    name = rng.choice(rows)[0]
+    phone = rng.choice(rows)[1]
+    return {
+        "search_1char": name[1].lower(),
+        "search_2char": name[1:3].lower(),
+        "search_name": name.split()[1][:5].lower(),
+        "search_domain": "@corp17.",
+        "search_phone": phone[-8:],
+        "search_miss": "zzqxj",
+    }
+
+
+class Bench:
+    """Collects timings as {"size", "backend", "op", "ops", "seconds": [per repeat]} records."""
+
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results: List[Dict] = []
+        # {"size", "backend", "bytes_per_contact"} from --memory
+        self.memory: List[Dict] = []
+
+    def record(self, size: int, backend: str, op: str, ops: int, seconds: List[float]):
+        result = {
+            "size": size,
+            "backend": backend,
+            "op": op,
+            "ops": ops,
+            "seconds": seconds,
+            "best": min(seconds),
+            "median": statistics.median(seconds),
+            "per_op_us": statistics.median(seconds) / ops * 1e6,
+        }
+        self.results.append(result)
+        print(f"{size:>9,} {backend:<8} {op:<16} {result['median']:>10.4f}s  {result['per_op_us']:>12.1f} us/op")
+
+    def time(self, size: int, backend: str, op: str, ops: int, run: Callable[[], None],
+             setup: Optional[Callable[[], None]] = None):
+        seconds = []
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            run()
+            seconds.append(time.perf_counter() - start)
+        self.record(size, backend, op, ops, seconds)
+
+    def record_memory(self, size: int, backend: str, held: int, what: str = "memory"):
+        self.memory.append({"size": size, "backend": backend, "what": what, "bytes_per_contact": held / size})
+        print(f"{size:>9,} {backend:<8} {what:<16} {held / size:>10.1f} bytes/contact")
+
+
+def bench_manager(
+    bench: Bench, size: int, backend: str, filename: str, existing: List[str], queries: Dict[str, str], seed: int
+):
+    journal = backend == "journal"
+    state: Dict[str, ContactManager] = {}
+
+    def load():
+        state["manager"] = ContactManager(filename, journal=journal, background=journal)
+
+    def close():
+        # the previous repeat's manager, so its writer thread does not outlive it
+        if "manager" in state:
+            state.pop("manager").close()
+
+    bench.time(size, backend, "load", size, load, setup=close)
+    manager = state["manager"]
+    bench.time(size, backend, "save", size, manager.save_contacts)
+
+    rng = random.Random(seed)
+    # every snapshot-mode edit rewrites the whole file, so only time a handful of those
+    count = len(existing) if journal else max(1, min(len(existing), 100_000 // size))
+    new = [_person(rng, size + i) for i in range(count)]
+
+    def add():
+        for fields in new:
+            manager.add_contact(*fields)
+        # journal mode writes in the background; the flush counts those writes
+        manager.flush()
+
+    def delete():
+        for fields in new:
+            manager.delete_contact(fields[0])
+        manager.flush()
+
+    def find():
+        for name in existing:
+            manager.find_contact_by_name(name)
+
+    # each run starts from the generated book: adds are undone before the next add run and redone before deletes
+    bench.time(size, backend, "add", count, add, setup=delete)
+    bench.time(size, backend, "find", len(existing), find)
+    # built once, by the first search that could use it; timed here so the searches below use it
+    start = time.perf_counter()
+    manager.build_search_index()
+    bench.record(size, backend, "search_index", size, [time.perf_counter() - start])
+    bench.time(size, backend, "delete", count, delete, setup=add)
+    for op, query in queries.items():
+        bench.time(size, backend, op, SEARCH_RUNS, lambda: [manager.search_contacts(query) for _ in range(SEARCH_RUNS)])
+    manager.close()
+
+
+def bench_memory(bench: Bench, size: int, backend: str, filename: str):
+    """Records what a loaded book holds per contact (the Contacts, their strings and the
+    indexes), and what the search index adds once a search has built it."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        manager = ContactManager(filename, journal=backend == "journal")
+        held = tracemalloc.get_traced_memory()[0] - before
+        # the first search builds the search index, so it is measured on its own
+        before = tracemalloc.get_traced_memory()[0]
+        manager.build_search_index()
+        index = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    bench.record_memory(size, backend, held)
+    bench.record_memory(size, backend, index, "search_index")
+    manager.close()
+
+
+def bench_refresh(bench: Bench, size: int, filename: str) -> Optional[str]:
+    """Times ContactApp.refresh_contact_list on a withdrawn root; returns why it was skipped, if it was."""
+    try:
+        app = contact_book.ContactApp(ContactManager(filename), watch=False)
+    except Exception as e:  # no display: run under xvfb-run to include this
+        return str(e)
+    app.root.withdraw()
+    app.root.update()
+
+    def refresh():
+        for _ in range(REFRESH_RUNS):
+            app.refresh_contact_list()
+            app.root.update_idletasks()
+
+    bench.time(size, "json", "refresh_list", REFRESH_RUNS, refresh)
+    app.root.destroy()
+    app.manager.close()
+    return None
+
+
+def _meta() -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(baseline_file: str, results: List[Dict], memory: List[Dict]):
+    """Prints median time per op, and memory per contact, against an earlier results file."""
+    with open(baseline_file) as f:
+        data = json.load(f)
+    baseline = {(r["size"], r["backend"], r["op"]): r for r in data["results"]}
+    baseline_memory = data.get("memory", [])
+    print(f"\nvs {baseline_file} (ratio < 1 is faster)")
+    for r in results:
+        old = baseline.get((r["size"], r["backend"], r["op"]))
+        if old is not None:
+            ratio = r["per_op_us"] / old["per_op_us"] if old["per_op_us"] else float("inf")
+            print(f"{r['size']:>9,} {r['backend']:<8} {r['op']:<16} {old['per_op_us']:>12.1f} -> "
+                  f"{r['per_op_us']:>12.1f} us/op  x{ratio:.2f}")
+    old_memory = {(m["size"], m["backend"], m.get("what", "memory")): m for m in baseline_memory}
+    for m in memory:
+        old = old_memory.get((m["size"], m["backend"], m["what"]))
+        if old is not None:
+            print(f"{m['size']:>9,} {m['backend']:<8} {m['what']:<16} {old['bytes_per_contact']:>12.1f} -> "
+                  f"{m['bytes_per_contact']:>12.1f} bytes/contact")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark ContactManager and ContactApp hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="book sizes to generate")
+    parser.add_argument("--backends", nargs="+", choices=["json", "journal"], default=["json", "journal"])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; median and best are reported")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-gui", action="store_true", help="skip the list refresh measurement")
+    parser.add_argument("--memory", action="store_true",
+                        help="also trace the memory a loaded book holds (tracemalloc slows that load down)")
+    parser.add_argument("--output", default="contact_bench.json", help="where to write the results")
+    parser.add_argument("--compare", metavar="FILE", help="earlier results to compare against")
+    args = parser.parse_args(argv)
+
+    bench = Bench(args.repeat)
+    skipped: Dict[str, str] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            base = os.path.join(tmp, f"base-{size}.json")
+            rows = write_book(base, size, args.seed)
+            rng = random.Random(args.seed)
+            existing = [row[0] for row in rng.sample(rows, min(OPS, size))]
+            queries = _queries(rows, rng)
+            del rows
+            for backend in args.backends:
+                filename = os.path.join(tmp, f"{backend}-{size}.json")
+                shutil.copyfile(base, filename)
+                bench_manager(bench, size, backend, filename, existing, queries, args.seed)
+                if args.memory:
+                    bench_memory(bench, size, backend, base)
+            if not args.no_gui and "refresh_list" not in skipped:
+                reason = bench_refresh(bench, size, base)
+                if reason is not None:
+                    skipped["refresh_list"] = reason
+                    print(f"refresh_list skipped: {reason}")
+    with open(args.output, "w") as f:
+        json.dump({"meta": {**_meta(), "repeat": args.repeat, "seed": args.seed, "skipped": skipped},
+                   "results": bench.results, "memory": bench.memory}, f, indent=2)
+    print(f"Results written to {args.output}")
+    if args.compare:
+        compare(args.compare, bench.results, bench.memory)
+
+
+if __name__ == "__main__":
+    main()
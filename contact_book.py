@@ -1,12 +1,67 @@
+import time
+
+# taken before the other imports so --profile-startup can show what loading this module costs
+IMPORT_STARTED = time.perf_counter()
+
+import argparse
+import bisect
+import contextlib
+import csv
+import heapq
+import itertools
 import json
+import operator
 import os
-import tkinter as tk
-import customtkinter as ctk
-from tkinter import messagebox
-from typing import Dict, List, Optional, Callable
+import re
+import sqlite3
+import sys
+import threading
+from array import array
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+NGRAM = 3
+# journal size that triggers a background rewrite of the snapshot
+JOURNAL_COMPACT_BYTES = 1 << 20
+# rows added between two persists during a bulk import
+IMPORT_BATCH = 5000
+# contacts parsed before the first paint, then per batch while the rest loads
+FIRST_PAINT_BATCH = 200
+LOAD_BATCH = 5000
+# contacts indexed per hold of the lock while the first search builds the trigram index
+GRAM_BUILD_BATCH = 2000
+LOAD_POLL_MS = 50
+# most results a fuzzy search returns
+FUZZY_TOP_K = 50
+# trailing digits that identify a phone number, and the fewest worth matching duplicates on
+PHONE_KEY_DIGITS = 10
+MIN_PHONE_KEY_DIGITS = 7
+# largest email-domain + name-token block compared pairwise for duplicates
+DUPLICATE_MAX_BLOCK = 50
+# how often ContactApp checks whether another instance changed the book
+WATCH_POLL_MS = 1000
+# how often ContactApp shows errors that background saves and merges queued for it
+ERROR_POLL_MS = 250
+
+
+# ContactManager._gram_upto once the trigram index holds every contact
+_ALL_IDS = float("inf")
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
 
 class Contact:
     """Represents a single contact with all their information."""
+    # slots instead of a per-instance __dict__: at a million contacts the dicts outweighed the data
+    FIELDS = ("name", "phone", "email", "address")
+    __slots__ = FIELDS
+
     def __init__(self, name: str, phone: str, email: str = "", address: str = ""):
         self.name = name
         self.phone = phone
@@ -24,386 +79,2099 @@ class Contact:
     @classmethod
     def from_dict(cls, data: Dict) -> "Contact":
         return cls(
-            name=data.get("name", ""),
-            phone=data.get("phone", ""),
-            email=data.get("email", ""),
-            address=data.get("address", ""),
+            name=_text(data.get("name", "")),
+            phone=_text(data.get("phone", "")),
+            email=_text(data.get("email", "")),
+            address=_text(data.get("address", "")),
         )
 
+    @classmethod
+    def from_pairs(cls, pairs: List[Tuple[str, object]]) -> "Contact":
+        contact = cls("", "")
+        for key, value in pairs:
+            if key in _FIELD_SET:
+                setattr(contact, key, _text(value))
+        return contact
+
+    def fields(self) -> Tuple[str, str, str, str]:
+        return self.name, self.phone, self.email, self.address
+
+
+def _text(value) -> str:
+    """A field as read from a file; hand-edited books may hold numbers (e.g. a phone) or null."""
+    if value.__class__ is str:
+        return value
+    return "" if value is None else str(value)
+
+
+_FIELD_SET = frozenset(Contact.FIELDS)
+_FIELD_KEYS = [f'"{key}": ' for key in Contact.FIELDS]
+_encode = json.encoder.encode_basestring_ascii
+_WHITESPACE = re.compile(r"\s*")
+_WORD = re.compile(r"\w+")
+_NON_DIGIT = re.compile(r"\D+")
+_ASCII_NON_DIGITS = {i: None for i in range(128) if not 48 <= i <= 57}
+_PHONE_LIKE = re.compile(r"[\d\s()+./-]+")
+
+
+def _decode_object(pairs: List[Tuple[str, object]]):
+    """json object hook: builds Contacts straight from parsed pairs, without a dict per record."""
+    if any(key in _FIELD_SET for key, _ in pairs):
+        return Contact.from_pairs(pairs)
+    return dict(pairs)
+
+
+def _dump_contacts(f: IO[str], rows: Iterable[Tuple[str, str, str, str]], seq: int = 0):
+    """Writes contact fields in the same layout as json.dump(..., indent=2), without building dicts."""
+    pad = "  " if seq == 0 else "    "
+    if seq:
+        f.write(f'{{\n  "seq": {seq},\n  "contacts": ')
+    sep = "[\n"
+    for row in rows:
+        f.write(sep)
+        f.write(f"{pad}{{\n")
+        f.write(",\n".join(f"{pad}  {_FIELD_KEYS[i]}{_encode(_text(value))}" for i, value in enumerate(row)))
+        f.write(f"\n{pad}}}")
+        sep = ",\n"
+    f.write("[]" if sep == "[\n" else f"\n{pad[:-2]}]")
+    if seq:
+        f.write("\n}")
+
+
+class ContactFileReader:
+    """Incrementally parses a contacts.json snapshot, yielding Contacts as they are read.
+
+    Accepts the plain list layout and the journaled {"seq": n, "contacts": [...]}
+    one; ``seq`` is filled in once it has been read.
+    """
+    CHUNK = 1 << 16
+
+    def __init__(self, f: IO[str]):
+        self._f = f
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder(object_pairs_hook=_decode_object)
+        self.seq = 0
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(self.CHUNK)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
 
-class ContactManager:
-    """Manages all contact operations including storage and retrieval."""
-    def __init__(self, filename: str = "contacts.json"):
-        self.filename = filename
-        self.contacts: List[Contact] = []
-        self.load_contacts()
-
-    def load_contacts(self):
-        if os.path.exists(self.filename):
+    def _peek(self) -> str:
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buf, self._pos)
+
+    def _expect(self, ch: str):
+        if self._peek() != ch:
+            raise self._error(f"Expecting {ch!r}")
+        self._pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
             try:
-                with open(self.filename, "r") as f:
-                    data = json.load(f)
-                    self.contacts = [Contact.from_dict(c) for c in data]
-            except (json.JSONDecodeError, FileNotFoundError):
-                self.contacts = []
-
-    def save_contacts(self):
-        try:
-            with open(self.filename, "w") as f:
-                json.dump([c.to_dict() for c in self.contacts], f, indent=2)
-        except Exception as e:
-            print(f"Error saving contacts: {e}")
-
-    def add_contact(self, name: str, phone: str, email: str = "", address: str = "") -> bool:
-        if not name.strip() or not phone.strip():
-            return False
-        if self.find_contact_by_name(name):
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a number ending exactly at the buffer edge may continue in the next chunk
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _next_member(self, close: str) -> bool:
+        ch = self._peek()
+        self._pos += 1
+        if ch == close:
             return False
-        contact = Contact(name.strip(), phone.strip(), email.strip(), address.strip())
-        self.contacts.append(contact)
-        self.save_contacts()
+        if ch != ",":
+            raise self._error("Expecting ',' delimiter")
         return True
 
-    def search_contacts(self, query: str) -> List[Contact]:
-        query = query.lower()
-        results: List[Contact] = []
-        for c in self.contacts:
-            if query in c.name.lower() or query in c.phone or query in c.email.lower():
-                results.append(c)
-        return results
+    def _items(self) -> Iterator:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if not self._next_member("]"):
+                return
+
+    def _members(self) -> Iterator:
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == "contacts":
+                yield from self._items()
+            else:
+                value = self._value()
+                if key == "seq":
+                    self.seq = value
+            if not self._next_member("}"):
+                return
 
-    def find_contact_by_name(self, name: str) -> Optional[Contact]:
-        for c in self.contacts:
-            if c.name.lower() == name.lower():
-                return c
+    def __iter__(self) -> Iterator[Contact]:
+        items = self._members() if self._peek() == "{" else self._items()
+        for item in items:
+            yield item if isinstance(item, Contact) else Contact.from_dict(item)
+
+
+class ImportReport:
+    """Running totals for a bulk import."""
+    def __init__(self):
+        self.added = 0
+        self.duplicates = 0
+        self.invalid = 0
+
+    @property
+    def processed(self) -> int:
+        return self.added + self.duplicates + self.invalid
+
+    def __repr__(self) -> str:
+        return f"ImportReport(added={self.added}, duplicates={self.duplicates}, invalid={self.invalid})"
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[List]:
+    it = iter(rows)
+    while True:
+        batch = list(itertools.islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _clean_fields(row: Dict) -> Optional[Tuple[str, str, str, str]]:
+    """Strips an imported row; None when name or phone is missing, like add_contact."""
+    name = (row.get("name") or "").strip()
+    phone = (row.get("phone") or "").strip()
+    if not name or not phone:
         return None
+    return name, phone, (row.get("email") or "").strip(), (row.get("address") or "").strip()
 
-    def update_contact(self, old_name: str, name: str, phone: str, email: str = "", address: str = "") -> bool:
-        contact = self.find_contact_by_name(old_name)
-        if not contact:
-            return False
-        if not name.strip() or not phone.strip():
+
+def read_csv(stream: IO[str]) -> Iterator[Dict]:
+    """Yields contact dicts from a CSV with name/phone/email/address columns (any case)."""
+    for row in csv.DictReader(stream):
+        yield {(k or "").strip().lower(): v for k, v in row.items()}
+
+
+def _vcard_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace(",", "\\,").replace(";", "\\;")
+
+
+def _vcard_split(value: str, sep: str = ";") -> List[str]:
+    """Splits on unescaped ``sep`` and unescapes each part."""
+    parts, current, chars = [], [], iter(value)
+    for ch in chars:
+        if ch == "\\":
+            nxt = next(chars, "")
+            current.append("\n" if nxt in ("n", "N") else nxt)
+        elif ch == sep:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    parts.append("".join(current))
+    return parts
+
+
+def _vcard_lines(stream: IO[str]) -> Iterator[str]:
+    """Yields logical vCard lines, undoing RFC 6350 line folding."""
+    pending = None
+    for raw in stream:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending is not None:
+        yield pending
+
+
+def read_vcards(stream: IO[str]) -> Iterator[Dict]:
+    """Yields contact dicts from a vCard (.vcf) stream, one card at a time."""
+    card: Optional[Dict] = None
+    for line in _vcard_lines(stream):
+        head, sep, value = line.partition(":")
+        if not sep:
+            continue
+        prop = head.split(";", 1)[0].split(".")[-1].upper()
+        if prop == "BEGIN" and value.upper() == "VCARD":
+            card = {}
+        elif card is None:
+            continue
+        elif prop == "END":
+            if not card.get("name") and card.get("n"):
+                card["name"] = " ".join(p for p in reversed(card["n"][:2]) if p)
+            card.pop("n", None)
+            yield card
+            card = None
+        elif prop == "FN":
+            card.setdefault("name", _vcard_split(value)[0])
+        elif prop == "N":
+            card.setdefault("n", _vcard_split(value))
+        elif prop == "TEL":
+            card.setdefault("phone", _vcard_split(value)[0])
+        elif prop == "EMAIL":
+            card.setdefault("email", _vcard_split(value)[0])
+        elif prop == "ADR":
+            card.setdefault("address", ", ".join(p for p in _vcard_split(value) if p))
+
+
+def write_contacts(contacts: Iterable[Contact], stream: IO[str], fmt: str = "csv") -> int:
+    """Streams contacts to ``stream`` as "csv" or "vcard"; returns the count."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(["name", "phone", "email", "address"])
+        for c in contacts:
+            writer.writerow([c.name, c.phone, c.email, c.address])
+            count += 1
+    elif fmt == "vcard":
+        for c in contacts:
+            lines = ["BEGIN:VCARD", "VERSION:3.0", f"FN:{_vcard_escape(c.name)}", f"N:{_vcard_escape(c.name)};;;;"]
+            lines.append(f"TEL:{_vcard_escape(c.phone)}")
+            if c.email:
+                lines.append(f"EMAIL:{_vcard_escape(c.email)}")
+            if c.address:
+                lines.append(f"ADR:;;{_vcard_escape(c.address)};;;;")
+            lines.append("END:VCARD")
+            stream.write("\r\n".join(lines) + "\r\n")
+            count += 1
+    else:
+        raise ValueError(f"Unknown contact export format: {fmt!r}")
+    return count
+
+
+def contact_format(filename: str) -> str:
+    """Guesses the import/export format from a file extension."""
+    return "vcard" if filename.lower().endswith((".vcf", ".vcard")) else "csv"
+
+
+def _edit_pattern(word: str) -> Tuple[Dict[str, int], int]:
+    """Precomputes the per-character bit masks _levenshtein matches against."""
+    masks: Dict[str, int] = {}
+    for i, ch in enumerate(word):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks, len(word)
+
+
+def _levenshtein(pattern: Tuple[Dict[str, int], int], text: str) -> int:
+    """Levenshtein distance via Myers' bit-parallel algorithm: one pass over ``text``."""
+    masks, m = pattern
+    if not m:
+        return len(text)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = full, 0, m
+    for ch in text:
+        eq = masks.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & full
+        mv = ph & xv & full
+    return score
+
+
+def _osa_distance(pattern: Tuple[Dict[str, int], int], text: str) -> int:
+    """Edit distance that also counts swapping two adjacent letters as one edit.
+
+    Hyyrö's extension of _levenshtein: the same single pass, plus a mask of
+    the positions where the previous text letter completes a swap.
+    """
+    masks, m = pattern
+    if not m:
+        return len(text)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, d0, previous, score = full, 0, 0, 0, m
+    for ch in text:
+        eq = masks.get(ch, 0)
+        swap = (((~d0) & eq) << 1) & previous
+        d0 = ((((eq & pv) + pv) ^ pv) | eq | mv | swap) & full
+        ph = mv | ~(d0 | pv)
+        mh = d0 & pv
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(d0 | ph)) & full
+        mv = ph & d0 & full
+        previous = eq
+    return score
+
+
+def _name_tokens(text: str) -> List[str]:
+    # digits-only tokens are numbering or phone noise, not something people misspell
+    return [t for t in _WORD.findall(text.lower()) if not t.isdigit()]
+
+
+def _fuzzy_tolerance(token: str) -> int:
+    if len(token) <= 2:
+        return 0
+    return 1 if len(token) <= 3 else 2 if len(token) <= 8 else 3
+
+
+class FuzzyNameIndex:
+    """Typo-tolerant name lookup backed by a BK-tree over normalized name tokens.
+
+    The tree prunes candidates with Levenshtein distance (a metric, so the
+    pruning never drops a match); survivors are ranked with _osa_distance,
+    which scores a swapped letter pair ("Jhon") as a single edit. New tokens
+    are only placed in the tree when a fuzzy search needs it, so bulk loads
+    pay a dict insert per name and nothing more.
+
+    The index has locks of its own, so searches need not hold the owner's
+    lock: ``add``/``discard`` only take the short ``_lock``, while placing
+    tokens in the tree and walking it happen under ``_tree_lock``. A slow
+    first search (it builds the tree) therefore never holds up edits.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tree_lock = threading.Lock()
+        self._ids: Dict[str, Set[int]] = {}
+        # BK-tree node: [token, {distance: child node}]
+        self._root: Optional[list] = None
+        self._placed: Set[str] = set()
+        self._pending: List[str] = []
+        self._dead = 0
+
+    def add(self, cid: int, name: str):
+        with self._lock:
+            for token in _name_tokens(name):
+                ids = self._ids.get(token)
+                if ids is None:
+                    self._ids[token] = ids = set()
+                    if token in self._placed:
+                        self._dead -= 1
+                    else:
+                        self._pending.append(token)
+                ids.add(cid)
+
+    def discard(self, cid: int, name: str):
+        with self._lock:
+            for token in _name_tokens(name):
+                ids = self._ids.get(token)
+                if ids is None:
+                    continue
+                ids.discard(cid)
+                if not ids:
+                    del self._ids[token]
+                    if token in self._placed:
+                        self._dead += 1
+
+    def _insert(self, token: str):
+        """Places ``token`` in the tree; called with _tree_lock held."""
+        if self._root is None:
+            self._root = [token, {}]
+            return
+        pattern = _edit_pattern(token)
+        node = self._root
+        while True:
+            d = _levenshtein(pattern, node[0])
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = [token, {}]
+                return
+            node = child
+
+    def _settle(self):
+        """Places the tokens added since the last search; called with _tree_lock held."""
+        with self._lock:
+            if self._dead > len(self._placed) // 2:
+                # mostly tombstones: rebuild from the live tokens
+                self._root, self._placed, self._dead = None, set(), 0
+                self._pending = list(self._ids)
+            pending, self._pending = self._pending, []
+        for token in pending:
+            with self._lock:
+                if token not in self._ids or token in self._placed:
+                    continue
+                self._placed.add(token)
+            # the distance computations run without _lock, so edits carry on meanwhile
+            self._insert(token)
+
+    def _within(self, token: str, tolerance: int) -> Iterator[str]:
+        """Live tokens within ``tolerance`` of ``token``; called with _tree_lock held."""
+        pattern = _edit_pattern(token)
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            word, children = stack.pop()
+            d = _levenshtein(pattern, word)
+            if d <= tolerance:
+                yield word
+            for distance, child in children.items():
+                if d - tolerance <= distance <= d + tolerance:
+                    stack.append(child)
+
+    def search(self, query: str, limit: int) -> List[Tuple[int, int]]:
+        """Returns up to ``limit`` (score, id) pairs, best first.
+
+        Every query token has to match some name token within its tolerance;
+        the score is the sum of those edit distances.
+        """
+        tokens = _name_tokens(query)
+        if not tokens:
+            return []
+        with self._tree_lock:
+            self._settle()
+            words = [list(self._within(token, _fuzzy_tolerance(token))) for token in tokens]
+        scores: Optional[Dict[int, int]] = None
+        for token, near in zip(tokens, words):
+            best: Dict[int, int] = {}
+            pattern = _edit_pattern(token)
+            for word in near:
+                with self._lock:
+                    # the word's names may all have gone since it was placed
+                    ids = list(self._ids.get(word, ()))
+                if not ids:
+                    continue
+                d = _osa_distance(pattern, word)
+                for cid in ids:
+                    if d < best.get(cid, d + 1):
+                        best[cid] = d
+            if scores is None:
+                scores = best
+            else:
+                scores = {cid: score + best[cid] for cid, score in scores.items() if cid in best}
+            if not scores:
+                return []
+        return heapq.nsmallest(limit, ((score, cid) for cid, score in scores.items()))
+
+
+def _phone_digits(text: str) -> str:
+    # translate drops ASCII punctuation in C; only other non-digits need the regex
+    digits = text.translate(_ASCII_NON_DIGITS)
+    return digits if not digits or digits.isdecimal() else _NON_DIGIT.sub("", digits)
+
+
+def phone_key(phone: str) -> str:
+    """Canonical phone key: the last PHONE_KEY_DIGITS digits, ignoring formatting.
+
+    Dropping everything before them also drops "+"/"00" prefixes, country
+    codes and trunk zeros, so "+1 (555) 010-2000" and "5550102000" agree.
+    """
+    return _phone_digits(phone)[-PHONE_KEY_DIGITS:]
+
+
+def _phone_query(query: str) -> str:
+    """The digits of a query that looks like a phone number, else ""."""
+    return _phone_digits(query) if _PHONE_LIKE.fullmatch(query) else ""
+
+
+def _letter_mask(token: str) -> int:
+    """The token's letters as bits (folded into 64); one edit flips at most two of them."""
+    mask = 0
+    for ch in token:
+        mask |= 1 << (ord(ch) & 63)
+    return mask
+
+
+def _similar_names(a: List[str], b: List[str], shapes: Dict[str, Tuple[int, int, int]]) -> bool:
+    """True when every token of the shorter name is within typo distance of a token of the other.
+
+    ``shapes`` maps each token to its length, _letter_mask and tolerance;
+    they rule out most token pairs before any distance is computed.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    for t in a:
+        if t in b:
+            continue
+        size, mask, tolerance = shapes[t]
+        pattern = None
+        for u in b:
+            u_size, u_mask, _ = shapes[u]
+            if abs(size - u_size) > tolerance or (mask ^ u_mask).bit_count() > 2 * tolerance:
+                continue
+            if pattern is None:
+                pattern = _edit_pattern(t)
+            if _osa_distance(pattern, u) <= tolerance:
+                break
+        else:
             return False
-        contact.name = name.strip()
-        contact.phone = phone.strip()
-        contact.email = email.strip()
-        contact.address = address.strip()
-        self.save_contacts()
-        return True
+    return bool(a)
+
+
+_LAST_PHONE_DIGITS = operator.itemgetter(slice(-PHONE_KEY_DIGITS, None))
+_PARTITION_TAIL = operator.itemgetter(2)
+
+
+def find_duplicate_groups(
+    ids: List[int], names: List[str], phones: List[str], emails: List[str], max_block: int = DUPLICATE_MAX_BLOCK
+) -> List[List[int]]:
+    """Groups the ids of contacts that are probably the same person.
+
+    Takes the book as columns: the i-th contact is ids[i], names[i] and so
+    on. Contacts are only compared within blocks: the same phone key or
+    email address merge outright, and contacts sharing an email domain and a
+    name token are compared pairwise for near-identical names. Blocks of the
+    latter kind larger than ``max_block`` (e.g. gmail.com + "john") are
+    skipped, which keeps the whole pass close to linear in the book size.
+    The per-contact string work runs a column at a time through map(), so
+    it stays in C.
+    """
+    # only contacts that were merged with another get an entry
+    parent: Dict[int, int] = {}
+
+    def find(x: int) -> int:
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while x != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(a: int, b: int):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            low = min(ra, rb)
+            parent[max(ra, rb)] = low
+            parent.setdefault(low, low)
+
+    def merge_equal(keys: Iterable[str], shortest: int):
+        first_of: Dict[str, int] = {}
+        for cid, key in zip(ids, keys):
+            if len(key) >= shortest:
+                first = first_of.setdefault(key, cid)
+                if first != cid:
+                    union(first, cid)
+
+    digits = list(map(str.translate, phones, itertools.repeat(_ASCII_NON_DIGITS)))
+    if not all(map(str.isdecimal, filter(None, digits))):
+        digits = list(map(_phone_digits, digits))
+    merge_equal(map(_LAST_PHONE_DIGITS, digits), MIN_PHONE_KEY_DIGITS)
+    emails = list(map(str.lower, map(str.strip, emails)))
+    merge_equal(emails, 1)
+
+    # email domain -> name token -> ids
+    blocks: Dict[str, Dict[str, List[int]]] = {}
+    tokens_of: Dict[int, List[str]] = {}
+    domains = map(_PARTITION_TAIL, map(str.rpartition, emails, itertools.repeat("@")))
+    for cid, domain, name in zip(ids, domains, names):
+        if not domain:
+            continue
+        tokens = tokens_of[cid] = _name_tokens(name)
+        by_token = blocks.get(domain)
+        if by_token is None:
+            by_token = blocks[domain] = {}
+        for token in set(tokens):
+            block = by_token.get(token)
+            if block is None:
+                by_token[token] = [cid]
+            elif len(block) <= max_block:
+                block.append(cid)
+    shapes = {
+        token: (len(token), _letter_mask(token), _fuzzy_tolerance(token))
+        for token in {token for tokens in tokens_of.values() for token in tokens}
+    }
+    for block in itertools.chain.from_iterable(by_token.values() for by_token in blocks.values()):
+        if not 1 < len(block) <= max_block:
+            continue
+        for i, a in enumerate(block):
+            a_tokens = tokens_of[a]
+            for b in block[i + 1:]:
+                if _similar_names(a_tokens, tokens_of[b], shapes) and find(a) != find(b):
+                    union(a, b)
+    groups: Dict[int, List[int]] = {}
+    for cid in parent:
+        groups.setdefault(find(cid), []).append(cid)
+    return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=lambda g: g[0])
+
+
+FileSignature = Tuple[int, int, int]
+
+
+def _signature(st: os.stat_result) -> FileSignature:
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _file_signature(path: str) -> Optional[FileSignature]:
+    """(mtime, size, inode) of ``path``, or None if it does not exist."""
+    try:
+        return _signature(os.stat(path))
+    except FileNotFoundError:
+        return None
 
-    def delete_contact(self, name: str) -> bool:
-        contact = self.find_contact_by_name(name)
-        if not contact:
+
+class FileLock:
+    """Exclusive lock shared by every process that opens the same book.
+
+    Saves replace the data files, so the lock is held on a separate file
+    that is never replaced. It is re-entrant per process: threads queue on
+    an RLock and only the outermost acquire takes the OS-level lock.
+    """
+    RETRY_SECONDS = 0.05
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._f: Optional[IO[bytes]] = None
+
+    def _os_lock(self, f: IO[bytes], blocking: bool) -> bool:
+        if fcntl is not None:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                return False
+            return True
+        while True:
+            f.seek(0)
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(self.RETRY_SECONDS)
+
+    def _os_unlock(self, f: IO[bytes]):
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if not self._lock.acquire(blocking):
             return False
-        self.contacts.remove(contact)
-        self.save_contacts()
+        if self._depth == 0:
+            f = None
+            try:
+                f = open(self.path, "a+b")
+                locked = self._os_lock(f, blocking)
+            except BaseException:
+                if f is not None:
+                    f.close()
+                self._lock.release()
+                raise
+            if not locked:
+                f.close()
+                self._lock.release()
+                return False
+            self._f = f
+        self._depth += 1
         return True
 
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self._os_unlock(self._f)
+            finally:
+                self._f.close()
+                self._f = None
+        self._lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class TrigramIndex:
+    """Trigram -> ids of the contacts containing it, for substring search.
+
+    Postings are arrays of 4-byte ids; a set would cost about 60 bytes an
+    entry, which at a million contacts comes to gigabytes. Ids are never
+    taken out: a changed or deleted contact leaves stale entries that
+    search_contacts drops when it confirms each candidate, and ``worn``
+    tells the owner when they have piled up enough to rebuild.
+    """
+
+    # a posting this many times longer than the candidates left costs more
+    # to intersect with than confirming those candidates does
+    INTERSECT_RATIO = 16
+
+    def __init__(self):
+        self._postings: Dict[str, array] = {}
+        self._entries = 0
+        self._stale = 0
+
+    def add(self, cid: int, grams: Set[str]):
+        postings = self._postings
+        for gram in grams:
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = array("I", (cid,))
+            else:
+                ids.append(cid)
+        self._entries += len(grams)
+
+    def discard(self, grams: Set[str]):
+        self._stale += len(grams)
 
-class ContactCard(ctk.CTkFrame):
-    """Single contact card used in the scrollable list."""
+    @property
+    def worn(self) -> bool:
+        return self._stale * 2 > self._entries
+
+    def candidates(self, text: str) -> Set[int]:
+        """Ids that may contain ``text`` (at least NGRAM long); every id that does is among them."""
+        postings = sorted((self._postings.get(g, ()) for g in _ngrams(text)), key=len)
+        ids = set(postings[0])
+        for other in postings[1:]:
+            if not ids or len(other) > self.INTERSECT_RATIO * len(ids):
+                break
+            ids.intersection_update(other)
+        return ids
+
+
+class PositionIndex:
+    """List positions of the live ids, for ids handed out in increasing order.
+
+    A Fenwick tree counts the ids still alive, so appending an id, dropping
+    one and finding the id at a position are each O(log n), however many
+    contacts were deleted from the middle of the list.
+    """
+
+    def __init__(self):
+        # 1-based; node i counts the live ids in (i - lowbit(i), i]
+        self._tree = [0]
+        self._live = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    def append(self, cid: int):
+        i = len(self._tree)
+        if cid != i - 1:
+            raise ValueError(f"id {cid} is not the next id ({i - 1})")
+        total = 1
+        j, stop = i - 1, i - (i & -i)
+        while j > stop:
+            total += self._tree[j]
+            j -= j & -j
+        self._tree.append(total)
+        self._live += 1
+
+    def discard(self, cid: int):
+        i = cid + 1
+        while i < len(self._tree):
+            self._tree[i] -= 1
+            i += i & -i
+        self._live -= 1
+
+    def select(self, position: int) -> int:
+        """The id at ``position`` (0-based) among the live ids."""
+        if not 0 <= position < self._live:
+            raise IndexError(position)
+        pos, remaining = 0, position + 1
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] < remaining:
+                pos = nxt
+                remaining -= self._tree[nxt]
+            step >>= 1
+        return pos
+
+
+class BackgroundWriter:
+    """Runs a save task on a worker thread, coalescing bursts of requests.
+
+    Requests arriving within COALESCE_SECONDS of each other are served by a
+    single call to ``save``; failures are passed to ``on_error``, on the
+    worker thread, so it must not wait on a thread that may be flushing.
+    ``close`` writes what is pending and ends the thread.
+    """
+    COALESCE_SECONDS = 0.2
+
+    def __init__(self, save: Callable[[], None], on_error: Callable[[Exception], None]):
+        self._save = save
+        self._on_error = on_error
+        self._cond = threading.Condition()
+        self._requested = 0
+        self._completed = 0
+        self._urgent = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="contacts-writer", daemon=True)
+        self._thread.start()
+
+    def request(self):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("the writer is closed")
+            self._requested += 1
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Writes any pending request now and waits for it to finish."""
+        with self._cond:
+            target = self._requested
+            if self._completed < target:
+                self._urgent = True
+                self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._completed >= target, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Writes any pending request, then stops the thread; False if ``timeout`` ran out first."""
+        with self._cond:
+            self._closed = self._urgent = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._requested > self._completed or self._closed)
+                if self._requested == self._completed:
+                    return
+                # let the rest of a burst arrive unless someone is waiting on a flush
+                self._cond.wait_for(lambda: self._urgent, self.COALESCE_SECONDS)
+                self._urgent = self._closed
+                target = self._requested
+            try:
+                self._save()
+            except Exception as e:
+                self._on_error(e)
+            with self._cond:
+                self._completed = target
+                self._cond.notify_all()
+
+
+class ContactManager:
+    """Manages all contact operations including storage and retrieval."""
     def __init__(
         self,
-        master: ctk.CTkBaseClass,
-        contact: Contact,
-        on_select: Callable[[Contact], None],
-        is_selected: bool = False,
-        **kwargs,
+        filename: str = "contacts.json",
+        journal: bool = False,
+        compact_threshold: int = JOURNAL_COMPACT_BYTES,
+        background: bool = False,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        autoload: bool = True,
     ):
-        super().__init__(master, corner_radius=10, fg_color=("#F5F6F8", "#1F1F1F"), **kwargs)
-        self.contact = contact
-        self.on_select = on_select
-        self.configure(border_width=0)
-        self._update_selected_ui(is_selected)
-        self.grid_columnconfigure(0, weight=1)
-
-        name_label = ctk.CTkLabel(self, text=contact.name, font=("Segoe UI", 14, "bold"))
-        phone_label = ctk.CTkLabel(self, text=contact.phone, font=("Segoe UI", 12))
-        email_label = ctk.CTkLabel(self, text=contact.email or "No email", font=("Segoe UI", 12))
-        name_label.grid(row=0, column=0, sticky="w", padx=12, pady=(4, 0))
-        phone_label.grid(row=1, column=0, sticky="w", padx=12)
-        email_label.grid(row=2, column=0, sticky="w", padx=12, pady=(0, 4))
-
-        for widget in (self, name_label, phone_label, email_label):
-            widget.bind("<Button-1>", self._handle_click)
-
-    def _handle_click(self, _event=None):
-        self.on_select(self.contact)
-
-    def _update_selected_ui(self, is_selected: bool):
-        if is_selected:
-            self.configure(border_width=2, border_color=("#3B8ED0", "#1F6AA5"))
+        self.filename = filename
+        # journal mode appends each mutation to <filename>.log instead of rewriting the file
+        self.journal = journal
+        self.journal_filename = filename + ".log"
+        self.compact_threshold = compact_threshold
+        self._seq = 0
+        self._snapshot_seq = 0
+        self._journal_bytes = 0
+        self._journal_lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        # serializes writes across every process sharing the book; always taken before self.lock
+        self._file_lock = FileLock(filename + ".lock")
+        # the snapshot and journal as this instance last read or wrote them, to spot other writers
+        self._snapshot_stat: Optional[FileSignature] = None
+        self._journal_stat: Optional[FileSignature] = None
+        # snapshot mode: lowercase names edited here since the last save; they win merges with the file
+        self._dirty: Set[str] = set()
+        # persistence failures go here; without a callback they are printed
+        self.on_error = on_error
+        # journal records already applied in memory but not yet appended to the log
+        self._pending_records: List[Dict] = []
+        self._pending_lock = threading.Lock()
+        # background mode hands writes to a thread that coalesces bursts of edits
+        self._writer = BackgroundWriter(self._write_pending, self._report_error) if background else None
+        # id -> Contact, kept in insertion order so it doubles as the list order
+        self._records: Dict[int, Contact] = {}
+        # list position -> id, so a window of the list is found without copying it
+        self._positions = PositionIndex()
+        # lowercase name -> ids carrying that name, ascending (first = earliest in list)
+        self._name_index: Dict[str, List[int]] = {}
+        # trigrams of lowercased name/email, phone digits or unusual raw phone; built by the
+        # first search that needs it, so loading the book never pays for it
+        self._gram_index: Optional[TrigramIndex] = None
+        # ids below this are in _gram_index; infinite once it holds the whole book
+        self._gram_upto: float = 0
+        self._gram_build_lock = threading.Lock()
+        self._fuzzy = FuzzyNameIndex()
+        # phone_key -> ids
+        self._phone_index: Dict[str, Set[int]] = {}
+        self._next_id = 0
+        # bumped on every change to the book so callers can tell cached results are stale
+        self.version = 0
+        # searches may run off the Tk main thread, so reads and writes share one lock
+        self.lock = threading.RLock()
+        # cleared while iter_load is streaming the book in
+        self._loaded = threading.Event()
+        self._loaded.set()
+        if autoload:
+            self.load_contacts()
+
+    @property
+    def contacts(self) -> List[Contact]:
+        """A copy of the whole list: O(n), for the few callers that need every contact at once.
+
+        Showing the book only needs len() and page().
+        """
+        with self.lock:
+            return list(self._records.values())
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def page(self, start: int, stop: int) -> List[Contact]:
+        """The contacts at list positions ``start`` up to ``stop``, at O(log n) each."""
+        with self.lock:
+            return [
+                self._records[self._positions.select(i)]
+                for i in range(max(start, 0), min(stop, len(self._records)))
+            ]
+
+    def _reset(self):
+        self._records = {}
+        self._positions = PositionIndex()
+        self._name_index = {}
+        self._gram_index = None
+        self._gram_upto = 0
+        self._fuzzy = FuzzyNameIndex()
+        self._phone_index = {}
+        self._next_id = 0
+        self._dirty = set()
+        self.version += 1
+
+    @staticmethod
+    def _search_grams(contact: Contact) -> Set[str]:
+        """Trigrams of the lowercased name and email and of the phone's digits.
+
+        The raw phone is only added when it holds more than digits and
+        formatting: a query found in any other phone is phone-like, and
+        search_contacts looks those up by their digits.
+        """
+        phone = contact.phone
+        grams = _ngrams(contact.name.lower()) | _ngrams(contact.email.lower()) | _ngrams(_phone_digits(phone))
+        if not _PHONE_LIKE.fullmatch(phone):
+            grams |= _ngrams(phone)
+        return grams
+
+    @staticmethod
+    def _matches(contact: Contact, query: str, digits: str = "") -> bool:
+        """Substring match on name/phone/email; ``digits`` also matches the phone ignoring formatting."""
+        return (
+            query in contact.name.lower()
+            or query in contact.phone
+            or query in contact.email.lower()
+            or bool(digits) and digits in _phone_digits(contact.phone)
+        )
+
+    def _index(self, cid: int, contact: Contact):
+        self._index_name(cid, contact.name)
+        self._fuzzy.add(cid, contact.name)
+        self._phone_index.setdefault(phone_key(contact.phone), set()).add(cid)
+        if cid < self._gram_upto:
+            self._gram_index.add(cid, self._search_grams(contact))
+
+    def _unindex(self, cid: int, contact: Contact):
+        self._unindex_name(cid, contact.name)
+        self._fuzzy.discard(cid, contact.name)
+        key = phone_key(contact.phone)
+        ids = self._phone_index[key]
+        ids.discard(cid)
+        if not ids:
+            del self._phone_index[key]
+        if cid < self._gram_upto:
+            self._gram_index.discard(self._search_grams(contact))
+            if self._gram_upto == _ALL_IDS and self._gram_index.worn:
+                # mostly stale entries: the next search builds a fresh index
+                self._gram_index, self._gram_upto = None, 0
+
+    def _index_name(self, cid: int, name: str):
+        ids = self._name_index.setdefault(name.lower(), [])
+        if not ids or ids[-1] < cid:
+            ids.append(cid)
         else:
-            self.configure(border_width=0)
-
-
-class ContactDialog(ctk.CTkToplevel):
-    """Dialog window for adding/updating contacts."""
-    def __init__(self, parent, title: str, contact: Optional[Contact] = None):
-        super().__init__(parent)
-        self.title(title)
-        self.geometry("420x380")
-        self.resizable(False, False)
-        self.grab_set()
-        self.result = None
-
-        self.update_idletasks()
-        if parent is not None:
-            x = parent.winfo_rootx() + (parent.winfo_width() // 2) - (420 // 2)
-            y = parent.winfo_rooty() + (parent.winfo_height() // 2) - (380 // 2)
-            self.geometry(f"+{x}+{y}")
-
-        container = ctk.CTkFrame(self, corner_radius=12)
-        container.pack(fill="both", expand=True, padx=20, pady=20)
-
-        self.name_var = ctk.StringVar(value=contact.name if contact else "")
-        self.phone_var = ctk.StringVar(value=contact.phone if contact else "")
-        self.email_var = ctk.StringVar(value=contact.email if contact else "")
-        self.address_var = ctk.StringVar(value=contact.address if contact else "")
-
-        ctk.CTkLabel(container, text="Name").grid(row=0, column=0, sticky="w")
-        name_entry = ctk.CTkEntry(container, textvariable=self.name_var, width=260)
-        name_entry.grid(row=1, column=0, sticky="we", pady=(0, 10))
-        name_entry.focus()
-
-        ctk.CTkLabel(container, text="Phone").grid(row=2, column=0, sticky="w")
-        phone_entry = ctk.CTkEntry(container, textvariable=self.phone_var, width=260)
-        phone_entry.grid(row=3, column=0, sticky="we", pady=(0, 10))
-
-        ctk.CTkLabel(container, text="Email").grid(row=4, column=0, sticky="w")
-        email_entry = ctk.CTkEntry(container, textvariable=self.email_var, width=260)
-        email_entry.grid(row=5, column=0, sticky="we", pady=(0, 10))
-
-        ctk.CTkLabel(container, text="Address").grid(row=6, column=0, sticky="w")
-        self.address_entry = ctk.CTkEntry(container, textvariable=self.address_var, width=260)
-        self.address_entry.grid(row=7, column=0, sticky="we", pady=(0, 12))
-
-        btns = ctk.CTkFrame(container)
-        btns.grid(row=8, column=0, pady=(4, 0), sticky="we")
-        btns.grid_columnconfigure(0, weight=1)
-        btns.grid_columnconfigure(1, weight=1)
-        ctk.CTkButton(btns, text="Save", command=self._save).grid(row=0, column=0, padx=(0, 6), sticky="we")
-        ctk.CTkButton(btns, text="Cancel", fg_color=("#E5E7EB", "#2b2b2b"), text_color=("#111827", "#F3F4F6"), command=self._cancel).grid(row=0, column=1, sticky="we")
-
-        container.grid_columnconfigure(0, weight=1)
-
-        self.bind("<Return>", lambda e: self._save())
-        self.bind("<Escape>", lambda e: self._cancel())
-        self.wait_visibility()
-        self.wait_window(self)
-
-    def _save(self):
-        name = self.name_var.get().strip()
-        phone = self.phone_var.get().strip()
-        email = self.email_var.get().strip()
-        address = self.address_var.get().strip()
-        if not name or not phone:
-            messagebox.showerror("Error", "Name and phone number are required!")
-            return
-        self.result = (name, phone, email, address)
-        self.destroy()
+            bisect.insort(ids, cid)
 
-    def _cancel(self):
-        self.destroy()
+    def _unindex_name(self, cid: int, name: str):
+        key = name.lower()
+        ids = self._name_index.get(key)
+        if not ids:
+            return
+        i = bisect.bisect_left(ids, cid)
+        if i < len(ids) and ids[i] == cid:
+            if len(ids) == 1:
+                del self._name_index[key]
+            else:
+                del ids[i]
+
+    def _insert(self, contact: Contact) -> int:
+        cid = self._next_id
+        self._next_id += 1
+        self.version += 1
+        self._records[cid] = contact
+        self._positions.append(cid)
+        self._index(cid, contact)
+        return cid
+
+    def _lookup_id(self, name: str) -> Optional[int]:
+        ids = self._name_index.get(name.lower())
+        return ids[0] if ids else None
+
+    def _replace(self, cid: int, name: str, phone: str, email: str, address: str):
+        contact = self._records[cid]
+        self.version += 1
+        self._unindex(cid, contact)
+        contact.name = name
+        contact.phone = phone
+        contact.email = email
+        contact.address = address
+        self._index(cid, contact)
+
+    def _remove(self, cid: int):
+        self.version += 1
+        self._positions.discard(cid)
+        self._unindex(cid, self._records.pop(cid))
+
+    def _apply(self, record: Dict):
+        """Re-applies one journal record to the in-memory book.
+
+        Records act on names and applying one twice changes nothing, so every
+        process replaying the same log ends up with the same book even when
+        their edits interleave.
+        """
+        op = record["op"]
+        if op == "delete":
+            cid = self._lookup_id(record["name"])
+            if cid is not None:
+                self._remove(cid)
+            return
+        fields = record["c"]
+        cid = self._lookup_id(record["old"] if op == "update" else fields[0])
+        target = self._lookup_id(fields[0])
+        if cid is None:
+            cid = target
+        elif target is not None and target != cid:
+            # renamed onto a name another process added meanwhile: keep one contact
+            self._remove(cid)
+            cid = target
+        if cid is None:
+            self._insert(Contact(*fields))
+        else:
+            self._replace(cid, *fields)
 
+    @staticmethod
+    def _record_names(record: Dict) -> List[str]:
+        if record["op"] == "delete":
+            return [record["name"]]
+        if record["op"] == "update":
+            return [record["old"], record["c"][0]]
+        return [record["c"][0]]
 
-class ContactApp:
-    """Main GUI application (CustomTkinter)."""
+    def _write_lock(self):
+        """Taken by mutators ahead of self.lock: without a writer thread they save inline."""
+        return self._file_lock if self._writer is None else contextlib.nullcontext()
 
-    def __init__(self):
-        # Theming
-        ctk.set_appearance_mode("System")
-        ctk.set_default_color_theme("blue")
-
-        self.root = ctk.CTk()
-        self.root.title("Contact Management System")
-        self.root.geometry("900x650")
-        self.root.resizable(False, False)
-
-        self.manager = ContactManager()
-        self.selected_contact_name: Optional[str] = None
-        self.card_widgets: Dict[str, ContactCard] = {}
-
-        self.root.grid_columnconfigure(1, weight=1)
-        self.root.grid_rowconfigure(1, weight=1)
-
-        header = ctk.CTkFrame(self.root, corner_radius=0, fg_color=("#FFFFFF", "#101010"), height=64)
-        header.grid(row=0, column=0, columnspan=2, sticky="nsew")
-        header.grid_columnconfigure(0, weight=1)
-        title = ctk.CTkLabel(header, text="Contact Management System", font=("Segoe UI", 20, "bold"))
-        title.grid(row=0, column=0, padx=20, pady=16, sticky="w")
-
-        self.theme_selector = ctk.CTkSegmentedButton(
-            header,
-            values=["System", "Light", "Dark"],
-            command=self._on_theme_change,
+    def load_contacts(self):
+        for _ in self.iter_load():
+            pass
+
+    def iter_load(self, batch_size: int = LOAD_BATCH, first_batch: int = FIRST_PAINT_BATCH) -> Iterator[int]:
+        """Streams the book in, yielding the number of contacts loaded after each batch.
+
+        The lock is released between batches, so contacts are searchable as
+        soon as they are parsed. Mutations wait until the load has finished.
+        """
+        if self._writer is not None:
+            # queued writes take the lock on the writer thread, so settle them before taking it here
+            self._writer.flush()
+        self._loaded.clear()
+        try:
+            with self.lock:
+                self._reset()
+                self._seq = self._snapshot_seq = 0
+                self._snapshot_stat = self._journal_stat = None
+                self._journal_bytes = 0
+            if os.path.exists(self.filename):
+                reader = None
+                stat = None
+                try:
+                    with open(self.filename, "r") as f:
+                        stat = _signature(os.fstat(f.fileno()))
+                        reader = ContactFileReader(f)
+                        contacts = iter(reader)
+                        size = first_batch
+                        while True:
+                            batch = list(itertools.islice(contacts, size))
+                            if not batch:
+                                break
+                            with self.lock:
+                                for c in batch:
+                                    self._insert(c)
+                                count = len(self._records)
+                            yield count
+                            size = batch_size
+                except (json.JSONDecodeError, FileNotFoundError):
+                    reader = None
+                    with self.lock:
+                        self._reset()
+                # journaled snapshots record the last journal record folded into them
+                with self.lock:
+                    self._seq = self._snapshot_seq = reader.seq if reader is not None else 0
+                    self._snapshot_stat = stat
+            # the journal, and anything another process saved while we streamed
+            with self._file_lock:
+                self._catch_up()
+            with self.lock:
+                count = len(self._records)
+            yield count
+        finally:
+            self._loaded.set()
+
+    def has_external_changes(self) -> bool:
+        """Cheap check for writes by another process since this instance last read or wrote the book."""
+        return (
+            _file_signature(self.filename) != self._snapshot_stat
+            or _file_signature(self.journal_filename) != self._journal_stat
         )
-        self.theme_selector.set("System")
-        self.theme_selector.grid(row=0, column=1, padx=20)
-
-        controls = ctk.CTkFrame(self.root, corner_radius=12)
-        controls.grid(row=1, column=0, sticky="nsew", padx=(16, 8), pady=(12, 12))
-        controls.grid_rowconfigure(3, weight=0)
-        controls.grid_rowconfigure(6, weight=1)
-        controls.grid_columnconfigure(0, weight=1)
-
-        ctk.CTkLabel(controls, text="Search").grid(row=0, column=0, sticky="w", padx=8, pady=(8, 4))
-        self.search_var = ctk.StringVar()
-        self.search_entry = ctk.CTkEntry(controls, textvariable=self.search_var, placeholder_text="Search by name, phone, email")
-        self.search_entry.grid(row=1, column=0, sticky="we", padx=8, pady=(0, 12))
-        self.search_entry.bind("<KeyRelease>", self.on_search_change)
-
-        btn_add = ctk.CTkButton(controls, text="Add Contact", command=self.add_contact_dialog)
-        btn_update = ctk.CTkButton(controls, text="Update Contact", command=self.update_contact_dialog)
-        btn_delete = ctk.CTkButton(controls, text="Delete Contact", command=self.delete_contact_dialog, fg_color="#C24141")
-        btn_clear = ctk.CTkButton(controls, text="Clear Search", command=self.clear_search, fg_color="gray")
-
-        btn_add.grid(row=2, column=0, sticky="we", padx=8, pady=(0, 8))
-        btn_update.grid(row=3, column=0, sticky="we", padx=8, pady=(0, 8))
-        btn_delete.grid(row=4, column=0, sticky="we", padx=8, pady=(0, 8))
-        btn_clear.grid(row=5, column=0, sticky="we", padx=8)
-
-        list_frame = ctk.CTkFrame(self.root, corner_radius=12)
-        list_frame.grid(row=1, column=1, sticky="nsew", padx=(8, 16), pady=(12, 12))
-        list_frame.grid_rowconfigure(1, weight=1)
-        list_frame.grid_columnconfigure(0, weight=1)
-
-        ctk.CTkLabel(list_frame, text="Contacts", font=("Segoe UI", 14, "bold")).grid(row=0, column=0, sticky="w", padx=12, pady=(10, 0))
-        self.scroll = ctk.CTkScrollableFrame(list_frame, corner_radius=12)
-        self.scroll.grid(row=1, column=0, sticky="nsew", padx=10, pady=6)
-        self.scroll.grid_columnconfigure(0, weight=1)
-
-        details = ctk.CTkFrame(self.root, corner_radius=12)
-        details.grid(row=2, column=0, columnspan=2, sticky="we", padx=16, pady=(0, 16))
-        details.grid_columnconfigure(1, weight=1)
-
-        ctk.CTkLabel(details, text="Name:").grid(row=0, column=0, sticky="w")
-        self.detail_name = ctk.CTkLabel(details, text="", font=("Segoe UI", 12, "bold"))
-        self.detail_name.grid(row=0, column=1, sticky="w")
-
-        ctk.CTkLabel(details, text="Phone:").grid(row=1, column=0, sticky="w")
-        self.detail_phone = ctk.CTkLabel(details, text="")
-        self.detail_phone.grid(row=1, column=1, sticky="w")
-
-        ctk.CTkLabel(details, text="Email:").grid(row=2, column=0, sticky="w")
-        self.detail_email = ctk.CTkLabel(details, text="")
-        self.detail_email.grid(row=2, column=1, sticky="w")
-
-        ctk.CTkLabel(details, text="Address:").grid(row=3, column=0, sticky="w")
-        self.detail_address = ctk.CTkLabel(details, text="", wraplength=700, justify="left")
-        self.detail_address.grid(row=3, column=1, sticky="w")
-
-        self.refresh_contact_list()
-
-    def _on_theme_change(self, value: str):
-        ctk.set_appearance_mode(value)
-
-    def _select_contact(self, contact: Contact):
-        previous = self.selected_contact_name
-        self.selected_contact_name = contact.name
-        # update details
-        self.show_contact_details(contact)
-        # update cards highlight
-        for name, card in self.card_widgets.items():
-            card._update_selected_ui(name == self.selected_contact_name)
-
-    def refresh_contact_list(self, contacts: Optional[List[Contact]] = None):
-        # clear
-        for child in list(self.scroll.children.values()):
-            child.destroy()
-        self.card_widgets.clear()
-
-        if contacts is None:
-            contacts = self.manager.contacts
-
-        for idx, contact in enumerate(contacts):
-            card = ContactCard(self.scroll, contact, on_select=self._select_contact)
-            card.grid(row=idx, column=0, sticky="we", padx=4, pady=4)
-            self.card_widgets[contact.name] = card
-
-    def show_contact_details(self, contact: Contact):
-        self.detail_name.configure(text=contact.name)
-        self.detail_phone.configure(text=contact.phone)
-        self.detail_email.configure(text=contact.email or "Not provided")
-        self.detail_address.configure(text=contact.address or "Not provided")
-
-    def clear_details(self):
-        self.detail_name.configure(text="")
-        self.detail_phone.configure(text="")
-        self.detail_email.configure(text="")
-        self.detail_address.configure(text="")
-        self.selected_contact_name = None
-
-    def on_search_change(self, _event=None):
-        query = self.search_var.get()
-        if query.strip():
-            results = self.manager.search_contacts(query)
-            self.refresh_contact_list(results)
-        else:
-            self.refresh_contact_list()
-
-    def clear_search(self):
-        self.search_var.set("")
-        self.refresh_contact_list()
-
-    def add_contact_dialog(self):
-        dialog = ContactDialog(self.root, "Add Contact")
-        if dialog.result:
-            name, phone, email, address = dialog.result
-            if self.manager.add_contact(name, phone, email, address):
-                self.refresh_contact_list()
-                messagebox.showinfo("Success", f"Contact '{name}' added successfully!")
+
+    def refresh(self, blocking: bool = True) -> int:
+        """Merges in what other processes saved to the book; returns how many contacts changed.
+
+        Only contacts that differ from the files are re-indexed. With
+        ``blocking=False`` it returns 0 at once if the book is still loading
+        or another writer holds the lock.
+        """
+        if not self._loaded.wait(None if blocking else 0) or not self._file_lock.acquire(blocking):
+            return 0
+        try:
+            return self._catch_up()
+        finally:
+            self._file_lock.release()
+
+    def _catch_up(self) -> int:
+        """Folds in other processes' writes; called with the file lock held.
+
+        The snapshot is parsed before self.lock is taken, so searches and
+        edits are only held up while the differences are applied.
+        """
+        changed = 0
+        snapshot_stat = _file_signature(self.filename)
+        # self._seq only moves under the file lock, so it is safe to read here
+        if snapshot_stat != self._snapshot_stat and self.journal and self._disk_snapshot_seq() <= self._seq:
+            self._snapshot_stat = snapshot_stat  # our own compaction, or nothing we have not seen
+        elif snapshot_stat != self._snapshot_stat:
+            snapshot = self._read_snapshot()
+            with self.lock:
+                # in journal mode unwritten local edits are re-applied below instead of protected
+                changed += self._merge_snapshot(*snapshot, set() if self.journal else self._dirty)
+        with self.lock:
+            if _file_signature(self.journal_filename) != self._journal_stat:
+                changed += self._replay_journal()
+            if changed:
+                # our unwritten records will land after theirs in the journal, so apply them last here too
+                with self._pending_lock:
+                    for record in self._pending_records:
+                        self._apply(record)
+        return changed
+
+    def _disk_snapshot_seq(self) -> int:
+        try:
+            with open(self.filename, "r") as f:
+                reader = ContactFileReader(f)
+                # "seq" is written ahead of the contacts, so one contact is enough to learn it
+                next(iter(reader), None)
+                return reader.seq
+        except (json.JSONDecodeError, FileNotFoundError):
+            return 0
+
+    def _read_snapshot(self) -> Tuple[Optional[Dict[str, List[Contact]]], Optional[FileSignature], int]:
+        """Parses the snapshot into lowercase name -> contacts, with its signature and seq.
+
+        The contacts are None when the file cannot be parsed.
+        """
+        disk: Dict[str, List[Contact]] = {}
+        stat = None
+        try:
+            with open(self.filename, "r") as f:
+                stat = _signature(os.fstat(f.fileno()))
+                reader = ContactFileReader(f)
+                for c in reader:
+                    disk.setdefault(c.name.lower(), []).append(c)
+                return disk, stat, reader.seq
+        except FileNotFoundError:
+            return disk, None, 0
+        except json.JSONDecodeError:
+            return None, stat, 0
+
+    def _merge_snapshot(
+        self, disk: Optional[Dict[str, List[Contact]]], stat: Optional[FileSignature], seq: int, keep: Set[str]
+    ) -> int:
+        """Makes the book match a parsed snapshot, touching only contacts that differ.
+
+        Contacts whose lowercase name is in ``keep`` have local edits that
+        win over the file. Returns the number of contacts changed.
+        """
+        self._snapshot_stat = stat
+        if disk is None:
+            return 0  # an unreadable file contributes nothing; the next save replaces it
+        changed = 0
+        for cid, contact in list(self._records.items()):
+            key = contact.name.lower()
+            if key in keep:
+                continue
+            theirs = disk.get(key)
+            if not theirs:
+                self._remove(cid)
             else:
-                if self.manager.find_contact_by_name(name):
-                    messagebox.showerror("Error", f"Contact with name '{name}' already exists!")
-                else:
-                    messagebox.showerror("Error", "Name and phone number are required!")
+                fields = theirs.pop(0).fields()
+                if fields == contact.fields():
+                    continue
+                self._replace(cid, *fields)
+            changed += 1
+        for key, rest in disk.items():
+            if key not in keep:
+                for contact in rest:
+                    self._insert(contact)
+                    changed += 1
+        self._snapshot_seq = max(self._snapshot_seq, seq)
+        self._seq = max(self._seq, seq)
+        return changed
+
+    def _replay_journal(self) -> int:
+        """Applies journal records newer than self._seq; returns how many were applied."""
+        self._journal_bytes = 0
+        self._journal_stat = None
+        try:
+            f = open(self.journal_filename, "rb")
+        except FileNotFoundError:
+            return 0
+        valid = applied = 0
+        with f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(raw)
+                    seq = record["s"]
+                except (ValueError, KeyError, TypeError):
+                    break
+                valid += len(raw)
+                if seq > self._seq:
+                    self._apply(record)
+                    self._seq = seq
+                    applied += 1
+            size = f.seek(0, os.SEEK_END)
+        if size > valid:
+            # torn record from an interrupted append (writers hold the file lock, so it is not in flight)
+            os.truncate(self.journal_filename, valid)
+        self._journal_bytes = valid
+        self._journal_stat = _file_signature(self.journal_filename)
+        return applied
+
+    def _write_snapshot(self, seq: int, rows: List[Tuple[str, str, str, str]]):
+        with self._file_lock, self._snapshot_lock:
+            if seq < self._snapshot_seq or self.journal and seq < self._disk_snapshot_seq():
+                return  # a newer snapshot has already been written
+            tmp = self.filename + ".tmp"
+            try:
+                with open(tmp, "w") as f:
+                    _dump_contacts(f, rows, seq)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.filename)
+            except BaseException:
+                # open() itself may have failed, leaving nothing to remove
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(tmp)
+                raise
+            self._snapshot_seq = seq
+            self._snapshot_stat = _file_signature(self.filename)
+
+    def _trim_journal(self, seq: int):
+        """Drops journal records already folded into the snapshot at ``seq``."""
+        with self._file_lock, self._journal_lock:
+            try:
+                with open(self.journal_filename, "rb") as f:
+                    records = [(json.loads(raw)["s"], raw) for raw in f]
+            except FileNotFoundError:
+                return
+            tail = [raw for s, raw in records if s > seq]
+            tmp = self.journal_filename + ".tmp"
+            with open(tmp, "wb") as f:
+                f.writelines(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.journal_filename)
+            self._journal_bytes = sum(map(len, tail))
+            if all(s <= self._seq for s, _ in records):
+                # nothing from another process is waiting in the journal, so this is our own write
+                self._journal_stat = _file_signature(self.journal_filename)
+
+    def _report_error(self, error: Exception):
+        if self.on_error is not None:
+            self.on_error(error)
+        else:
+            print(f"Error saving contacts: {error}")
+
+    def _compact(self, seq: int, rows: List[Tuple[str, str, str, str]]):
+        try:
+            with self._file_lock:
+                self._write_snapshot(seq, rows)
+                self._trim_journal(seq)
+        except Exception as e:
+            self._report_error(e)
 
-    def update_contact_dialog(self):
-        if not self.selected_contact_name:
-            messagebox.showwarning("Warning", "Please select a contact to update.")
+    def _start_compaction(self):
+        if self._compactor is not None and self._compactor.is_alive():
             return
-        contact = self.manager.find_contact_by_name(self.selected_contact_name)
-        if not contact:
-            messagebox.showerror("Error", "Contact not found!")
+        with self.lock:
+            seq = self._seq
+            rows = [c.fields() for c in self._records.values()]
+        self._compactor = threading.Thread(
+            target=self._compact, args=(seq, rows), name="contacts-compactor", daemon=True
+        )
+        self._compactor.start()
+
+    def _append_journal(self):
+        """Appends the pending records, after folding in whatever other processes appended first.
+
+        Sequence numbers are handed out here, under the file lock, so
+        records from every process form one ordered log.
+        """
+        with self._file_lock:
+            self._catch_up()
+            with self.lock:
+                with self._pending_lock:
+                    records = list(self._pending_records)
+                if not records:
+                    return
+                lines = []
+                for record in records:
+                    self._seq += 1
+                    record = {"s": self._seq, **record}
+                    lines.append((json.dumps(record, separators=(",", ":")) + "\n").encode())
+            # on the writer thread self.lock is free again here, so the UI is not held up by fsync
+            with self._journal_lock, open(self.journal_filename, "ab") as f:
+                f.write(b"".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+                self._journal_bytes = f.tell()
+                self._journal_stat = _signature(os.fstat(f.fileno()))
+            with self._pending_lock:
+                del self._pending_records[:len(records)]
+        if self._journal_bytes >= self.compact_threshold:
+            self._start_compaction()
+
+    def _commit(self, record: Dict):
+        """Persists one mutation, as a journal append or a full save."""
+        self._commit_many([record])
+
+    def _commit_many(self, records: List[Dict], write: bool = True):
+        """Persists a batch of mutations with a single write; ``write=False`` only queues them."""
+        if self.journal:
+            with self._pending_lock:
+                self._pending_records += records
+        else:
+            self._dirty.update(name.lower() for record in records for name in self._record_names(record))
+        if not write:
             return
-        dialog = ContactDialog(self.root, "Update Contact", contact)
-        if dialog.result:
-            name, phone, email, address = dialog.result
-            if self.manager.update_contact(self.selected_contact_name, name, phone, email, address):
-                self.refresh_contact_list()
-                self.clear_details()
-                messagebox.showinfo("Success", "Contact updated successfully!")
-            else:
-                messagebox.showerror("Error", "Name and phone number are required!")
-
-    def delete_contact_dialog(self):
-        if not self.selected_contact_name:
-            messagebox.showwarning("Warning", "Please select a contact to delete.")
+        if self._writer is not None:
+            self._writer.request()
             return
-        name = self.selected_contact_name
-        result = messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete contact '{name}'?")
-        if result:
-            if self.manager.delete_contact(name):
-                self.refresh_contact_list()
-                self.clear_details()
-                messagebox.showinfo("Success", f"Contact '{name}' deleted successfully!")
+        try:
+            self._write_pending()
+        except Exception as e:
+            self._report_error(e)
+
+    def _write_pending(self):
+        """Writer task: appends pending journal records or writes a fresh snapshot."""
+        if self.journal:
+            self._append_journal()
+        else:
+            self._save_snapshot()
+
+    def _save_snapshot(self):
+        """Rewrites the whole book, merging in changes another process saved since we last looked."""
+        with self._file_lock:
+            self._catch_up()
+            with self.lock:
+                seq = self._seq
+                rows = [c.fields() for c in self._records.values()]
+                self._dirty = set()
+            self._write_snapshot(seq, rows)
+            self._trim_journal(seq)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every queued change is on disk; False if ``timeout`` ran out first."""
+        done = self._writer.flush(timeout) if self._writer is not None else True
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout)
+            done = done and not compactor.is_alive()
+        return done
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Writes out pending edits and stops the background threads; the manager is done after this."""
+        done = self.flush(timeout)
+        if self._writer is not None:
+            done = self._writer.close(timeout) and done
+        return done
+
+    def save_contacts(self):
+        try:
+            self._save_snapshot()
+        except Exception as e:
+            self._report_error(e)
+
+    def add_contact(self, name: str, phone: str, email: str = "", address: str = "") -> bool:
+        self._loaded.wait()
+        with self._write_lock(), self.lock:
+            if not name.strip() or not phone.strip():
+                return False
+            if self._lookup_id(name.strip()) is not None:
+                return False
+            contact = Contact(name.strip(), phone.strip(), email.strip(), address.strip())
+            self._insert(contact)
+            self._commit({"op": "add", "c": [contact.name, contact.phone, contact.email, contact.address]})
+            return True
+
+    def import_contacts(
+        self,
+        rows: Iterable[Dict],
+        batch_size: int = IMPORT_BATCH,
+        progress: Optional[Callable[[ImportReport], None]] = None,
+    ) -> ImportReport:
+        """Adds contacts from an iterable of field dicts, e.g. read_csv() or read_vcards().
+
+        Rows are validated like add_contact and deduplicated against the name
+        index (including rows added earlier in the same import). With a
+        journal each batch is appended as it is added; without one the whole
+        book is rewritten once at the end rather than after every batch.
+        ``progress`` is called after each batch.
+        """
+        self._loaded.wait()
+        report = ImportReport()
+        try:
+            for batch in _batches(rows, batch_size):
+                records = []
+                with self._write_lock(), self.lock:
+                    for row in batch:
+                        fields = _clean_fields(row)
+                        if fields is None:
+                            report.invalid += 1
+                        elif self._lookup_id(fields[0]) is not None:
+                            report.duplicates += 1
+                        else:
+                            self._insert(Contact(*fields))
+                            records.append({"op": "add", "c": list(fields)})
+                            report.added += 1
+                    if records:
+                        self._commit_many(records, write=self.journal)
+                if progress is not None:
+                    progress(report)
+        finally:
+            # also saves what was added before a bad source file stopped the import
+            if report.added and not self.journal:
+                with self._write_lock():
+                    self._commit_many([])
+        return report
+
+    def export_contacts(self, stream: IO[str], fmt: str = "csv") -> int:
+        """Writes every contact to ``stream`` as CSV or vCard; returns the count."""
+        return write_contacts(self.contacts, stream, fmt)
+
+    def search_contacts(self, query: str) -> List[Contact]:
+        """Contacts whose name, phone or email contains ``query``, in list order.
+
+        The lock is only held while the candidates are collected; they are
+        matched without it, so a long scan never holds up edits or the
+        window's reads of the book.
+        """
+        query = query.lower()
+        digits = _phone_query(query)
+        # a phone-like query is looked up by its digits, so it needs NGRAM of them
+        indexed = len(query) >= NGRAM and (len(digits) >= NGRAM or not _PHONE_LIKE.fullmatch(query))
+        if indexed and self._gram_upto != _ALL_IDS:
+            # the first search that could use the index starts building it, and
+            # searches scan until it is done
+            if not self._gram_build_lock.locked():
+                threading.Thread(target=self.build_search_index, name="contacts-trigrams", daemon=True).start()
+            indexed = False
+        with self.lock:
+            if not indexed or self._gram_upto != _ALL_IDS:
+                candidates: Iterable[Optional[Contact]] = list(self._records.values())
+                ids = None
             else:
-                messagebox.showerror("Error", "Failed to delete contact!")
+                ids = self._gram_index.candidates(query)
+                if digits and digits != query:
+                    ids |= self._gram_index.candidates(digits)
+                records = self._records
+        if ids is None and not digits:
+            # the common short query, with _matches inlined: the call costs more than the test
+            return [c for c in candidates if query in c.name.lower() or query in c.phone or query in c.email.lower()]
+        if ids is not None:
+            # a contact deleted since has no record any more; dict lookups are atomic without the lock
+            candidates = [records.get(cid) for cid in sorted(ids)]
+        # trigrams may come from different fields or positions, or be stale, so confirm the substring
+        return [c for c in candidates if c is not None and self._matches(c, query, digits)]
+
+    def build_search_index(self) -> bool:
+        """Builds the trigram index search_contacts uses; False if another thread is already at it.
+
+        The first search that could use the index starts this on a thread of
+        its own; call it directly to have the index ready up front. Contacts
+        are indexed GRAM_BUILD_BATCH ids at a time, each batch under
+        self.lock, so edits and searches go on meanwhile: an edit to a
+        contact below the batch mark updates the index itself, and one above
+        it is read when its batch comes.
+        """
+        if not self._gram_build_lock.acquire(blocking=False):
+            return False
+        try:
+            index = TrigramIndex()
+            with self.lock:
+                if self._gram_upto == _ALL_IDS:
+                    return True
+                self._gram_index, self._gram_upto = index, 0
+            while True:
+                with self.lock:
+                    if self._gram_index is not index:
+                        # the book was reloaded meanwhile; the next search starts over
+                        return False
+                    records = self._records
+                    start = int(self._gram_upto)
+                    stop = min(start + GRAM_BUILD_BATCH, self._next_id)
+                    for cid in range(start, stop):
+                        contact = records.get(cid)
+                        if contact is not None:
+                            index.add(cid, self._search_grams(contact))
+                    if stop >= self._next_id:
+                        self._gram_upto = _ALL_IDS
+                        return True
+                    self._gram_upto = stop
+        finally:
+            self._gram_build_lock.release()
+
+    def find_contacts_by_phone(self, phone: str) -> List[Contact]:
+        """Contacts whose number has the same phone_key, however it is formatted."""
+        with self.lock:
+            return [self._records[cid] for cid in sorted(self._phone_index.get(phone_key(phone), ()))]
+
+    def find_duplicates(self, max_block: int = DUPLICATE_MAX_BLOCK) -> List[List[Contact]]:
+        """Merge candidates for the whole book: groups of contacts that look like one person.
+
+        The lock is only held to copy the compared fields and to look the
+        results up; the clustering itself runs without it.
+        """
+        while True:
+            with self.lock:
+                records = self._records
+                contacts = list(records.values())
+                columns = [list(map(operator.attrgetter(field), contacts)) for field in ("name", "phone", "email")]
+                del contacts
+                ids = list(records)
+            groups = find_duplicate_groups(ids, *columns, max_block=max_block)
+            with self.lock:
+                if self._records is records:
+                    # contacts deleted meanwhile drop out, and so do groups they leave alone
+                    found = ([records[cid] for cid in group if cid in records] for group in groups)
+                    return [group for group in found if len(group) > 1]
+            # the book was reloaded meanwhile, which renumbers the ids
+
+    def fuzzy_search_contacts(self, query: str, limit: int = FUZZY_TOP_K) -> List[Contact]:
+        """Typo-tolerant name search, best matches first.
+
+        The index is searched without self.lock (the first search builds its
+        tree); only mapping the ids back to contacts takes it.
+        """
+        while True:
+            fuzzy = self._fuzzy
+            ranked = fuzzy.search(query, limit)
+            with self.lock:
+                if self._fuzzy is fuzzy:
+                    # contacts deleted during the search are dropped
+                    return [self._records[cid] for _, cid in ranked if cid in self._records]
+            # the book was reloaded meanwhile, which renumbers the ids: search the new index
+
+    @staticmethod
+    def narrows(old: str, new: str) -> bool:
+        """Whether every match of ``new`` also matched ``old``, so filter_contacts can narrow old's results.
+
+        Extending a query is not enough when phone digits match too: "(" has
+        no digits and finds no "555-1234", which "(555" finds by its digits.
+        """
+        old, new = old.lower(), new.lower()
+        old_digits, new_digits = _phone_query(old), _phone_query(new)
+        return old in new and bool(old_digits) == bool(new_digits) and old_digits in new_digits
+
+    @classmethod
+    def filter_contacts(cls, contacts: List[Contact], query: str, match_digits: bool = True) -> List[Contact]:
+        """Applies search_contacts matching to an existing result list."""
+        query = query.lower()
+        digits = _phone_query(query) if match_digits else ""
+        return [c for c in contacts if cls._matches(c, query, digits)]
+
+    def find_contact_by_name(self, name: str) -> Optional[Contact]:
+        with self.lock:
+            cid = self._lookup_id(name)
+            return self._records[cid] if cid is not None else None
+
+    def update_contact(self, old_name: str, name: str, phone: str, email: str = "", address: str = "") -> bool:
+        self._loaded.wait()
+        with self._write_lock(), self.lock:
+            cid = self._lookup_id(old_name)
+            if cid is None:
+                return False
+            if not name.strip() or not phone.strip():
+                return False
+            other = self._lookup_id(name.strip())
+            if other is not None and other != cid:
+                # names are unique, as in add_contact; the journal identifies contacts by name
+                return False
+            fields = [name.strip(), phone.strip(), email.strip(), address.strip()]
+            self._replace(cid, *fields)
+            self._commit({"op": "update", "old": old_name, "c": fields})
+            return True
+
+    def delete_contact(self, name: str) -> bool:
+        self._loaded.wait()
+        with self._write_lock(), self.lock:
+            cid = self._lookup_id(name)
+            if cid is None:
+                return False
+            self._remove(cid)
+            self._commit({"op": "delete", "name": name})
+            return True
+
+
+class SQLiteContactManager:
+    """ContactManager backed by SQLite, with an FTS5 trigram table serving search.
+
+    Contacts stay on disk: nothing is read into memory at startup and every
+    edit is a single-row transaction. Names are unique ignoring case, folded
+    with str.lower() as ContactManager folds them (SQLite's NOCASE folds
+    ASCII only), through the name_key column.
+    """
+    _COLUMNS = "name, phone, email, address"
+    _INSERT = f"INTO contacts (name_key, {_COLUMNS}) VALUES (?, ?, ?, ?, ?)"
+
+    def __init__(self, filename: str = "contacts.db"):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.has_fts = False
+        self.version = 0
+        self.lock = threading.RLock()
+        # built from the names on the first fuzzy search, then kept in step with edits
+        self._fuzzy: Optional[FuzzyNameIndex] = None
+        # (version, row count) of the last len(), which SQLite answers with a scan
+        self._count: Tuple[int, int] = (-1, 0)
+        self.load_contacts()
+        # bumped by SQLite whenever another connection commits to the file
+        self._data_version = self._read_data_version()
+
+    def _read_data_version(self) -> int:
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def has_external_changes(self) -> bool:
+        """True when another connection has committed since the last refresh."""
+        with self.lock:
+            return self._read_data_version() != self._data_version
+
+    def refresh(self, blocking: bool = True) -> int:
+        """Picks up other connections' commits; 1 if there were any, else 0.
+
+        Queries always read the database, so only the cached fuzzy index is
+        dropped. SQLite does its own locking, so ``blocking`` is not needed.
+        """
+        with self.lock:
+            data_version = self._read_data_version()
+            if data_version == self._data_version:
+                return 0
+            self._data_version = data_version
+            self._fuzzy = None
+            self.version += 1
+            return 1
+
+    def load_contacts(self):
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    """CREATE TABLE IF NOT EXISTS contacts (
+                        id INTEGER PRIMARY KEY,
+                        name_key TEXT NOT NULL UNIQUE,
+                        name TEXT NOT NULL,
+                        phone TEXT NOT NULL,
+                        email TEXT NOT NULL DEFAULT '',
+                        address TEXT NOT NULL DEFAULT ''
+                    )"""
+                )
+                if not any(row[1] == "name_key" for row in self.conn.execute("PRAGMA table_info(contacts)")):
+                    self._add_name_keys()
+                had_fts = self.conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'contacts_fts'"
+                ).fetchone() is not None
+                try:
+                    self.conn.executescript(
+                        """CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+                            name, phone, email, content='contacts', content_rowid='id', tokenize='trigram'
+                        );
+                        CREATE TRIGGER IF NOT EXISTS contacts_ai AFTER INSERT ON contacts BEGIN
+                            INSERT INTO contacts_fts(rowid, name, phone, email)
+                            VALUES (new.id, new.name, new.phone, new.email);
+                        END;
+                        CREATE TRIGGER IF NOT EXISTS contacts_ad AFTER DELETE ON contacts BEGIN
+                            INSERT INTO contacts_fts(contacts_fts, rowid, name, phone, email)
+                            VALUES ('delete', old.id, old.name, old.phone, old.email);
+                        END;
+                        CREATE TRIGGER IF NOT EXISTS contacts_au AFTER UPDATE ON contacts BEGIN
+                            INSERT INTO contacts_fts(contacts_fts, rowid, name, phone, email)
+                            VALUES ('delete', old.id, old.name, old.phone, old.email);
+                            INSERT INTO contacts_fts(rowid, name, phone, email)
+                            VALUES (new.id, new.name, new.phone, new.email);
+                        END;"""
+                    )
+                    if not had_fts:
+                        # an external-content table starts empty; index the rows a build without FTS stored
+                        self.conn.execute("INSERT INTO contacts_fts(contacts_fts) VALUES('rebuild')")
+                    self.has_fts = True
+                except sqlite3.OperationalError:
+                    # SQLite builds older than 3.34 lack the trigram tokenizer; search falls back to LIKE
+                    self.has_fts = False
+
+    def _add_name_keys(self):
+        """Adds name_key to a book made when names were unique under NOCASE."""
+        self.conn.execute("ALTER TABLE contacts ADD COLUMN name_key TEXT")
+        keys, seen = [], set()
+        for cid, name in self.conn.execute("SELECT id, name FROM contacts ORDER BY id").fetchall():
+            key = name.lower()
+            if key in seen:
+                # NOCASE let in names differing only in non-ASCII case; as in
+                # ContactManager, the first is the one found by name
+                key += f"\0{cid}"
+            seen.add(key)
+            keys.append((key, cid))
+        self.conn.executemany("UPDATE contacts SET name_key = ? WHERE id = ?", keys)
+        self.conn.execute("CREATE UNIQUE INDEX contacts_name_key ON contacts(name_key)")
+
+    def save_contacts(self):
+        with self.lock:
+            self.conn.commit()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        self.save_contacts()
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+        return True
 
-    def run(self):
-        self.root.mainloop()
+    def _rows(self, sql: str, params=()) -> List[Contact]:
+        return [Contact(*row) for row in self.conn.execute(sql, params)]
+
+    @property
+    def contacts(self) -> List[Contact]:
+        """Every contact, read into memory: for the few callers that need them all at once.
+
+        Showing the book only needs len() and page().
+        """
+        with self.lock:
+            return self._rows(f"SELECT {self._COLUMNS} FROM contacts ORDER BY id")
+
+    def __len__(self) -> int:
+        with self.lock:
+            if self._count[0] != self.version:
+                self._count = (self.version, self.conn.execute("SELECT COUNT(*) FROM contacts").fetchone()[0])
+            return self._count[1]
+
+    def page(self, start: int, stop: int) -> List[Contact]:
+        """The contacts at list positions ``start`` up to ``stop``, read from disk."""
+        start = max(start, 0)
+        if stop <= start:
+            return []
+        with self.lock:
+            return self._rows(
+                f"SELECT {self._COLUMNS} FROM contacts ORDER BY id LIMIT ? OFFSET ?", (stop - start, start)
+            )
+
+    def _named(self, name: str) -> Optional[Tuple[int, str]]:
+        return self.conn.execute("SELECT id, name FROM contacts WHERE name_key = ?", (name.lower(),)).fetchone()
 
+    def add_contact(self, name: str, phone: str, email: str = "", address: str = "") -> bool:
+        with self.lock:
+            if not name.strip() or not phone.strip():
+                return False
+            try:
+                with self.conn:
+                    cur = self.conn.execute(
+                        "INSERT " + self._INSERT,
+                        (name.strip().lower(), name.strip(), phone.strip(), email.strip(), address.strip()),
+                    )
+            except sqlite3.IntegrityError:
+                return False
+            if self._fuzzy is not None:
+                self._fuzzy.add(cur.lastrowid, name.strip())
+            self.version += 1
+            return True
 
-def main():
+    def search_contacts(self, query: str) -> List[Contact]:
+        with self.lock:
+            if self.has_fts and len(query) >= NGRAM:
+                phrase = '"' + query.replace('"', '""') + '"'
+                return self._rows(
+                    f"SELECT {self._COLUMNS} FROM contacts WHERE id IN "
+                    "(SELECT rowid FROM contacts_fts WHERE contacts_fts MATCH ?) ORDER BY id",
+                    (phrase,),
+                )
+            pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            return self._rows(
+                f"SELECT {self._COLUMNS} FROM contacts WHERE name LIKE ?1 ESCAPE '\\' "
+                "OR phone LIKE ?1 ESCAPE '\\' OR email LIKE ?1 ESCAPE '\\' ORDER BY id",
+                (pattern,),
+            )
+
+    def find_contact_by_name(self, name: str) -> Optional[Contact]:
+        with self.lock:
+            rows = self._rows(f"SELECT {self._COLUMNS} FROM contacts WHERE name_key = ?", (name.lower(),))
+            return rows[0] if rows else None
+
+    def update_contact(self, old_name: str, name: str, phone: str, email: str = "", address: str = "") -> bool:
+        with self.lock:
+            if not name.strip() or not phone.strip():
+                return False
+            old = self._named(old_name)
+            try:
+                with self.conn:
+                    cur = self.conn.execute(
+                        "UPDATE contacts SET name_key = ?, name = ?, phone = ?, email = ?, address = ?"
+                        " WHERE name_key = ?",
+                        (name.strip().lower(), name.strip(), phone.strip(), email.strip(), address.strip(),
+                         old_name.lower()),
+                    )
+            except sqlite3.IntegrityError:
+                return False
+            if self._fuzzy is not None and old is not None:
+                self._fuzzy.discard(*old)
+                self._fuzzy.add(old[0], name.strip())
+            self.version += cur.rowcount
+            return cur.rowcount > 0
+
+    def delete_contact(self, name: str) -> bool:
+        with self.lock:
+            old = self._named(name)
+            with self.conn:
+                cur = self.conn.execute("DELETE FROM contacts WHERE name_key = ?", (name.lower(),))
+            if self._fuzzy is not None and old is not None:
+                self._fuzzy.discard(*old)
+            self.version += cur.rowcount
+            return cur.rowcount > 0
+
+    @staticmethod
+    def narrows(old: str, new: str) -> bool:
+        # no phone digit matching here, so a longer query only ever matches fewer
+        return old.lower() in new.lower()
+
+    def filter_contacts(self, contacts: List[Contact], query: str) -> List[Contact]:
+        # search_contacts here matches raw phone strings only, so narrowing must too
+        return ContactManager.filter_contacts(contacts, query, match_digits=False)
+
+    def find_duplicates(self, max_block: int = DUPLICATE_MAX_BLOCK) -> List[List[Contact]]:
+        with self.lock:
+            rows = self.conn.execute(f"SELECT id, {self._COLUMNS} FROM contacts ORDER BY id").fetchall()
+        ids, names, phones, emails, _ = zip(*rows) if rows else ([],) * 5
+        groups = find_duplicate_groups(ids, names, phones, emails, max_block)
+        by_id = {row[0]: row for row in rows}
+        return [[Contact(*by_id[cid][1:]) for cid in group] for group in groups]
+
+    def fuzzy_search_contacts(self, query: str, limit: int = FUZZY_TOP_K) -> List[Contact]:
+        with self.lock:
+            if self._fuzzy is None:
+                self._fuzzy = FuzzyNameIndex()
+                for cid, name in self.conn.execute("SELECT id, name FROM contacts"):
+                    self._fuzzy.add(cid, name)
+            fuzzy = self._fuzzy
+        # row ids are stable, so the index is searched without the lock; rows deleted meanwhile are not found
+        ranked = [cid for _, cid in fuzzy.search(query, limit)]
+        if not ranked:
+            return []
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT id, {self._COLUMNS} FROM contacts WHERE id IN ({','.join('?' * len(ranked))})", ranked
+            )
+            by_id = {row[0]: Contact(*row[1:]) for row in rows}
+            return [by_id[cid] for cid in ranked if cid in by_id]
+
+    def import_contacts(
+        self,
+        rows: Iterable[Dict],
+        batch_size: int = IMPORT_BATCH,
+        progress: Optional[Callable[[ImportReport], None]] = None,
+    ) -> ImportReport:
+        report = ImportReport()
+        for batch in _batches(rows, batch_size):
+            valid = []
+            for row in batch:
+                fields = _clean_fields(row)
+                if fields is None:
+                    report.invalid += 1
+                else:
+                    valid.append((fields[0].lower(), *fields))
+            with self.lock, self.conn:
+                last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM contacts").fetchone()[0]
+                cur = self.conn.executemany("INSERT OR IGNORE " + self._INSERT, valid)
+                if self._fuzzy is not None:
+                    # new rows get ids above the largest, so these are exactly the rows inserted
+                    for cid, name in self.conn.execute("SELECT id, name FROM contacts WHERE id > ?", (last_id,)):
+                        self._fuzzy.add(cid, name)
+                self.version += 1
+            report.added += cur.rowcount
+            report.duplicates += len(valid) - cur.rowcount
+            if progress is not None:
+                progress(report)
+        return report
+
+    def export_contacts(self, stream: IO[str], fmt: str = "csv") -> int:
+        sql = f"SELECT {self._COLUMNS} FROM contacts ORDER BY id"
+        if self.filename == ":memory:":
+            with self.lock:
+                return write_contacts((Contact(*row) for row in self.conn.execute(sql)), stream, fmt)
+        # a connection of its own streams the rows without holding self.lock for the whole export
+        conn = sqlite3.connect(self.filename)
+        try:
+            return write_contacts((Contact(*row) for row in conn.execute(sql)), stream, fmt)
+        finally:
+            conn.close()
+
+
+def migrate_json_to_sqlite(json_filename: str, db_filename: str) -> int:
+    """Copies a contacts.json book (and its journal) into a SQLite database.
+
+    Returns the number of contacts inserted; names already present are skipped.
+    """
+    source = ContactManager(json_filename)
+    target = SQLiteContactManager(db_filename)
+    count = "SELECT COUNT(*) FROM contacts"
+    with target.conn:
+        before = target.conn.execute(count).fetchone()[0]
+        target.conn.executemany(
+            "INSERT OR IGNORE " + SQLiteContactManager._INSERT,
+            ((c.name.lower(), c.name, c.phone, c.email, c.address) for c in source.contacts),
+        )
+        inserted = target.conn.execute(count).fetchone()[0] - before
+    target.conn.close()
+    return inserted
+
+
+class StartupProfile:
+    """Wall-clock phases of a launch, printed by --profile-startup."""
+
+    def __init__(self, started: float = IMPORT_STARTED):
+        self.started = started
+        self.phases: List[Tuple[str, float]] = []
+        self._last = started
+
+    def mark(self, phase: str):
+        """Ends ``phase`` now; its time runs from the previous mark."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self, stream: IO[str] = sys.stdout):
+        for phase, seconds in self.phases:
+            print(f"{seconds * 1000:9.1f} ms  {phase}", file=stream)
+        print(f"{(self._last - self.started) * 1000:9.1f} ms  total", file=stream)
+
+
+# the window classes live in contact_book_ui, which is imported on first use
+_UI_NAMES = {"ContactCard", "ContactListView", "SearchPipeline", "ContactDialog", "ContactApp"}
+
+
+def __getattr__(name: str):
+    if name in _UI_NAMES:
+        import contact_book_ui
+        return getattr(contact_book_ui, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Contact Management System")
+    parser.add_argument("--db", help="use a SQLite contact book instead of contacts.json")
+    parser.add_argument("--migrate", nargs=2, metavar=("JSON", "DB"), help="copy a JSON book into SQLite and exit")
+    parser.add_argument("--import", dest="import_file", metavar="FILE", help="bulk import a .csv or .vcf file and exit")
+    parser.add_argument("--export", dest="export_file", metavar="FILE", help="export the book to a .csv or .vcf file and exit")
+    parser.add_argument("--duplicates", action="store_true", help="list likely duplicate contacts and exit")
+    parser.add_argument("--profile-startup", action="store_true", help="print how long each phase of startup takes")
+    args = parser.parse_args(argv)
+    if args.duplicates:
+        manager = SQLiteContactManager(args.db) if args.db else ContactManager()
+        groups = manager.find_duplicates()
+        for group in groups:
+            print(" | ".join(f"{c.name} <{c.phone}>" + (f" {c.email}" if c.email else "") for c in group))
+        print(f"{len(groups)} groups of possible duplicates")
+        return
+    if args.import_file or args.export_file:
+        manager = SQLiteContactManager(args.db) if args.db else ContactManager(journal=True)
+        try:
+            if args.import_file:
+                with open(args.import_file, newline="", encoding="utf-8") as f:
+                    reader = read_vcards if contact_format(args.import_file) == "vcard" else read_csv
+                    report = manager.import_contacts(
+                        reader(f), progress=lambda r: print(f"\r{r.processed} rows processed", end="", flush=True)
+                    )
+                print(f"\nImported {report.added} contacts ({report.duplicates} duplicates, {report.invalid} invalid)")
+            if args.export_file:
+                with open(args.export_file, "w", newline="", encoding="utf-8") as f:
+                    count = manager.export_contacts(f, contact_format(args.export_file))
+                print(f"Exported {count} contacts to {args.export_file}")
+        finally:
+            # waits for a compaction the import started, so no .tmp or untrimmed journal is left behind
+            manager.close()
+        return
+    if args.migrate:
+        count = migrate_json_to_sqlite(*args.migrate)
+        print(f"Migrated {count} contacts into {args.migrate[1]}")
+        return
+    profile = StartupProfile() if args.profile_startup else None
+    if profile:
+        profile.mark("import contact_book")
     try:
-        app = ContactApp()
+        # contact_book_ui imports it anyway; importing it first times it on its own
+        import customtkinter
+        if profile:
+            profile.mark("import customtkinter")
+        from contact_book_ui import ContactApp
+        if profile:
+            profile.mark("import contact_book_ui")
+        app = ContactApp(SQLiteContactManager(args.db) if args.db else None, profile=profile)
         app.run()
     except Exception as e:
+        from tkinter import messagebox
         messagebox.showerror("Error", f"An error occurred: {e}")
 
 
 if __name__ == "__main__":
+    # let contact_book_ui import this module instead of loading a second copy of it
+    sys.modules.setdefault("contact_book", sys.modules[__name__])
     main()
-
-
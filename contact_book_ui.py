@@ -0,0 +1,668 @@
+"""The Contact Management System window.
+
+Kept apart from contact_book so that the command-line tools, the server and
+the benchmarks never pay for importing customtkinter; contact_book imports
+this module only when the window is opened.
+"""
+import queue
+import threading
+from tkinter import messagebox
+from typing import Callable, List, Optional
+
+import customtkinter as ctk
+
+from contact_book import ERROR_POLL_MS, LOAD_POLL_MS, WATCH_POLL_MS, Contact, ContactManager, StartupProfile
+
+
+class ContactCard(ctk.CTkFrame):
+    """Single contact card used in the scrollable list."""
+    def __init__(
+        self,
+        master: ctk.CTkBaseClass,
+        contact: Optional[Contact],
+        on_select: Callable[[Contact], None],
+        is_selected: bool = False,
+        **kwargs,
+    ):
+        super().__init__(master, corner_radius=10, fg_color=("#F5F6F8", "#1F1F1F"), **kwargs)
+        self.contact = contact
+        self.on_select = on_select
+        self.configure(border_width=0)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.name_label = ctk.CTkLabel(self, text="", font=("Segoe UI", 14, "bold"))
+        self.phone_label = ctk.CTkLabel(self, text="", font=("Segoe UI", 12))
+        self.email_label = ctk.CTkLabel(self, text="", font=("Segoe UI", 12))
+        self.name_label.grid(row=0, column=0, sticky="w", padx=12, pady=(4, 0))
+        self.phone_label.grid(row=1, column=0, sticky="w", padx=12)
+        self.email_label.grid(row=2, column=0, sticky="w", padx=12, pady=(0, 4))
+
+        self.targets = (self, self.name_label, self.phone_label, self.email_label)
+        for widget in self.targets:
+            widget.bind("<Button-1>", self._handle_click)
+        if contact is not None:
+            self.show(contact, is_selected)
+
+    def show(self, contact: Contact, is_selected: bool = False):
+        """Rebinds this card to another contact without rebuilding its widgets."""
+        self.contact = contact
+        self.name_label.configure(text=contact.name)
+        self.phone_label.configure(text=contact.phone)
+        self.email_label.configure(text=contact.email or "No email")
+        self._update_selected_ui(is_selected)
+
+    def _handle_click(self, _event=None):
+        if self.contact is not None:
+            self.on_select(self.contact)
+
+    def _update_selected_ui(self, is_selected: bool):
+        if is_selected:
+            self.configure(border_width=2, border_color=("#3B8ED0", "#1F6AA5"))
+        else:
+            self.configure(border_width=0)
+
+
+class ContactListView(ctk.CTkFrame):
+    """Virtualized contact list.
+
+    Only enough ContactCards to fill the viewport are ever created; scrolling
+    rebinds them to other contacts. The view holds a count and a page
+    accessor rather than the contacts, so refreshing costs the same for any
+    book size.
+    """
+    CARD_PAD = 4
+    WHEEL_ROWS = 2
+
+    def __init__(self, master: ctk.CTkBaseClass, on_select: Callable[[Contact], None], **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_select = on_select
+        self.count = 0
+        self._page: Callable[[int, int], List[Contact]] = lambda start, stop: []
+        self.selected_name: Optional[str] = None
+        self.first = 0
+        self.cards: List[ContactCard] = []
+        self._row_height = 0
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=0, column=0, sticky="nsew")
+        self.body.grid_propagate(False)
+        self.body.grid_columnconfigure(0, weight=1)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.body.bind("<Configure>", lambda _e: self._render())
+        self._bind_wheel(self.body)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.scroll_rows(-self.WHEEL_ROWS if e.delta > 0 else self.WHEEL_ROWS))
+        widget.bind("<Button-4>", lambda _e: self.scroll_rows(-self.WHEEL_ROWS))
+        widget.bind("<Button-5>", lambda _e: self.scroll_rows(self.WHEEL_ROWS))
+
+    def _new_card(self) -> ContactCard:
+        card = ContactCard(self.body, None, on_select=self.on_select)
+        card.grid(row=len(self.cards), column=0, sticky="we", padx=self.CARD_PAD, pady=self.CARD_PAD)
+        for widget in card.targets:
+            self._bind_wheel(widget)
+        self.cards.append(card)
+        return card
+
+    def _visible_rows(self) -> int:
+        if not self.cards:
+            card = self._new_card()
+            card.update_idletasks()
+            self._row_height = max(1, card.winfo_reqheight() + 2 * self.CARD_PAD)
+        # one extra card covers the partially visible row at the bottom
+        return max(1, self.body.winfo_height() // self._row_height + 1)
+
+    def set_contacts(self, count: int, page: Callable[[int, int], List[Contact]], keep_position: bool = False):
+        """Shows ``count`` contacts; ``page(start, stop)`` returns those at positions start to stop."""
+        self.count = count
+        self._page = page
+        self.first = min(self.first, max(0, count - 1)) if keep_position else 0
+        self._render()
+
+    def set_selected(self, name: Optional[str]):
+        self.selected_name = name
+        for card in self.cards:
+            if card.contact is not None and card.winfo_manager():
+                card._update_selected_ui(card.contact.name == name)
+
+    def scroll_rows(self, delta: int):
+        self.scroll_to(self.first + delta)
+
+    def scroll_to(self, index: int):
+        index = max(0, min(index, self.count - self._visible_rows() + 1))
+        if index != self.first:
+            self.first = index
+            self._render()
+
+    def _on_scrollbar(self, action: str, amount, unit: Optional[str] = None):
+        rows = self._visible_rows()
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * self.count))
+        elif action == "scroll":
+            self.scroll_rows(int(amount) * (rows - 1 if unit == "pages" else 1))
+
+    def _render(self):
+        rows = self._visible_rows()
+        while len(self.cards) < rows:
+            self._new_card()
+        shown = self._page(self.first, self.first + rows)
+        for slot, card in enumerate(self.cards):
+            if slot < len(shown):
+                contact = shown[slot]
+                card.show(contact, contact.name == self.selected_name)
+                if not card.winfo_manager():
+                    card.grid()
+            else:
+                card.contact = None
+                card.grid_remove()
+        total = self.count
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + rows - 1) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+
+class SearchPipeline:
+    """Debounced, incremental search that runs off the Tk main thread.
+
+    Keystrokes inside DEBOUNCE_MS collapse into one search. A query that
+    extends the previous one only filters the previous results, and results
+    of a query that has since been superseded are dropped.
+    """
+    DEBOUNCE_MS = 150
+    POLL_MS = 15
+    CHUNK = 4096
+
+    def __init__(self, widget, manager, on_results: Callable[[Optional[List[Contact]]], None]):
+        self.widget = widget
+        self.manager = manager
+        self.on_results = on_results
+        self._generation = 0
+        self._pending: Optional[str] = None
+        self._poll: Optional[str] = None
+        self._searching = -1
+        self._results: "queue.Queue" = queue.Queue()
+        # last completed search, reused to narrow queries that extend it
+        self._last_query = ""
+        self._last_results: Optional[List[Contact]] = None
+        self._last_version = -1
+        # fuzzy mode ranks by edit distance over names instead of substring matching
+        self.fuzzy = False
+
+    def submit(self, query: str):
+        if self._pending is not None:
+            self.widget.after_cancel(self._pending)
+        self._pending = self.widget.after(self.DEBOUNCE_MS, lambda: self._start(query))
+
+    def cancel(self):
+        """Drops any queued or running search."""
+        if self._pending is not None:
+            self.widget.after_cancel(self._pending)
+            self._pending = None
+        self._generation += 1
+
+    def _start(self, query: str):
+        self._pending = None
+        self._generation += 1
+        generation = self._generation
+        if not query.strip():
+            # None shows the whole book, which the list reads a page at a time
+            self.on_results(None)
+            return
+        key = query.lower()
+        base = None
+        if (
+            not self.fuzzy
+            and self._last_results is not None
+            and self._last_query
+            and self.manager.narrows(self._last_query, key)
+            and self._last_version == self.manager.version
+        ):
+            # every match of the longer query also matched the shorter one
+            base = self._last_results
+        version = self.manager.version
+        self._searching = generation
+        threading.Thread(
+            target=self._run,
+            args=(generation, query, key, base, version, self.fuzzy),
+            name="contact-search",
+            daemon=True,
+        ).start()
+        if self._poll is None:
+            self._poll = self.widget.after(self.POLL_MS, self._drain)
+
+    def _stale(self, generation: int) -> bool:
+        return generation != self._generation
+
+    def _run(
+        self, generation: int, query: str, key: str, base: Optional[List[Contact]], version: int, fuzzy: bool
+    ):
+        if fuzzy:
+            results = self.manager.fuzzy_search_contacts(query)
+            # ranked top-k results cannot be narrowed further
+            key = ""
+        elif base is None:
+            results = self.manager.search_contacts(query)
+        else:
+            results = []
+            for start in range(0, len(base), self.CHUNK):
+                if self._stale(generation):
+                    return
+                # base is a list of our own, so narrowing it needs no lock
+                results += self.manager.filter_contacts(base[start:start + self.CHUNK], query)
+        if not self._stale(generation):
+            self._results.put((generation, key, version, results))
+
+    def _drain(self):
+        self._poll = None
+        while not self._results.empty():
+            generation, key, version, results = self._results.get_nowait()
+            if not self._stale(generation):
+                self._last_query, self._last_version, self._last_results = key, version, results
+                self.on_results(results)
+                return
+        if self._searching == self._generation:
+            self._poll = self.widget.after(self.POLL_MS, self._drain)
+
+
+class ContactDialog(ctk.CTkToplevel):
+    """Dialog window for adding/updating contacts."""
+    def __init__(self, parent, title: str, contact: Optional[Contact] = None):
+        super().__init__(parent)
+        self.title(title)
+        self.geometry("420x380")
+        self.resizable(False, False)
+        self.grab_set()
+        self.result = None
+
+        self.update_idletasks()
+        if parent is not None:
+            x = parent.winfo_rootx() + (parent.winfo_width() // 2) - (420 // 2)
+            y = parent.winfo_rooty() + (parent.winfo_height() // 2) - (380 // 2)
+            self.geometry(f"+{x}+{y}")
+
+        container = ctk.CTkFrame(self, corner_radius=12)
+        container.pack(fill="both", expand=True, padx=20, pady=20)
+
+        self.name_var = ctk.StringVar(value=contact.name if contact else "")
+        self.phone_var = ctk.StringVar(value=contact.phone if contact else "")
+        self.email_var = ctk.StringVar(value=contact.email if contact else "")
+        self.address_var = ctk.StringVar(value=contact.address if contact else "")
+
+        ctk.CTkLabel(container, text="Name").grid(row=0, column=0, sticky="w")
+        name_entry = ctk.CTkEntry(container, textvariable=self.name_var, width=260)
+        name_entry.grid(row=1, column=0, sticky="we", pady=(0, 10))
+        name_entry.focus()
+
+        ctk.CTkLabel(container, text="Phone").grid(row=2, column=0, sticky="w")
+        phone_entry = ctk.CTkEntry(container, textvariable=self.phone_var, width=260)
+        phone_entry.grid(row=3, column=0, sticky="we", pady=(0, 10))
+
+        ctk.CTkLabel(container, text="Email").grid(row=4, column=0, sticky="w")
+        email_entry = ctk.CTkEntry(container, textvariable=self.email_var, width=260)
+        email_entry.grid(row=5, column=0, sticky="we", pady=(0, 10))
+
+        ctk.CTkLabel(container, text="Address").grid(row=6, column=0, sticky="w")
+        self.address_entry = ctk.CTkEntry(container, textvariable=self.address_var, width=260)
+        self.address_entry.grid(row=7, column=0, sticky="we", pady=(0, 12))
+
+        btns = ctk.CTkFrame(container)
+        btns.grid(row=8, column=0, pady=(4, 0), sticky="we")
+        btns.grid_columnconfigure(0, weight=1)
+        btns.grid_columnconfigure(1, weight=1)
+        ctk.CTkButton(btns, text="Save", command=self._save).grid(row=0, column=0, padx=(0, 6), sticky="we")
+        ctk.CTkButton(btns, text="Cancel", fg_color=("#E5E7EB", "#2b2b2b"), text_color=("#111827", "#F3F4F6"), command=self._cancel).grid(row=0, column=1, sticky="we")
+
+        container.grid_columnconfigure(0, weight=1)
+
+        self.bind("<Return>", lambda e: self._save())
+        self.bind("<Escape>", lambda e: self._cancel())
+        self.wait_visibility()
+        self.wait_window(self)
+
+    def _save(self):
+        name = self.name_var.get().strip()
+        phone = self.phone_var.get().strip()
+        email = self.email_var.get().strip()
+        address = self.address_var.get().strip()
+        if not name or not phone:
+            messagebox.showerror("Error", "Name and phone number are required!")
+            return
+        self.result = (name, phone, email, address)
+        self.destroy()
+
+    def _cancel(self):
+        self.destroy()
+
+
+class ContactApp:
+    """Main GUI application (CustomTkinter)."""
+
+    def __init__(self, manager=None, watch: bool = True, profile: Optional[StartupProfile] = None):
+        self.profile = profile
+        # Theming
+        ctk.set_appearance_mode("System")
+        ctk.set_default_color_theme("blue")
+
+        self.root = ctk.CTk()
+        self.root.title("Contact Management System")
+        self.root.geometry("900x650")
+        self.root.resizable(False, False)
+
+        # messages from background work (saves, merges), shown by _poll_errors on the Tk thread
+        self._errors: "queue.Queue[str]" = queue.Queue()
+        loading = manager is None
+        if manager is None:
+            manager = ContactManager(journal=True, background=True, on_error=self._on_save_error, autoload=False)
+        self.manager = manager
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.selected_contact_name: Optional[str] = None
+
+        self.root.grid_columnconfigure(1, weight=1)
+        self.root.grid_rowconfigure(1, weight=1)
+
+        header = ctk.CTkFrame(self.root, corner_radius=0, fg_color=("#FFFFFF", "#101010"), height=64)
+        header.grid(row=0, column=0, columnspan=2, sticky="nsew")
+        header.grid_columnconfigure(0, weight=1)
+        title = ctk.CTkLabel(header, text="Contact Management System", font=("Segoe UI", 20, "bold"))
+        title.grid(row=0, column=0, padx=20, pady=16, sticky="w")
+
+        self.theme_selector = ctk.CTkSegmentedButton(
+            header,
+            values=["System", "Light", "Dark"],
+            command=self._on_theme_change,
+        )
+        self.theme_selector.set("System")
+        self.theme_selector.grid(row=0, column=1, padx=20)
+
+        controls = ctk.CTkFrame(self.root, corner_radius=12)
+        controls.grid(row=1, column=0, sticky="nsew", padx=(16, 8), pady=(12, 12))
+        controls.grid_rowconfigure(3, weight=0)
+        controls.grid_rowconfigure(7, weight=1)
+        controls.grid_columnconfigure(0, weight=1)
+
+        ctk.CTkLabel(controls, text="Search").grid(row=0, column=0, sticky="w", padx=8, pady=(8, 4))
+        self.search_var = ctk.StringVar()
+        self.search_entry = ctk.CTkEntry(controls, textvariable=self.search_var, placeholder_text="Search by name, phone, email")
+        self.search_entry.grid(row=1, column=0, sticky="we", padx=8, pady=(0, 12))
+        self.search_entry.bind("<KeyRelease>", self.on_search_change)
+        self.fuzzy_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(controls, text="Fuzzy match names", variable=self.fuzzy_var, command=self.on_fuzzy_toggle).grid(
+            row=2, column=0, sticky="w", padx=8, pady=(0, 12)
+        )
+
+        btn_add = ctk.CTkButton(controls, text="Add Contact", command=self.add_contact_dialog)
+        btn_update = ctk.CTkButton(controls, text="Update Contact", command=self.update_contact_dialog)
+        btn_delete = ctk.CTkButton(controls, text="Delete Contact", command=self.delete_contact_dialog, fg_color="#C24141")
+        btn_clear = ctk.CTkButton(controls, text="Clear Search", command=self.clear_search, fg_color="gray")
+
+        btn_add.grid(row=3, column=0, sticky="we", padx=8, pady=(0, 8))
+        btn_update.grid(row=4, column=0, sticky="we", padx=8, pady=(0, 8))
+        btn_delete.grid(row=5, column=0, sticky="we", padx=8, pady=(0, 8))
+        btn_clear.grid(row=6, column=0, sticky="we", padx=8)
+        # edits wait for the whole book, so they stay off until it has loaded rather than freeze the window
+        self._edit_buttons = (btn_add, btn_update, btn_delete)
+        if loading:
+            for button in self._edit_buttons:
+                button.configure(state="disabled")
+
+        list_frame = ctk.CTkFrame(self.root, corner_radius=12)
+        list_frame.grid(row=1, column=1, sticky="nsew", padx=(8, 16), pady=(12, 12))
+        list_frame.grid_rowconfigure(1, weight=1)
+        list_frame.grid_columnconfigure(0, weight=1)
+
+        ctk.CTkLabel(list_frame, text="Contacts", font=("Segoe UI", 14, "bold")).grid(row=0, column=0, sticky="w", padx=12, pady=(10, 0))
+        self.contact_list = ContactListView(list_frame, on_select=self._select_contact, corner_radius=12)
+        self.contact_list.grid(row=1, column=0, sticky="nsew", padx=10, pady=6)
+
+        # the details pane is built when the first contact is selected
+        self.details: Optional[ctk.CTkFrame] = None
+
+        self.search = SearchPipeline(self.root, self.manager, self.refresh_contact_list)
+        self.refresh_contact_list()
+        # watch mode merges in edits that other running instances save to the same book
+        self.watch = watch
+        self._loading = loading
+        self._painted = False
+        if profile:
+            profile.mark("build window shell")
+        # the timer fires once mainloop runs; the idle callback after it waits for the shell to be drawn
+        self.root.after(0, lambda: self.root.after_idle(self._on_first_frame))
+        self.root.after(ERROR_POLL_MS, self._poll_errors)
+
+    def _on_first_frame(self):
+        if self.profile:
+            self.profile.mark("first frame")
+        if self._loading:
+            self._start_loading()
+            return
+        if self.profile:
+            self.profile.report()
+        if self.watch:
+            self.root.after(WATCH_POLL_MS, self._watch_changes)
+
+    def _build_details(self):
+        details = ctk.CTkFrame(self.root, corner_radius=12)
+        details.grid(row=2, column=0, columnspan=2, sticky="we", padx=16, pady=(0, 16))
+        details.grid_columnconfigure(1, weight=1)
+
+        ctk.CTkLabel(details, text="Name:").grid(row=0, column=0, sticky="w")
+        self.detail_name = ctk.CTkLabel(details, text="", font=("Segoe UI", 12, "bold"))
+        self.detail_name.grid(row=0, column=1, sticky="w")
+
+        ctk.CTkLabel(details, text="Phone:").grid(row=1, column=0, sticky="w")
+        self.detail_phone = ctk.CTkLabel(details, text="")
+        self.detail_phone.grid(row=1, column=1, sticky="w")
+
+        ctk.CTkLabel(details, text="Email:").grid(row=2, column=0, sticky="w")
+        self.detail_email = ctk.CTkLabel(details, text="")
+        self.detail_email.grid(row=2, column=1, sticky="w")
+
+        ctk.CTkLabel(details, text="Address:").grid(row=3, column=0, sticky="w")
+        self.detail_address = ctk.CTkLabel(details, text="", wraplength=700, justify="left")
+        self.detail_address.grid(row=3, column=1, sticky="w")
+        self.details = details
+
+    def _on_theme_change(self, value: str):
+        ctk.set_appearance_mode(value)
+
+    def _select_contact(self, contact: Contact):
+        self.selected_contact_name = contact.name
+        # update details
+        self.show_contact_details(contact)
+        # update cards highlight
+        self.contact_list.set_selected(self.selected_contact_name)
+
+    def refresh_contact_list(self, contacts: Optional[List[Contact]] = None, keep_position: bool = False):
+        """Shows ``contacts``, or the whole book when None."""
+        if contacts is None:
+            # len() and page() touch only the rows on screen, not the whole book
+            self.contact_list.set_contacts(len(self.manager), self.manager.page, keep_position)
+        else:
+            self.contact_list.set_contacts(len(contacts), lambda start, stop: contacts[start:stop], keep_position)
+
+    def _start_loading(self):
+        """Streams the book in on a worker thread, repainting as batches arrive."""
+        updates: "queue.Queue" = queue.Queue()
+
+        def load():
+            try:
+                for count in self.manager.iter_load():
+                    updates.put(count)
+            except Exception as e:
+                updates.put(e)
+            updates.put(None)
+
+        threading.Thread(target=load, name="contacts-loader", daemon=True).start()
+        self.root.after(LOAD_POLL_MS, lambda: self._poll_loading(updates))
+
+    def _poll_loading(self, updates: "queue.Queue"):
+        done = changed = False
+        while not updates.empty():
+            item = updates.get_nowait()
+            if item is None:
+                done = True
+            elif isinstance(item, Exception):
+                messagebox.showerror("Error", f"Could not load contacts: {item}")
+            else:
+                changed = True
+        if changed or done:
+            if not self.search_var.get().strip():
+                self.refresh_contact_list(keep_position=True)
+            elif done:
+                # rerunning the search on every batch would restart it each tick; once, with the whole book, will do
+                self.search.submit(self.search_var.get())
+        if changed:
+            if self.profile and not self._painted:
+                self.root.update_idletasks()
+                self.profile.mark("paint first contacts")
+            self._painted = True
+        if not done:
+            self.root.after(LOAD_POLL_MS, lambda: self._poll_loading(updates))
+            return
+        for button in self._edit_buttons:
+            button.configure(state="normal")
+        if self.profile:
+            self.profile.mark("load the rest of the book")
+            self.profile.report()
+        if self.watch:
+            self.root.after(WATCH_POLL_MS, self._watch_changes)
+
+    def _show_book_changes(self):
+        """Repaints the list after contacts were added or changed underneath it."""
+        query = self.search_var.get()
+        if query.strip():
+            # the new contacts may match the current search
+            self.search.submit(query)
+        else:
+            self.refresh_contact_list(keep_position=True)
+
+    def _watch_changes(self, merging: Optional["queue.Queue"] = None):
+        """Polls for saves by other instances; merging them runs off the Tk thread."""
+        if merging is not None and not merging.empty():
+            if merging.get_nowait():
+                self._show_book_changes()
+                if self.selected_contact_name:
+                    contact = self.manager.find_contact_by_name(self.selected_contact_name)
+                    if contact is not None:
+                        self.show_contact_details(contact)
+                    else:
+                        self.clear_details()
+            merging = None
+        if merging is None and self.manager.has_external_changes():
+            merging = queue.Queue()
+
+            def merge(results: "queue.Queue"):
+                try:
+                    results.put(self.manager.refresh())
+                except Exception as e:
+                    # shown by _poll_errors, like a failed save
+                    self._errors.put(f"Could not reload contacts: {e}")
+                    results.put(0)
+
+            threading.Thread(target=merge, args=(merging,), name="contacts-refresh", daemon=True).start()
+        self.root.after(WATCH_POLL_MS, lambda: self._watch_changes(merging))
+
+    def show_contact_details(self, contact: Contact):
+        if self.details is None:
+            self._build_details()
+        self.detail_name.configure(text=contact.name)
+        self.detail_phone.configure(text=contact.phone)
+        self.detail_email.configure(text=contact.email or "Not provided")
+        self.detail_address.configure(text=contact.address or "Not provided")
+
+    def clear_details(self):
+        if self.details is not None:
+            self.detail_name.configure(text="")
+            self.detail_phone.configure(text="")
+            self.detail_email.configure(text="")
+            self.detail_address.configure(text="")
+        self.selected_contact_name = None
+        self.contact_list.set_selected(None)
+
+    def on_search_change(self, _event=None):
+        self.search.submit(self.search_var.get())
+
+    def on_fuzzy_toggle(self):
+        self.search.fuzzy = self.fuzzy_var.get()
+        self.search.submit(self.search_var.get())
+
+    def clear_search(self):
+        self.search.cancel()
+        self.search_var.set("")
+        self.refresh_contact_list()
+
+    def add_contact_dialog(self):
+        dialog = ContactDialog(self.root, "Add Contact")
+        if dialog.result:
+            name, phone, email, address = dialog.result
+            if self.manager.add_contact(name, phone, email, address):
+                self._show_book_changes()
+                messagebox.showinfo("Success", f"Contact '{name}' added successfully!")
+            else:
+                if self.manager.find_contact_by_name(name):
+                    messagebox.showerror("Error", f"Contact with name '{name}' already exists!")
+                else:
+                    messagebox.showerror("Error", "Name and phone number are required!")
+
+    def update_contact_dialog(self):
+        if not self.selected_contact_name:
+            messagebox.showwarning("Warning", "Please select a contact to update.")
+            return
+        contact = self.manager.find_contact_by_name(self.selected_contact_name)
+        if not contact:
+            messagebox.showerror("Error", "Contact not found!")
+            return
+        dialog = ContactDialog(self.root, "Update Contact", contact)
+        if dialog.result:
+            name, phone, email, address = dialog.result
+            if self.manager.update_contact(self.selected_contact_name, name, phone, email, address):
+                self._show_book_changes()
+                self.clear_details()
+                messagebox.showinfo("Success", "Contact updated successfully!")
+            elif not name.strip() or not phone.strip():
+                messagebox.showerror("Error", "Name and phone number are required!")
+            elif self.manager.find_contact_by_name(self.selected_contact_name) is None:
+                messagebox.showerror("Error", "Contact not found!")
+            else:
+                messagebox.showerror("Error", f"Contact with name '{name}' already exists!")
+
+    def delete_contact_dialog(self):
+        if not self.selected_contact_name:
+            messagebox.showwarning("Warning", "Please select a contact to delete.")
+            return
+        name = self.selected_contact_name
+        result = messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete contact '{name}'?")
+        if result:
+            if self.manager.delete_contact(name):
+                self._show_book_changes()
+                self.clear_details()
+                messagebox.showinfo("Success", f"Contact '{name}' deleted successfully!")
+            else:
+                messagebox.showerror("Error", "Failed to delete contact!")
+
+    def _on_save_error(self, error: Exception):
+        # called from the writer thread, which _on_close may be waiting on: only queue the message
+        self._errors.put(f"Could not save contacts: {error}")
+
+    def _show_errors(self):
+        while not self._errors.empty():
+            messagebox.showerror("Error", self._errors.get_nowait())
+
+    def _poll_errors(self):
+        self._show_errors()
+        self.root.after(ERROR_POLL_MS, self._poll_errors)
+
+    def _on_close(self):
+        self.search.cancel()
+        self.manager.close()
+        # a failed final save is still worth telling about
+        self._show_errors()
+        self.root.destroy()
+
+    def run(self):
+        self.root.mainloop()
@@ -0,0 +1,154 @@
+import asyncio
+import itertools
+import json
+import socket
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional
+
+# contact_server's default; not imported so clients do not load the book's dependencies
+SOCKET_PATH = "contacts.sock"
+# longest reply line the asyncio client accepts, in bytes (large search results)
+MAX_REPLY = 1 << 24
+
+
+class ContactServiceError(Exception):
+    """The contact server refused a request; the message is the server's error."""
+
+
+def _encode(op: str, request_id: int, **args) -> bytes:
+    return json.dumps({"id": request_id, "op": op, **args}).encode() + b"\n"
+
+
+def _result(reply: Dict):
+    if not reply.get("ok"):
+        raise ContactServiceError(reply.get("error", "request failed"))
+    return reply["result"]
+
+
+class _Calls(ABC):
+    """The op methods shared by both clients; ``call`` does the round trip."""
+
+    @abstractmethod
+    def call(self, op: str, **args):
+        """Sends one request and returns its result (an awaitable in the asyncio client)."""
+
+    def ping(self):
+        return self.call("ping")
+
+    def search(self, query: str, limit: Optional[int] = None, fuzzy: bool = False):
+        """Contacts matching ``query`` as dicts (best first when ``fuzzy``)."""
+        args = {"query": query, "fuzzy": fuzzy}
+        if limit is not None:
+            args["limit"] = limit
+        return self.call("search", **args)
+
+    def get(self, name: str):
+        """The contact named ``name`` as a dict, or None."""
+        return self.call("get", name=name)
+
+    def find_by_phone(self, phone: str):
+        """Contacts with the same number however it is formatted, e.g. for caller ID."""
+        return self.call("phone", phone=phone)
+
+    def add(self, name: str, phone: str, email: str = "", address: str = ""):
+        return self.call("add", name=name, phone=phone, email=email, address=address)
+
+    def update(self, old_name: str, name: str, phone: str, email: str = "", address: str = ""):
+        return self.call("update", old_name=old_name, name=name, phone=phone, email=email, address=address)
+
+    def delete(self, name: str):
+        return self.call("delete", name=name)
+
+
+class ContactClient(_Calls):
+    """Blocking client for contact_server, for scripts and tools without an event loop.
+
+    Each op method returns the server's result or raises ContactServiceError.
+    search() returns {"total": n, "contacts": [...]}.
+    """
+
+    def __init__(self, path: str = SOCKET_PATH, timeout: Optional[float] = 10.0):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(path)
+        self._file = self._sock.makefile("rb")
+        self._ids = itertools.count(1)
+
+    def call(self, op: str, **args):
+        self._sock.sendall(_encode(op, next(self._ids), **args))
+        return _result(self._read())
+
+    def pipeline(self, requests: Iterable[Dict]) -> List[Dict]:
+        """Sends every request before reading any reply; returns the raw replies in order.
+
+        Each request is a dict of "op" and its arguments. One write and one
+        read loop per batch saves a round trip per request.
+        """
+        payload = b"".join(_encode(request_id=next(self._ids), **request) for request in requests)
+        self._sock.sendall(payload)
+        return [self._read() for _ in range(payload.count(b"\n"))]
+
+    def _read(self) -> Dict:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("contact server closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self) -> "ContactClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncContactClient(_Calls):
+    """asyncio client for contact_server; op methods return awaitables.
+
+    Calls may be issued concurrently from several tasks on one connection;
+    replies are matched to requests by id.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, path: str = SOCKET_PATH) -> "AsyncContactClient":
+        reader, writer = await asyncio.open_unix_connection(path, limit=MAX_REPLY)
+        return cls(reader, writer)
+
+    async def call(self, op: str, **args):
+        request_id = next(self._ids)
+        reply = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = reply
+        self._writer.write(_encode(op, request_id, **args))
+        await self._writer.drain()
+        return _result(await reply)
+
+    async def _receive(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                reply = json.loads(line)
+                waiter = self._waiting.pop(reply.get("id"), None)
+                if waiter is not None and not waiter.done():
+                    waiter.set_result(reply)
+        finally:
+            for waiter in self._waiting.values():
+                if not waiter.done():
+                    waiter.set_exception(ConnectionError("contact server closed the connection"))
+            self._waiting.clear()
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._receiver.cancel()
@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+from contact_client import SOCKET_PATH, AsyncContactClient, ContactServiceError
+
+FIRST_NAMES = ["Ann", "Ben", "Cara", "Dev", "Eli", "Fay", "Gus", "Hana", "Ivan", "Jo", "Kai", "Lena"]
+LAST_NAMES = ["Lee", "Khan", "Smith", "Garcia", "Nguyen", "Brown", "Okafor", "Rossi", "Sato", "Novak"]
+
+
+def _name(i: int) -> str:
+    return f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[i // len(FIRST_NAMES) % len(LAST_NAMES)]} {i}"
+
+
+def _digits(i: int) -> str:
+    return f"555{i:07d}"
+
+
+async def _seed(path: str, count: int):
+    """Fills a fresh book with ``count`` contacts whose names and numbers the workers can predict."""
+    client = await AsyncContactClient.connect(path)
+    try:
+        await asyncio.gather(
+            *(client.add(_name(i), f"+1 {_digits(i)}", f"user{i}@example.com") for i in range(count))
+        )
+    finally:
+        await client.close()
+
+
+async def _worker(
+    path: str, requests: int, write_ratio: float, depth: int, seed: int, population: int, latencies: List[float]
+) -> int:
+    """One connection issuing ``requests`` calls, ``depth`` at a time; returns the number of errors."""
+    rng = random.Random(seed)
+    client = await AsyncContactClient.connect(path)
+    errors = 0
+    serial = 0
+
+    async def one():
+        nonlocal errors, serial
+        pick = rng.random()
+        i = rng.randrange(population)
+        start = time.perf_counter()
+        try:
+            if pick < write_ratio:
+                serial += 1
+                name = f"Load {seed}-{serial}"
+                await client.add(name, f"555{seed:03d}{serial:04d}")
+                await client.delete(name)
+            elif pick < 0.5:
+                await client.search(rng.choice(LAST_NAMES).lower()[:4], limit=20)
+            elif pick < 0.8:
+                digits = _digits(i)
+                await client.find_by_phone(f"({digits[:3]}) {digits[3:6]}-{digits[6:]}")
+            else:
+                await client.get(_name(i))
+        except ContactServiceError:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+
+    try:
+        for start in range(0, requests, depth):
+            await asyncio.gather(*(one() for _ in range(min(depth, requests - start))))
+    finally:
+        await client.close()
+    return errors
+
+
+async def _clients(
+    path: str, clients: int, requests: int, write_ratio: float, depth: int, population: int, seed: int
+) -> Tuple[List[float], int]:
+    latencies: List[float] = []
+    errors = await asyncio.gather(
+        *(_worker(path, requests, write_ratio, depth, seed + n, population, latencies) for n in range(clients))
+    )
+    return latencies, sum(errors)
+
+
+def _client_process(*args) -> Tuple[List[float], int]:
+    return asyncio.run(_clients(*args))
+
+
+def run(
+    path: str, clients: int, requests: int, write_ratio: float, depth: int, population: int, seed: int, processes: int
+):
+    """Spreads ``clients`` connections over ``processes`` so the clients themselves are not the bottleneck."""
+    share = [clients // processes + (n < clients % processes) for n in range(processes)]
+    latencies: List[float] = []
+    errors = 0
+    started = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        runs = [
+            pool.submit(_client_process, path, count, requests, write_ratio, depth, population, seed + 1000 * n)
+            for n, count in enumerate(share)
+            if count
+        ]
+        for done in runs:
+            part, failed = done.result()
+            latencies += part
+            errors += failed
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    print(f"{len(latencies)} requests from {clients} clients in {elapsed:.2f}s: {len(latencies) / elapsed:,.0f} req/s")
+    print(f"latency ms  p50 {pct(0.50):.2f}  p95 {pct(0.95):.2f}  p99 {pct(0.99):.2f}  max {latencies[-1] * 1000:.2f}")
+    if errors:
+        print(f"{errors} requests were refused")
+
+
+def _wait_for_socket(path: str, server: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if server.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("contact server did not start")
+        time.sleep(0.05)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load-test contact_server with concurrent clients")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="socket of a running server")
+    parser.add_argument("--spawn", type=int, metavar="N", help="start a private server on a temporary book of N contacts")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="client processes to spread them over")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per client")
+    parser.add_argument("--depth", type=int, default=4, help="requests each client keeps in flight")
+    parser.add_argument("--writes", type=float, default=0.05, help="fraction of requests that add and delete a contact")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    if args.spawn is None:
+        run(args.socket, args.clients, args.requests, args.writes, args.depth, 10000, args.seed, args.processes)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "contacts.sock")
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "contact_server.py"),
+             "--book", os.path.join(tmp, "contacts.json"), "--socket", path]
+        )
+        try:
+            _wait_for_socket(path, server)
+            asyncio.run(_seed(path, args.spawn))
+            population = max(args.spawn, 1)
+            run(path, args.clients, args.requests, args.writes, args.depth, population, args.seed, args.processes)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
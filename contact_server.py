@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import errno
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from contact_book import ContactManager, FUZZY_TOP_K
+
+# default socket, next to the default contacts.json
+SOCKET_PATH = "contacts.sock"
+# longest request line accepted, in bytes
+MAX_LINE = 1 << 16
+# search results returned when the request gives no limit
+SEARCH_LIMIT = 100
+# how often the server looks for edits other instances saved to the book
+WATCH_SECONDS = 1.0
+# ops that may scan the whole book or build an index first, so they run off the event loop
+OFF_LOOP_OPS = frozenset({"search"})
+
+
+class RequestError(Exception):
+    """A request the server understood but cannot carry out; sent back as the error."""
+
+
+def _text(request: Dict, key: str, default: Optional[str] = None) -> str:
+    value = request.get(key, default)
+    if not isinstance(value, str):
+        raise RequestError(f"'{key}' must be a string")
+    return value
+
+
+def _contact_fields(request: Dict) -> List[str]:
+    return [_text(request, "name"), _text(request, "phone"), _text(request, "email", ""), _text(request, "address", "")]
+
+
+class ContactServer:
+    """Serves a ContactManager to local tools over a Unix socket.
+
+    The protocol is line-delimited JSON. Each request is an object with an
+    "op" and the op's arguments; an optional "id" is echoed back. Replies
+    come in request order on each connection:
+
+        {"id": 1, "op": "search", "query": "ann", "limit": 20}
+        {"id": 1, "ok": true, "result": {"total": 3, "contacts": [...]}}
+
+    Ops: ping, search (query, limit, fuzzy), get (name), phone (phone),
+    add (name, phone, email, address), update (old_name plus the add
+    fields) and delete (name). A failure replies {"ok": false, "error": ...}.
+
+    The book stays in memory. Lookups by name and phone, and edits, run on
+    the event loop: they are dict lookups and index updates. Searches can
+    scan the whole book (queries shorter than a trigram, or while the
+    trigram index is built) or build the fuzzy tree first, which takes
+    seconds on a large book, so they run on the default executor; the
+    manager's lock makes that safe, and other clients are served
+    meanwhile. Edits are journaled by the manager's background writer,
+    which coalesces bursts into single appends.
+    """
+
+    def __init__(self, manager: ContactManager, path: str = SOCKET_PATH):
+        self.manager = manager
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Set[asyncio.StreamWriter] = set()
+        self._handlers: Dict[str, Callable[[Dict], object]] = {
+            "ping": lambda request: "pong",
+            "search": self._search,
+            "get": self._get,
+            "phone": self._phone,
+            "add": self._add,
+            "update": self._update,
+            "delete": self._delete,
+        }
+
+    def _search(self, request: Dict) -> Dict:
+        query = _text(request, "query")
+        limit = request.get("limit", SEARCH_LIMIT)
+        if not isinstance(limit, int) or limit < 0:
+            raise RequestError("'limit' must be a non-negative integer")
+        if request.get("fuzzy"):
+            contacts = self.manager.fuzzy_search_contacts(query, min(limit, FUZZY_TOP_K))
+        elif query.strip():
+            contacts = self.manager.search_contacts(query)
+        else:
+            # the whole book: only the page returned is read
+            return {"total": len(self.manager), "contacts": [c.to_dict() for c in self.manager.page(0, limit)]}
+        return {"total": len(contacts), "contacts": [c.to_dict() for c in contacts[:limit]]}
+
+    def _get(self, request: Dict) -> Optional[Dict]:
+        contact = self.manager.find_contact_by_name(_text(request, "name"))
+        return contact.to_dict() if contact is not None else None
+
+    def _phone(self, request: Dict) -> List[Dict]:
+        return [c.to_dict() for c in self.manager.find_contacts_by_phone(_text(request, "phone"))]
+
+    def _add(self, request: Dict) -> Dict:
+        name, phone, email, address = _contact_fields(request)
+        if not self.manager.add_contact(name, phone, email, address):
+            raise RequestError(self._rejection(name, phone))
+        return self.manager.find_contact_by_name(name.strip()).to_dict()
+
+    def _update(self, request: Dict) -> Dict:
+        old_name = _text(request, "old_name")
+        name, phone, email, address = _contact_fields(request)
+        if not self.manager.update_contact(old_name, name, phone, email, address):
+            if self.manager.find_contact_by_name(old_name) is None:
+                raise RequestError(f"Contact '{old_name}' not found")
+            raise RequestError(self._rejection(name, phone))
+        return self.manager.find_contact_by_name(name.strip()).to_dict()
+
+    def _delete(self, request: Dict) -> bool:
+        name = _text(request, "name")
+        if not self.manager.delete_contact(name):
+            raise RequestError(f"Contact '{name}' not found")
+        return True
+
+    @staticmethod
+    def _rejection(name: str, phone: str) -> str:
+        if not name.strip() or not phone.strip():
+            return "Name and phone number are required"
+        return f"Contact with name '{name.strip()}' already exists"
+
+    def _parse(self, line: bytes) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """The request on ``line`` and None, or None and the error reply."""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return None, {"id": None, "ok": False, "error": "invalid JSON"}
+        if not isinstance(request, dict):
+            return None, {"id": None, "ok": False, "error": "request must be a JSON object"}
+        op = request.get("op")
+        if not isinstance(op, str) or op not in self._handlers:
+            return None, {"id": request.get("id"), "ok": False, "error": f"unknown op {op!r}"}
+        return request, None
+
+    def _answer(self, request: Dict) -> Dict:
+        request_id = request.get("id")
+        try:
+            return {"id": request_id, "ok": True, "result": self._handlers[request["op"]](request)}
+        except RequestError as e:
+            return {"id": request_id, "ok": False, "error": str(e)}
+        except Exception as e:
+            # a bug or a failed lookup: answer it and keep serving the other requests
+            return {"id": request_id, "ok": False, "error": f"internal error: {type(e).__name__}: {e}"}
+
+    def handle(self, line: bytes) -> Dict:
+        """Answers one request line on the calling thread."""
+        request, error = self._parse(line)
+        return error if request is None else self._answer(request)
+
+    async def _handle(self, line: bytes) -> Dict:
+        """handle(), with the OFF_LOOP_OPS answered on the default executor."""
+        request, error = self._parse(line)
+        if request is None:
+            return error
+        if request["op"] in OFF_LOOP_OPS:
+            return await asyncio.get_running_loop().run_in_executor(None, self._answer, request)
+        return self._answer(request)
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # longer than MAX_LINE: the stream cannot be resynchronized, so hang up
+                    writer.write(b'{"id": null, "ok": false, "error": "request too long"}\n')
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                writer.write(json.dumps(await self._handle(line)).encode() + b"\n")
+                # only waits when the client is not reading its replies
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _watch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(WATCH_SECONDS)
+            if self.manager.has_external_changes():
+                # merging may parse the whole snapshot, so keep it off the event loop
+                try:
+                    await loop.run_in_executor(None, self.manager.refresh)
+                except Exception as e:
+                    # e.g. a half-written file from another tool; retried on the next change
+                    print(f"Error reloading contacts: {e}", file=sys.stderr)
+
+    def _remove_stale_socket(self):
+        """Removes a socket left behind by a server that did not shut down cleanly.
+
+        Raises OSError (EADDRINUSE) if a server still answers on it, or if
+        the path is something other than a socket.
+        """
+        try:
+            mode = os.stat(self.path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise OSError(errno.EADDRINUSE, f"{self.path} exists and is not a socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except ConnectionRefusedError:
+            os.unlink(self.path)
+            return
+        finally:
+            probe.close()
+        raise OSError(errno.EADDRINUSE, f"a contact server is already listening on {self.path}")
+
+    async def serve(self):
+        """Serves until cancelled or sent SIGINT/SIGTERM, then writes out pending edits."""
+        self._remove_stale_socket()
+        self._server = await asyncio.start_unix_server(self._serve_client, self.path, limit=MAX_LINE)
+        loop = asyncio.get_running_loop()
+        stopped = loop.create_future()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, lambda: stopped.done() or stopped.set_result(None))
+        watcher = asyncio.ensure_future(self._watch())
+        try:
+            await stopped
+        finally:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
+            watcher.cancel()
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            await self._server.wait_closed()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            await loop.run_in_executor(None, self.manager.flush)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Serve a contact book to local tools over a Unix socket")
+    parser.add_argument("--book", default="contacts.json", help="contact book to serve")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path to listen on")
+    args = parser.parse_args(argv)
+    manager = ContactManager(args.book, journal=True, background=True)
+    server = ContactServer(manager, args.socket)
+    print(f"Serving {len(manager)} contacts on {args.socket}")
+    try:
+        asyncio.run(server.serve())
+    except OSError as e:
+        parser.exit(1, f"Error: {e}\n")
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 import random
+import sys
 from pathlib import Path
 import tkinter as tk
 from tkinter import Canvas, Button, Label, PhotoImage
 
+# the asset loader is shared with the other Tk apps at the repo's top level
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tk_assets import AssetLoader
+
 class GameGUI:
     def __init__(self, root, assets_path):
         self.root = root
@@ -17,16 +22,13 @@ class GameGUI:
         return self.assets_path / filename
 
     def _load_images(self):
-        # Must have called Tk() first
-        self.scissor_img = PhotoImage(master=self.root,
-                                      file=self.relative_to_assets("scissor.png"))
+        # Must have called Tk() first; all four are cut from one decoded atlas
+        self.assets = AssetLoader.shared(self.assets_path, self.root)
+        self.scissor_img = self.assets.image("scissor.png")
         # You’re already using logo.png instead of paper.png
-        self.paper_img   = PhotoImage(master=self.root,
-                                      file=self.relative_to_assets("paper.png"))
-        self.rock_img    = PhotoImage(master=self.root,
-                                      file=self.relative_to_assets("rock.png"))
-        self.restart_img = PhotoImage(master=self.root,
-                                      file=self.relative_to_assets("restart.png"))
+        self.paper_img   = self.assets.image("paper.png")
+        self.rock_img    = self.assets.image("rock.png")
+        self.restart_img = self.assets.image("restart.png")
         # blank placeholder for the bot slot
         self.blank_img   = PhotoImage(master=self.root, width=63, height=63)
 
@@ -180,4 +182,7 @@ if __name__ == "__main__":
     root.resizable(False, False)
 
     app = GameGUI(root, assets_folder)
+    if "--profile-startup" in sys.argv:
+        # what the images cost before the first paint
+        root.after_idle(app.assets.report)
     root.mainloop()
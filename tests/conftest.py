@@ -0,0 +1,8 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the contact book lives at the top level and the to-do store in its app folder; neither is installed
+for path in (ROOT, os.path.join(ROOT, "To-Do-List")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
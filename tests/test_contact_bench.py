@@ -0,0 +1,12 @@
+import json
+import threading
+
+import contact_bench
+
+
+def test_bench_closes_every_manager(tmp_path):
+    output = tmp_path / "bench.json"
+    contact_bench.main(["--sizes", "50", "--repeat", "3", "--no-gui", "--memory", "--output", str(output)])
+    assert json.loads(output.read_text())["results"]
+    # each load repeat and each backend made a manager with its own writer thread
+    assert not [t for t in threading.enumerate() if t.name == "contacts-writer"]
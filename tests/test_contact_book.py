@@ -0,0 +1,488 @@
+import json
+import os
+import random
+import threading
+
+import pytest
+
+import contact_book
+from contact_book import (
+    BackgroundWriter,
+    ContactManager,
+    FuzzyNameIndex,
+    PositionIndex,
+    _edit_pattern,
+    _levenshtein,
+    find_duplicate_groups,
+    _osa_distance,
+)
+
+
+@pytest.fixture
+def book(tmp_path):
+    return str(tmp_path / "contacts.json")
+
+
+def _check_indexes(manager: ContactManager, model: dict):
+    """The manager agrees with ``model`` (lowercase name -> fields, in list order) through every index."""
+    expected = list(model.values())
+    assert [c.fields() for c in manager.contacts] == expected
+    assert len(manager) == len(expected)
+    assert [c.fields() for c in manager.page(0, len(expected))] == expected
+    for start in range(0, len(expected) + 3, 7):
+        assert [c.fields() for c in manager.page(start, start + 5)] == expected[start:start + 5]
+    for key, fields in model.items():
+        assert manager.find_contact_by_name(key.upper()).fields() == fields
+    for query in ("an", "ann", "555", "mail.co", "zzz"):
+        assert [c.fields() for c in manager.search_contacts(query)] == [
+            f for f in expected if query in f[0].lower() or query in f[1] or query in f[2].lower()
+        ]
+
+
+def test_position_index_matches_a_list():
+    rng = random.Random(3)
+    index, alive = PositionIndex(), []
+    for cid in range(2000):
+        index.append(cid)
+        alive.append(cid)
+        if alive and rng.random() < 0.4:
+            gone = alive.pop(rng.randrange(len(alive)))
+            index.discard(gone)
+    assert len(index) == len(alive)
+    assert [index.select(i) for i in range(len(alive))] == alive
+    with pytest.raises(IndexError):
+        index.select(len(alive))
+    with pytest.raises(ValueError):
+        index.append(5)
+
+
+def test_indexes_stay_consistent_through_edits(book):
+    rng = random.Random(1)
+    manager = ContactManager(book)
+    model = {}
+    for step in range(400):
+        names = list(model)
+        pick = rng.random()
+        if pick < 0.5 or not names:
+            name = f"{rng.choice(['Ann', 'Dan', 'Hannah', 'Bo'])} {step}"
+            fields = (name, f"+1 555 {step:04d}", f"{name.split()[0].lower()}{step}@mail.com", "")
+            assert manager.add_contact(*fields)
+            model[name.lower()] = fields
+        elif pick < 0.8:
+            old = rng.choice(names)
+            name = f"Renamed {step}" if rng.random() < 0.5 else model[old][0]
+            fields = (name, f"555-{step:04d}", "", "1 Main St")
+            assert manager.update_contact(model[old][0], *fields)
+            # an update keeps the contact's place in the list
+            model = {(name.lower() if k == old else k): (fields if k == old else v) for k, v in model.items()}
+        else:
+            victim = rng.choice(names)
+            assert manager.delete_contact(model.pop(victim)[0])
+        if step % 50 == 0:
+            _check_indexes(manager, model)
+    _check_indexes(manager, model)
+    # the file holds the same book
+    _check_indexes(ContactManager(book), model)
+
+
+def test_rejected_edits_change_nothing(book):
+    manager = ContactManager(book)
+    assert manager.add_contact("Ann Lee", "555 0100")
+    assert manager.add_contact("Bo Chan", "555 0101")
+    assert not manager.add_contact("ann lee", "555 0102")
+    assert not manager.add_contact("  ", "555 0103")
+    assert not manager.update_contact("Ann Lee", "BO CHAN", "555 0104")
+    assert not manager.delete_contact("Nobody")
+    _check_indexes(manager, {"ann lee": ("Ann Lee", "555 0100", "", ""), "bo chan": ("Bo Chan", "555 0101", "", "")})
+
+
+def _names(manager: ContactManager):
+    return [c.name for c in manager.contacts]
+
+
+def test_plain_mode_keeps_the_plain_list_format(book):
+    manager = ContactManager(book)
+    manager.add_contact("Ann Lee", "555 0100")
+    with open(book) as f:
+        assert json.load(f) == [{"name": "Ann Lee", "phone": "555 0100", "email": "", "address": ""}]
+
+
+def test_journal_replays_after_a_crash_mid_compaction(book):
+    manager = ContactManager(book, journal=True)
+    for i in range(5):
+        manager.add_contact(f"Person {i}", f"555 010{i}")
+    manager.delete_contact("Person 1")
+    # the snapshot was replaced but the crash came before the journal was trimmed
+    manager._write_snapshot(manager._seq, [c.fields() for c in manager.contacts])
+    with open(book) as f:
+        assert json.load(f)["seq"] == manager._seq
+    manager.add_contact("Person 5", "555 0105")
+    manager.update_contact("Person 0", "Person Zero", "555 0100")
+
+    reloaded = ContactManager(book, journal=True)
+    assert _names(reloaded) == _names(manager) == ["Person Zero", "Person 2", "Person 3", "Person 4", "Person 5"]
+
+
+def test_journal_cuts_a_torn_record(book):
+    manager = ContactManager(book, journal=True)
+    manager.add_contact("Ann Lee", "555 0100")
+    with open(book + ".log", "ab") as f:
+        f.write(b'{"s": 99, "op": "add", "c": ["Half')
+    reloaded = ContactManager(book, journal=True)
+    assert _names(reloaded) == ["Ann Lee"]
+    with open(book + ".log", "rb") as f:
+        assert f.read().endswith(b"\n")
+    reloaded.add_contact("Bo Chan", "555 0101")
+    assert _names(ContactManager(book, journal=True)) == ["Ann Lee", "Bo Chan"]
+
+
+def test_failed_snapshot_write_reports_the_real_error(book, monkeypatch):
+    manager = ContactManager(book)
+    manager.add_contact("Ann Lee", "555 0100")
+    real_open = open
+
+    def failing_open(path, *args, **kwargs):
+        if str(path).endswith(".tmp"):
+            raise OSError("disk full")
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", failing_open)
+    with pytest.raises(OSError, match="disk full"):
+        manager._write_snapshot(manager._seq, [c.fields() for c in manager.contacts])
+
+
+def test_search_matches_without_holding_the_lock(book, monkeypatch):
+    manager = ContactManager(book)
+    for i in range(30):
+        manager.add_contact(f"Ann {i}", f"555 {i:04d}")
+    assert manager.build_search_index()
+    held = []
+    matches = ContactManager._matches
+
+    def spy(contact, query, digits=""):
+        held.append(manager.lock._is_owned())
+        return matches(contact, query, digits)
+
+    monkeypatch.setattr(ContactManager, "_matches", staticmethod(spy))
+    # a short number scans every contact, a long query only the trigram candidates
+    assert len(manager.search_contacts("55")) == 30
+    assert [c.name for c in manager.search_contacts("ann 1")][:2] == ["Ann 1", "Ann 10"]
+    assert held and not any(held)
+
+
+def _scan(manager: ContactManager, query: str):
+    query = query.lower()
+    digits = contact_book._phone_query(query)
+    return [c for c in manager.contacts if ContactManager._matches(c, query, digits)]
+
+
+SEARCHES = ("ann", "an", "nah", "555", "555 01", "(555) 0", "55", "-01", "---", "ext", "EXT 9", "mail.co", "zzz")
+
+
+def test_trigram_index_is_built_on_demand_and_agrees_with_a_scan(book):
+    rng = random.Random(2)
+    manager = ContactManager(book)
+    for i in range(300):
+        phone = f"555-{i:04d}" if i % 7 else f"555 {i:04d} EXT {i % 10}"
+        manager.add_contact(f"{rng.choice(['Ann', 'Hannah', 'Dan'])} {i}", phone, f"p{i}@mail.com")
+    # loading and editing never build it
+    assert manager._gram_index is None
+    assert manager.build_search_index()
+    for step in range(600):
+        names = [c.name for c in manager.contacts]
+        if rng.random() < 0.3:
+            manager.add_contact(f"Dan {step} new", f"(555) {step:04d}", "")
+        elif rng.random() < 0.7:
+            manager.update_contact(rng.choice(names), f"Hannah {step}", f"555-{step:04d} ext {step % 10}")
+        else:
+            manager.delete_contact(rng.choice(names))
+        if manager._gram_index is None:
+            # stale entries piled up: the index was dropped, and is built again
+            assert manager.build_search_index()
+        if step % 40 == 0:
+            for query in SEARCHES:
+                assert manager.search_contacts(query) == _scan(manager, query), query
+
+
+def test_trigram_index_built_while_the_book_is_edited(book, monkeypatch):
+    monkeypatch.setattr(contact_book, "GRAM_BUILD_BATCH", 5)
+    manager = ContactManager(book, journal=True)
+    manager.import_contacts({"name": f"Ann {i}", "phone": f"555-{i:04d}", "email": f"ann{i}@mail.com"}
+                            for i in range(2000))
+    builder = threading.Thread(target=manager.build_search_index)
+    builder.start()
+    step = 0
+    while builder.is_alive() or step < 50:
+        manager.update_contact(f"Ann {step * 7}", f"Hannah {step}", f"555-9{step:03d}")
+        manager.delete_contact(f"Ann {step * 7 + 1}")
+        manager.add_contact(f"Dan {step}", f"555-8{step:03d}")
+        step += 1
+    builder.join()
+    assert manager._gram_upto == contact_book._ALL_IDS
+    for query in SEARCHES + ("hannah 1", "dan 4", "ann 19"):
+        assert manager.search_contacts(query) == _scan(manager, query), query
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_import_writes_the_snapshot_once(book, monkeypatch, journal):
+    manager = ContactManager(book, journal=journal)
+    writes = []
+    write_snapshot = manager._write_snapshot
+    monkeypatch.setattr(manager, "_write_snapshot", lambda *a: writes.append(a) or write_snapshot(*a))
+    rows = [{"name": f"Contact {i}", "phone": f"555 {i:05d}"} for i in range(12000)]
+    progress = []
+    report = manager.import_contacts(rows, batch_size=5000, progress=progress.append)
+    manager.flush()
+    assert report.added == 12000 and len(progress) == 3
+    assert len(writes) == (0 if journal else 1)
+    assert len(ContactManager(book, journal=journal)) == 12000
+
+
+def test_cli_import_leaves_a_compacted_book(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    with open("in.csv", "w") as f:
+        f.write("name,phone\n" + "".join(f"Contact {i},555 {i:05d}\n" for i in range(20000)))
+    # an import this size passes JOURNAL_COMPACT_BYTES, so it starts a compaction
+    closed = []
+    close = ContactManager.close
+    monkeypatch.setattr(ContactManager, "close", lambda self, *a: closed.append(self) or close(self, *a))
+    contact_book.main(["--import", "in.csv"])
+    assert "Imported 20000 contacts" in capsys.readouterr().out
+    assert len(closed) == 1 and not closed[0]._compactor.is_alive()
+    assert not list(tmp_path.glob("*.tmp"))
+    # the compaction finished: the snapshot holds every contact and the journal was trimmed
+    assert len(ContactManager("contacts.json")) == 20000
+    assert os.path.getsize("contacts.json.log") == 0
+
+
+def test_non_string_fields_from_an_older_book_are_saved(book):
+    # json.dump wrote whatever the file held, so a hand-edited book may have a numeric phone or a null
+    with open(book, "w") as f:
+        json.dump([{"name": "Ann", "phone": 5550100, "email": None, "address": ""}], f)
+    manager = ContactManager(book)
+    assert manager.find_contact_by_name("ann").fields() == ("Ann", "5550100", "", "")
+    assert [c.name for c in manager.search_contacts("0100")] == ["Ann"]
+    manager.save_contacts()
+    with open(book) as f:
+        assert json.load(f) == [{"name": "Ann", "phone": "5550100", "email": "", "address": ""}]
+
+
+def test_background_writer_reports_errors_and_closes():
+    saves, errors = [], []
+
+    def save():
+        saves.append(threading.current_thread().name)
+        if len(saves) == 1:
+            raise OSError("disk full")
+
+    writer = BackgroundWriter(save, errors.append)
+    writer.request()
+    assert writer.flush(5)
+    assert [str(e) for e in errors] == ["disk full"]
+    writer.request()
+    # close writes the pending request without waiting out the coalescing delay
+    assert writer.close(5)
+    assert saves == ["contacts-writer"] * 2
+    assert not writer._thread.is_alive()
+    with pytest.raises(RuntimeError):
+        writer.request()
+
+
+def test_close_saves_and_stops_the_writer(book):
+    manager = ContactManager(book, journal=True, background=True)
+    manager.add_contact("Ann", "555 0100")
+    assert manager.close(5)
+    assert not manager._writer._thread.is_alive()
+    assert _names(ContactManager(book, journal=True)) == ["Ann"]
+
+
+def _naive_distance(a: str, b: str, swaps: bool) -> int:
+    """Edit distance straight from its recursive definition; ``swaps`` adds adjacent transpositions (OSA)."""
+    memo = {}
+
+    def d(i, j):
+        if (i, j) not in memo:
+            if not i or not j:
+                memo[i, j] = i + j
+            else:
+                best = min(d(i - 1, j) + 1, d(i, j - 1) + 1, d(i - 1, j - 1) + (a[i - 1] != b[j - 1]))
+                if swaps and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                    best = min(best, d(i - 2, j - 2) + 1)
+                memo[i, j] = best
+        return memo[i, j]
+
+    return d(len(a), len(b))
+
+
+def test_edit_distances_match_the_naive_definitions():
+    rng = random.Random(7)
+    for _ in range(2000):
+        # a small alphabet makes repeats and swaps common; lengths past 64 cross a machine word
+        a = "".join(rng.choices("abcd", k=rng.randrange(0, 12 if rng.random() < 0.9 else 80)))
+        b = "".join(rng.choices("abcd", k=rng.randrange(0, 12 if rng.random() < 0.9 else 80)))
+        assert _levenshtein(_edit_pattern(a), b) == _naive_distance(a, b, swaps=False), (a, b)
+        assert _osa_distance(_edit_pattern(a), b) == _naive_distance(a, b, swaps=True), (a, b)
+
+
+def test_fuzzy_index_matches_a_scan():
+    rng = random.Random(5)
+    index, names = FuzzyNameIndex(), {}
+    words = ["jon", "john", "jhon", "joan", "hannah", "hanna", "anna", "ortiz", "ortis", "berg", "borg"]
+    for cid in range(300):
+        names[cid] = f"{rng.choice(words)} {rng.choice(words)}"
+        index.add(cid, names[cid])
+        if rng.random() < 0.3:
+            gone = rng.choice(list(names))
+            index.discard(gone, names.pop(gone))
+    for query in ("jhon", "hanah ortiz", "berg", "xyz"):
+        def score(name):
+            total = 0
+            for token in query.split():
+                tolerance = 0 if len(token) <= 2 else 1 if len(token) <= 3 else 2
+                d = min(_naive_distance(token, word, swaps=True) for word in name.split())
+                if d > tolerance:
+                    return None
+                total += d
+            return total
+
+        expected = sorted((score(name), cid) for cid, name in names.items() if score(name) is not None)
+        assert index.search(query, 1000) == expected
+
+
+def test_fuzzy_search_builds_without_the_manager_lock(book, monkeypatch):
+    manager = ContactManager(book)
+    for i in range(50):
+        manager.add_contact(f"Person{i} Ortiz", f"555 {i:04d}")
+    held = []
+    insert = FuzzyNameIndex._insert
+
+    def spy(self, token):
+        held.append(manager.lock._is_owned())
+        insert(self, token)
+
+    monkeypatch.setattr(FuzzyNameIndex, "_insert", spy)
+    found = manager.fuzzy_search_contacts("Ortis", 3)
+    assert [c.name for c in found] == ["Person0 Ortiz", "Person1 Ortiz", "Person2 Ortiz"]
+    assert held and not any(held)
+    # a contact deleted after the tree was built is not returned
+    manager.delete_contact("Person0 Ortiz")
+    assert manager.fuzzy_search_contacts("Ortis", 1)[0].name == "Person1 Ortiz"
+
+
+def _brute_force_duplicates(rows):
+    """find_duplicate_groups by comparing every pair, for books whose blocks stay under max_block."""
+    def tokens(name):
+        return [t for t in name.lower().replace(".", " ").split() if not t.isdigit()]
+
+    def close(t, u):
+        tolerance = 0 if len(t) <= 2 else 1 if len(t) <= 3 else 2 if len(t) <= 8 else 3
+        return _naive_distance(t, u, swaps=True) <= tolerance
+
+    def similar(a, b):
+        if len(a) > len(b):
+            a, b = b, a
+        return bool(a) and all(any(close(t, u) for u in b) for t in a)
+
+    def key(phone):
+        digits = "".join(ch for ch in phone if ch.isdigit())[-10:]
+        return digits if len(digits) >= 7 else None
+
+    group = {cid: {cid} for cid, *_ in rows}
+    for i, (a, a_name, a_phone, a_email) in enumerate(rows):
+        for b, b_name, b_phone, b_email in rows[i + 1:]:
+            domain = a_email.partition("@")[2]
+            if (
+                key(a_phone) is not None and key(a_phone) == key(b_phone)
+                or a_email and a_email.lower() == b_email.lower()
+                or domain and domain == b_email.partition("@")[2]
+                and set(tokens(a_name)) & set(tokens(b_name)) and similar(tokens(a_name), tokens(b_name))
+            ):
+                merged = group[a] | group[b]
+                for cid in merged:
+                    group[cid] = merged
+    return sorted({tuple(sorted(g)) for g in group.values() if len(g) > 1})
+
+
+def test_duplicate_groups_match_a_pairwise_scan():
+    rng = random.Random(11)
+    first = ["jon", "john", "jhon", "ann", "anne", "hannah", "hanah"]
+    last = ["ortiz", "ortis", "berg", "borg", "smith", "smyth", "lee"]
+    rows = []
+    for cid in range(150):
+        name = f"{rng.choice(first)} {rng.choice(last)} {cid}"
+        phone = rng.choice([f"+1 (555) 010-{cid:04d}", f"555{rng.randrange(20):04d}", "12"])
+        email = rng.choice(["", f"u{cid}@a.com", f"u{cid}@b.org", f"same{rng.randrange(3)}@c.net"])
+        rows.append((cid, name, phone, email))
+    groups = find_duplicate_groups(*map(list, zip(*rows)))
+    assert [tuple(g) for g in groups] == _brute_force_duplicates(rows)
+
+
+def test_duplicate_groups_catch_reformatted_phones_and_typos():
+    rows = [
+        (0, "Hannah Berg", "+1 (555) 010-2000", "hannah@mail.com"),
+        (1, "Hannah Berg", "5550102000", ""),
+        (2, "Jon Ortiz", "111", "jon@corp.com"),
+        (3, "Jno Ortiz", "222", "j.ortiz@corp.com"),
+        (4, "Jon Ortiz", "333", "jon@other.com"),
+        (5, "Ann Lee", "444", "ANN@MAIL.COM"),
+        (6, "Annie L", "555", " ann@mail.com "),
+    ]
+    assert find_duplicate_groups(*map(list, zip(*rows))) == [[0, 1], [2, 3], [5, 6]]
+    # a block larger than max_block is not compared pairwise
+    assert find_duplicate_groups(*map(list, zip(*rows)), max_block=1) == [[0, 1], [5, 6]]
+    assert find_duplicate_groups([], [], [], []) == []
+
+
+def test_find_duplicates_clusters_without_the_lock(book, monkeypatch):
+    manager = ContactManager(book)
+    manager.add_contact("Hannah Berg", "+1 (555) 010-2000")
+    manager.add_contact("Hanna Berg", "555-010-2000")
+    manager.add_contact("Dan Ortiz", "555 0199")
+    held = []
+    groups = contact_book.find_duplicate_groups
+
+    def spy(*args, **kwargs):
+        held.append(manager.lock._is_owned())
+        return groups(*args, **kwargs)
+
+    monkeypatch.setattr(contact_book, "find_duplicate_groups", spy)
+    assert [[c.name for c in g] for g in manager.find_duplicates()] == [["Hannah Berg", "Hanna Berg"]]
+    assert held == [False]
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_two_managers_on_one_book_see_each_others_edits(book, journal):
+    ours = ContactManager(book, journal=journal)
+    ours.add_contact("Ann", "555 0100")
+    theirs = ContactManager(book, journal=journal)
+    assert not theirs.has_external_changes()
+
+    ours.add_contact("Bo", "555 0101")
+    ours.update_contact("Ann", "Ann", "555 0199")
+    assert theirs.has_external_changes()
+    assert theirs.refresh() == 2
+    assert not theirs.has_external_changes()
+    assert theirs.find_contact_by_name("ann").phone == "555 0199"
+
+    # each saves without having seen the other's latest edit; neither edit is lost
+    theirs.add_contact("Cy", "555 0102")
+    ours.delete_contact("Bo")
+    theirs.refresh()
+    ours.refresh()
+    for manager in (ours, theirs):
+        assert _names(manager) == ["Ann", "Cy"]
+    assert _names(ContactManager(book, journal=journal)) == ["Ann", "Cy"]
+
+
+def test_refresh_merges_a_compacted_snapshot(book):
+    ours = ContactManager(book, journal=True, compact_threshold=1)
+    theirs = ContactManager(book, journal=True)
+    for i in range(5):
+        ours.add_contact(f"Contact {i}", f"555 010{i}")
+    ours.flush()
+    # the journal was folded into a new snapshot, which the other manager merges
+    assert theirs.refresh() == 5
+    theirs.update_contact("Contact 0", "Contact 0", "555 0999")
+    ours.refresh()
+    assert ours.find_contact_by_name("contact 0").phone == "555 0999"
+    assert _names(ours) == _names(theirs) == [f"Contact {i}" for i in range(5)]
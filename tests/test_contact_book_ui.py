@@ -0,0 +1,90 @@
+import itertools
+import time
+
+import pytest
+
+from contact_book import ContactManager
+from contact_book_ui import SearchPipeline
+
+
+class _Widget:
+    """Stands in for the Tk widget SearchPipeline schedules its callbacks on."""
+
+    def __init__(self):
+        self._calls = {}
+        self._ids = itertools.count()
+
+    def after(self, ms, callback):
+        call_id = str(next(self._ids))
+        self._calls[call_id] = callback
+        return call_id
+
+    def after_cancel(self, call_id):
+        self._calls.pop(call_id, None)
+
+    def run(self):
+        calls, self._calls = self._calls, {}
+        for callback in calls.values():
+            callback()
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ContactManager(str(tmp_path / "contacts.json"))
+    for fields in (
+        ("Ann Lee", "555-1234", "ann@mail.com"),
+        ("Bob Ray", "(555) 987", ""),
+        ("Cy Moss", "+555 0100", "cy555@mail.com"),
+        ("Dana Ann", "5551234", ""),
+        ("Eve (5) Stone", "0100", "eve+5@mail.com"),
+    ):
+        manager.add_contact(*fields)
+    return manager
+
+
+def _typed(manager, queries, monkeypatch):
+    """Searches each query as if typed with a pause after it; returns the last results and the full searches."""
+    widget, shown, full = _Widget(), [], []
+    search = manager.search_contacts
+
+    def counted(query):
+        full.append(query)
+        return search(query)
+
+    monkeypatch.setattr(manager, "search_contacts", counted)
+    pipeline = SearchPipeline(widget, manager, shown.append)
+    for query in queries:
+        count = len(shown)
+        pipeline._start(query)
+        deadline = time.monotonic() + 5
+        while len(shown) == count:
+            assert time.monotonic() < deadline
+            widget.run()
+            time.sleep(0.001)
+    return shown[-1], full
+
+
+@pytest.mark.parametrize("queries", [
+    ["(", "(555"],
+    ["+", "+555"],
+    ["5", "55", "555-1"],
+    ["(5", "(555) 9"],
+    ["555", "555a"],
+    ["an", "ann"],
+    ["e", "ev", "eve+5"],
+])
+def test_narrowed_results_match_a_full_search(manager, monkeypatch, queries):
+    results, _ = _typed(manager, queries, monkeypatch)
+    assert results == manager.search_contacts(queries[-1])
+
+
+def test_extending_a_text_query_narrows_the_last_results(manager, monkeypatch):
+    results, full = _typed(manager, ["a", "an", "ann"], monkeypatch)
+    assert [c.name for c in results] == ["Ann Lee", "Dana Ann"]
+    assert full == ["a"]
+
+
+def test_gaining_phone_digits_searches_again(manager, monkeypatch):
+    results, full = _typed(manager, ["(", "(555"], monkeypatch)
+    assert [c.name for c in results] == ["Ann Lee", "Bob Ray", "Cy Moss", "Dana Ann"]
+    assert full == ["(", "(555"]
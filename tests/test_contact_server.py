@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+from contact_book import ContactManager
+from contact_client import AsyncContactClient, ContactClient, ContactServiceError, _Calls
+from contact_server import ContactServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    manager = ContactManager(str(tmp_path / "contacts.json"))
+    manager.add_contact("Ann Lee", "555 0100")
+    return ContactServer(manager, str(tmp_path / "contacts.sock"))
+
+
+def _ask(server, request) -> dict:
+    line = request if isinstance(request, bytes) else json.dumps(request).encode()
+    return server.handle(line)
+
+
+def test_handle_answers_a_request(server):
+    reply = _ask(server, {"id": 7, "op": "get", "name": "ann lee"})
+    assert reply["id"] == 7 and reply["ok"]
+    assert reply["result"]["phone"] == "555 0100"
+
+
+@pytest.mark.parametrize("line, error", [
+    (b"{not json", "invalid JSON"),
+    (b"\xff\xfe", "invalid JSON"),
+    (b"[1, 2]", "request must be a JSON object"),
+    (b'{"id": 1}', "unknown op None"),
+    (b'{"id": 1, "op": "drop"}', "unknown op 'drop'"),
+    (b'{"id": 1, "op": []}', "unknown op []"),
+    (b'{"id": 1, "op": {"a": 1}}', "unknown op {'a': 1}"),
+    (b'{"id": 1, "op": "get", "name": 5}', "'name' must be a string"),
+    (b'{"id": 1, "op": "search", "query": "a", "limit": -1}', "'limit' must be a non-negative integer"),
+    (b'{"id": 1, "op": "delete", "name": "Bo"}', "Contact 'Bo' not found"),
+])
+def test_handle_rejects_bad_requests(server, line, error):
+    reply = _ask(server, line)
+    assert reply["ok"] is False
+    assert reply["error"] == error
+
+
+def test_handler_failures_are_not_reported_as_bad_json(server, monkeypatch):
+    def broken(*args):
+        raise ValueError("index out of step")
+
+    monkeypatch.setattr(server.manager, "find_contact_by_name", broken)
+    reply = _ask(server, {"id": 3, "op": "get", "name": "Ann Lee"})
+    assert reply == {"id": 3, "ok": False, "error": "internal error: ValueError: index out of step"}
+    # the server keeps answering
+    assert _ask(server, {"id": 4, "op": "ping"})["result"] == "pong"
+
+
+def test_calls_needs_a_call_method():
+    with pytest.raises(TypeError):
+        _Calls()
+
+
+async def _serving(server, talk):
+    serving = asyncio.ensure_future(server.serve())
+    try:
+        for _ in range(200):
+            if server._server is not None:
+                break
+            await asyncio.sleep(0.01)
+        return await talk()
+    finally:
+        serving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await serving
+
+
+def test_serve_replaces_a_stale_socket(server):
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(server.path)
+    stale.close()
+
+    async def talk():
+        client = await AsyncContactClient.connect(server.path)
+        try:
+            with pytest.raises(ContactServiceError):
+                await client.add("Ann Lee", "555 0101")
+            return await client.ping()
+        finally:
+            await client.close()
+
+    assert asyncio.run(_serving(server, talk)) == "pong"
+    assert not os.path.exists(server.path)
+
+
+def test_serve_refuses_a_socket_another_server_answers_on(server):
+    async def talk():
+        second = ContactServer(server.manager, server.path)
+        with pytest.raises(OSError, match="already listening"):
+            await second.serve()
+        # the first server's socket is left alone; the blocking client runs off the loop
+
+        def ping():
+            with ContactClient(server.path) as client:
+                return client.ping()
+
+        return await asyncio.get_running_loop().run_in_executor(None, ping)
+
+    assert asyncio.run(_serving(server, talk)) == "pong"
+
+
+def test_a_slow_search_does_not_hold_up_other_clients(server, monkeypatch):
+    release = threading.Event()
+    search = server.manager.search_contacts
+
+    def slow(query):
+        assert release.wait(5)
+        return search(query)
+
+    monkeypatch.setattr(server.manager, "search_contacts", slow)
+
+    async def talk():
+        searcher = await AsyncContactClient.connect(server.path)
+        other = await AsyncContactClient.connect(server.path)
+        try:
+            pending = asyncio.ensure_future(searcher.search("ann"))
+            assert await asyncio.wait_for(other.ping(), 2) == "pong"
+            assert await other.get("Ann Lee")
+            assert not pending.done()
+            release.set()
+            return await asyncio.wait_for(pending, 5)
+        finally:
+            release.set()
+            await searcher.close()
+            await other.close()
+
+    found = asyncio.run(_serving(server, talk))
+    assert [c["name"] for c in found["contacts"]] == ["Ann Lee"]
+
+
+def test_serve_refuses_a_path_that_is_not_a_socket(server):
+    with open(server.path, "w") as f:
+        f.write("notes")
+    with pytest.raises(OSError, match="not a socket"):
+        asyncio.run(server.serve())
+    assert os.path.exists(server.path)
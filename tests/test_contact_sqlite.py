@@ -0,0 +1,177 @@
+import io
+import random
+import sqlite3
+import threading
+
+import pytest
+
+from contact_book import ContactManager, SQLiteContactManager, migrate_json_to_sqlite
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "contacts.db")
+
+
+def _expected(rows, query):
+    query = query.lower()
+    return [r for r in rows if query in r[0].lower() or query in r[1] or query in r[2].lower()]
+
+
+def test_fts_is_built_for_rows_stored_without_it(db):
+    # a book written by a build whose SQLite had no trigram tokenizer
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE contacts (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE COLLATE NOCASE,"
+        " phone TEXT NOT NULL, email TEXT NOT NULL DEFAULT '', address TEXT NOT NULL DEFAULT '')"
+    )
+    conn.executemany(
+        "INSERT INTO contacts (name, phone, email, address) VALUES (?, ?, ?, '')",
+        [("Hannah Berg", "555 0100", "hannah@mail.com"), ("Dan Ortiz", "555 0101", "")],
+    )
+    conn.commit()
+    conn.close()
+
+    manager = SQLiteContactManager(db)
+    if not manager.has_fts:
+        pytest.skip("this SQLite has no trigram tokenizer")
+    assert [c.name for c in manager.search_contacts("annah")] == ["Hannah Berg"]
+    manager.add_contact("Annabel Ruiz", "555 0102")
+    assert [c.name for c in manager.search_contacts("ann")] == ["Hannah Berg", "Annabel Ruiz"]
+    # reopening does not index the rows a second time
+    manager.conn.close()
+    assert [c.name for c in SQLiteContactManager(db).search_contacts("annah")] == ["Hannah Berg"]
+
+
+def test_edits_len_page_and_search_agree(db):
+    rng = random.Random(2)
+    manager = SQLiteContactManager(db)
+    rows = []
+    for step in range(300):
+        if rng.random() < 0.6 or not rows:
+            row = (f"{rng.choice(['Ann', 'Dan', 'Hannah'])} {step}", f"+1 555 {step:04d}", f"p{step}@mail.com", "")
+            assert manager.add_contact(*row)
+            rows.append(row)
+        elif rng.random() < 0.5:
+            i = rng.randrange(len(rows))
+            row = (f"Renamed {step}", "555 9999", "", "x")
+            assert manager.update_contact(rows[i][0], *row)
+            rows[i] = row
+        else:
+            assert manager.delete_contact(rows.pop(rng.randrange(len(rows)))[0])
+    assert len(manager) == len(rows)
+    assert [c.fields() for c in manager.contacts] == rows
+    for start in range(0, len(rows) + 5, 9):
+        assert [c.fields() for c in manager.page(start, start + 6)] == rows[start:start + 6]
+    assert manager.page(5, 5) == []
+    for query in ("an", "ann", "555 01", "mail.co", "zzz", "%", "_"):
+        assert [c.fields() for c in manager.search_contacts(query)] == _expected(rows, query)
+    assert not manager.add_contact(rows[0][0].upper(), "555")
+
+
+def test_migration_copies_the_book_once(tmp_path, db):
+    source = str(tmp_path / "contacts.json")
+    manager = ContactManager(source, journal=True)
+    for i in range(20):
+        manager.add_contact(f"Person {i}", f"555 01{i:02d}")
+    assert migrate_json_to_sqlite(source, db) == 20
+    assert migrate_json_to_sqlite(source, db) == 0
+    assert [c.fields() for c in SQLiteContactManager(db).contacts] == [c.fields() for c in manager.contacts]
+
+
+def test_export_does_not_wait_for_the_lock(db):
+    manager = SQLiteContactManager(db)
+    manager.add_contact("Hannah Berg", "555 0100")
+    manager.add_contact("Dan Ortiz", "555 0101")
+    taken, release = threading.Event(), threading.Event()
+
+    def hold():
+        with manager.lock:
+            taken.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    taken.wait(5)
+    try:
+        stream = io.StringIO()
+        assert manager.export_contacts(stream) == 2
+        assert "Dan Ortiz" in stream.getvalue()
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_duplicates_agree_with_the_json_book(tmp_path, db):
+    book = ContactManager(str(tmp_path / "contacts.json"))
+    sqlite = SQLiteContactManager(db)
+    rows = [
+        ("Hannah Berg", "+1 (555) 010-2000", "hannah@mail.com"),
+        ("Hanna Berg", "5550102000", ""),
+        ("Jon Ortiz", "111", "jon@corp.com"),
+        ("Jno Ortiz", "222", "j.ortiz@corp.com"),
+        ("Dan Lee", "333", "dan@corp.com"),
+    ]
+    for manager in (book, sqlite):
+        for name, phone, email in rows:
+            manager.add_contact(name, phone, email)
+    expected = [["Hannah Berg", "Hanna Berg"], ["Jon Ortiz", "Jno Ortiz"]]
+    assert [[c.name for c in g] for g in book.find_duplicates()] == expected
+    assert [[c.name for c in g] for g in sqlite.find_duplicates()] == expected
+
+
+def test_fuzzy_search_finds_imported_contacts(db):
+    manager = SQLiteContactManager(db)
+    manager.add_contact("Jane Roe", "555 0100")
+    # the first fuzzy search builds the index, which the import must keep current
+    assert [c.name for c in manager.fuzzy_search_contacts("Jnae")] == ["Jane Roe"]
+    report = manager.import_contacts([
+        {"name": "John Doe", "phone": "555 0101"},
+        {"name": "jane roe", "phone": "555 0102"},
+        {"name": "Jonathan Jhonson", "phone": "555 0103"},
+    ])
+    assert (report.added, report.duplicates) == (2, 1)
+    assert [c.name for c in manager.fuzzy_search_contacts("John")] == ["John Doe"]
+    assert [c.name for c in manager.fuzzy_search_contacts("Jhonsen")] == ["Jonathan Jhonson"]
+
+
+def test_names_fold_case_like_the_json_book(tmp_path, db):
+    book = ContactManager(str(tmp_path / "contacts.json"))
+    sqlite = SQLiteContactManager(db)
+    for manager in (book, sqlite):
+        assert manager.add_contact("Émile Zola", "555 0100")
+        assert not manager.add_contact("émile zola", "555 0101")
+        assert manager.add_contact("Öz Ünal", "555 0102")
+        assert manager.update_contact("ÖZ ÜNAL", "Oz Unal", "555 0103")
+        assert not manager.update_contact("oz unal", "ÉMILE ZOLA", "555 0104")
+        report = manager.import_contacts([{"name": "ÉMILE ZOLA", "phone": "1"}, {"name": "Åsa", "phone": "2"}])
+        assert (report.added, report.duplicates) == (1, 1)
+    for name in ("ÉMILE ZOLA", "émile zola", "Oz Unal", "åSA", "Öz Ünal"):
+        found = [manager.find_contact_by_name(name) for manager in (book, sqlite)]
+        assert [c and c.fields() for c in found] == [found[0] and found[0].fields()] * 2, name
+    assert sqlite.delete_contact("ÅSA")
+    assert [c.name for c in sqlite.contacts] == ["Émile Zola", "Oz Unal"]
+
+
+def test_older_books_get_name_keys(db):
+    # names were unique under NOCASE, which folds ASCII only
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE contacts (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE COLLATE NOCASE,"
+        " phone TEXT NOT NULL, email TEXT NOT NULL DEFAULT '', address TEXT NOT NULL DEFAULT '')"
+    )
+    conn.executemany(
+        "INSERT INTO contacts (name, phone) VALUES (?, ?)",
+        [("Émile Zola", "555 0100"), ("Dan Ortiz", "555 0101"), ("émile zola", "555 0102")],
+    )
+    conn.commit()
+    conn.close()
+
+    manager = SQLiteContactManager(db)
+    assert manager.find_contact_by_name("ÉMILE ZOLA").phone == "555 0100"
+    assert manager.find_contact_by_name("DAN ORTIZ").phone == "555 0101"
+    assert not manager.add_contact("ÉMILE zola", "555 0103")
+    assert len(manager) == 3
+    manager.close()
+    # the column is added once
+    assert SQLiteContactManager(db).find_contact_by_name("dan ortiz").phone == "555 0101"
@@ -0,0 +1,301 @@
+import random
+
+import pytest
+
+from todo_store import HISTORY_LIMIT, STATES, TodoStore, _words, main
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TodoStore(tmp_path / "todo_state.json")
+
+
+def _check_indexes(store):
+    for state in STATES:
+        assert store.order[state] == sorted(i for i, item in store.items.items() if item["state"] == state)
+    postings = {}
+    for item in store.items.values():
+        for word in _words(item["text"]):
+            postings.setdefault(word, set()).add(item["id"])
+    assert store._postings == postings
+    assert store._vocab == sorted(postings)
+
+
+def test_order_and_words_follow_random_changes(store):
+    rng = random.Random(17)
+    words = ["milk", "mail", "call", "bank", "gym"]
+    for _ in range(600):
+        roll = rng.random()
+        if roll < 0.4 or not store.items:
+            store.add(" ".join(rng.sample(words, 2)), rng.choice(STATES))
+        elif roll < 0.7:
+            store.toggle(rng.choice(list(store.items)))
+        else:
+            store.delete(rng.choice(list(store.items)))
+    _check_indexes(store)
+    _check_indexes(TodoStore(store.path))
+
+
+def _state(store):
+    return (
+        {i: dict(item) for i, item in store.items.items()},
+        {s: list(ids) for s, ids in store.order.items()},
+        {w: set(ids) for w, ids in store._postings.items()},
+        list(store._vocab),
+        store.next_id,
+    )
+
+
+@pytest.mark.parametrize("record", [
+    {"op": "add", "id": 0, "text": 5, "state": "today"},
+    {"op": "add", "id": 0, "text": "new", "state": "someday"},
+    {"op": "add", "id": 0, "state": "today"},
+    {"op": "add", "id": 0, "text": "new", "state": "today", "due": "soon"},
+    {"op": "add", "id": "0", "text": "new", "state": "today"},
+    {"op": "toggle", "id": 0, "state": None},
+    {"op": "due", "id": 0},
+    {"op": "rename", "id": 0},
+    {"op": "delete"},
+    ["add", 0],
+])
+def test_bad_records_change_nothing(store, record):
+    store.add("buy milk", due=1000.0)
+    before = _state(store)
+    with pytest.raises(ValueError):
+        store._apply(record)
+    assert _state(store) == before
+
+
+def test_replay_skips_a_bad_record_and_keeps_the_rest(store, capsys):
+    store.add("buy milk")
+    with store.log_path.open("a") as f:
+        f.write('{"op": "add", "id": 1, "text": 5, "state": "today"}\n')
+        f.write('{"op": "add", "id": 2, "text": "gym", "state": "today"}\n')
+    size = store.log_path.stat().st_size
+    reloaded = TodoStore(store.path)
+    assert reloaded.ids("today") == [0, 2]
+    assert reloaded.matching("gym", "today") == [2]
+    _check_indexes(reloaded)
+    assert "line 2" in capsys.readouterr().err
+    # the log is left as it was
+    assert reloaded.log_path.stat().st_size == size
+
+
+def test_replay_cuts_only_a_torn_last_record(store):
+    store.add_many([("buy milk", "today"), ("gym", "today")])
+    intact = store.log_path.read_bytes()
+    with store.log_path.open("a") as f:
+        f.write('{"op": "delete", "id"')
+    reloaded = TodoStore(store.path)
+    assert reloaded.ids("today") == [0, 1]
+    _check_indexes(reloaded)
+    assert reloaded.log_path.read_bytes() == intact
+    reloaded.delete(0)
+    assert TodoStore(store.path).ids("today") == [1]
+
+
+def _failing_disk(store, monkeypatch):
+    def persist(records):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store, "_persist", persist)
+
+
+@pytest.mark.parametrize("change", [
+    lambda store: store.add("call bank", due=2000.0),
+    lambda store: store.add_many([("a", "today"), ("b", "completed")]),
+    lambda store: store.toggle(0),
+    lambda store: store.set_due(0, None),
+    lambda store: store.set_due(1, 3000.0),
+    lambda store: store.delete_many([0, 1]),
+])
+def test_a_failed_write_leaves_memory_as_it_was(store, monkeypatch, change):
+    store.add_many([("buy milk", "today", 1000.0), ("gym", "completed")])
+    before = _state(store)
+    history = (list(store.undo_stack), list(store.redo_stack))
+    _failing_disk(store, monkeypatch)
+    with pytest.raises(OSError):
+        change(store)
+    assert _state(store) == before
+    assert (list(store.undo_stack), list(store.redo_stack)) == history
+    assert store.due.next_due() == 1000.0
+
+
+def test_a_failed_undo_keeps_its_history(store, monkeypatch):
+    store.add("buy milk")
+    store.delete(0)
+    before = _state(store)
+    _failing_disk(store, monkeypatch)
+    with pytest.raises(OSError):
+        store.undo()
+    assert _state(store) == before
+    monkeypatch.undo()
+    assert store.undo() == [0]
+    assert store.get(0)["text"] == "buy milk"
+
+
+def _brute_force_matching(store, query, state):
+    wanted = _words(query)
+    return [
+        i for i in store.ids(state)
+        if all(any(word.startswith(w) for word in _words(store.items[i]["text"])) for w in wanted)
+    ]
+
+
+def test_matching_agrees_with_a_scan(store):
+    rng = random.Random(22)
+    vocabulary = ["milk", "mild", "mail", "call", "caller", "bank", "banking", "gym", "dentist", "café"]
+    # enough tasks that both the "most tasks match" and the sorting path are taken
+    store.add_many((" ".join(rng.sample(vocabulary, 3)), rng.choice(STATES)) for _ in range(400))
+    queries = ["mil", "m", "call", "ban gym", "b c", "caf", "dent milk", "zzz", "MILK", "mi mi", "--", "  "]
+    for _ in range(3):
+        for query in queries:
+            for state in STATES:
+                expected = store.ids(state) if not query.strip() else _brute_force_matching(store, query, state)
+                assert store.matching(query, state) == expected, (query, state)
+        # changes must not be hidden by the cached answer
+        for item_id in rng.sample(list(store.items), 40):
+            store.toggle(item_id)
+        store.delete_many(rng.sample(list(store.items), 40))
+        store.add("mild gym plan")
+
+
+def test_matching_cache_follows_changes(store):
+    store.add("buy milk")
+    assert store.matching("mil", "today") == [0]
+    store.add("mild salsa")
+    assert store.matching("mil", "today") == [0, 1]
+    store.toggle(0)
+    assert store.matching("mil", "today") == [1]
+    assert store.matching("mil", "completed") == [0]
+    store.delete(1)
+    assert store.matching("mil", "today") == []
+    assert store.matching("salsa", "today") == []
+
+
+def test_pop_due_reminds_of_each_task_once(store):
+    store.add_many([("late", "today", 100.0), ("later", "today", 200.0), ("done", "completed", 50.0)])
+    store.add("someday")
+    assert store.due.pop_due(150.0) == [0]
+    assert store.due.pop_due(150.0) == []
+    assert store.due.pop_due(250.0) == [1]
+    assert store.overdue() == [0, 1]
+    assert store.due.next_due() is None
+
+
+@pytest.mark.parametrize("edit", [
+    lambda store: store.delete(0),
+    lambda store: store.toggle(0),
+    lambda store: store.set_due(0, 500.0),
+    lambda store: store.set_due(0, None),
+])
+def test_undoing_an_edit_of_an_overdue_task_does_not_remind_again(store, edit):
+    store.add("late", due=100.0)
+    assert store.due.pop_due(150.0) == [0]
+    edit(store)
+    store.undo()
+    assert store.get(0)["notified"] and store.get(0)["due"] == 100.0
+    assert store.due.pop_due(1000.0) == []
+    assert store.overdue() == [0]
+    # and a heap built from scratch leaves it out too
+    store.due.reset()
+    assert store.due.pop_due(1000.0) == []
+
+
+def test_rescheduling_or_reopening_reminds_again(store):
+    store.add("late", due=100.0)
+    store.due.pop_due(150.0)
+    store.set_due(0, 300.0)
+    assert "notified" not in store.get(0)
+    assert store.due.pop_due(350.0) == [0]
+    store.toggle(0)
+    store.toggle(0)
+    assert store.due.pop_due(350.0) == [0]
+
+
+def test_redo_after_undo_keeps_the_flag_cleared(store):
+    store.add("late", due=100.0)
+    store.due.pop_due(150.0)
+    store.set_due(0, 300.0)
+    store.undo()
+    store.redo()
+    assert "notified" not in store.get(0)
+    assert store.due.pop_due(350.0) == [0]
+
+
+def _random_action(store, rng):
+    ids = list(store.items)
+    roll = rng.random()
+    if roll < 0.3 or not ids:
+        store.add_many((f"task {rng.randrange(50)} milk", rng.choice(STATES)) for _ in range(rng.randint(1, 3)))
+    elif roll < 0.5:
+        store.toggle_many(rng.sample(ids, min(len(ids), 2)))
+    elif roll < 0.7:
+        store.set_due(rng.choice(ids), rng.choice([None, float(rng.randrange(1000))]))
+    else:
+        store.delete_many(rng.sample(ids, min(len(ids), 2)))
+
+
+def test_undo_and_redo_walk_back_and_forth_through_every_state(store):
+    rng = random.Random(24)
+    states = [_state(store)]
+    for _ in range(60):
+        _random_action(store, rng)
+        states.append(_state(store))
+    # undoing an add does not hand its id out again, so next_id is left out
+    for expected in reversed(states[:-1]):
+        assert store.undo()
+        assert _state(store)[:4] == expected[:4]
+    assert store.undo() == []
+    for expected in states[1:]:
+        assert store.redo()
+        assert _state(store)[:4] == expected[:4]
+    assert store.redo() == []
+    _check_indexes(store)
+    # undo and redo are logged, so a reload ends where they left off
+    store.undo()
+    assert _state(TodoStore(store.path))[:4] == _state(store)[:4]
+
+
+def test_history_is_bounded(store):
+    store.add_many([("first", "today")])
+    for i in range(HISTORY_LIMIT + 20):
+        store.add(f"task {i}")
+    for _ in range(HISTORY_LIMIT):
+        assert store.undo()
+    # the oldest actions were forgotten
+    assert store.undo() == []
+    assert [store.items[i]["text"] for i in store.ids("today")] == ["first"] + [f"task {i}" for i in range(20)]
+    for _ in range(HISTORY_LIMIT):
+        assert store.redo()
+    assert store.redo() == []
+    assert store.count("today") == HISTORY_LIMIT + 21
+
+
+def test_a_new_action_drops_the_redo_history(store):
+    store.add("one")
+    store.add("two")
+    store.undo()
+    store.add("three")
+    assert store.redo() == []
+    assert [store.items[i]["text"] for i in store.ids("today")] == ["one", "three"]
+
+
+@pytest.mark.parametrize("bad, error", [
+    ("c,someday,", "line 4: unknown state 'someday'"),
+    ("c,today,tomorrowish", "line 4: "),
+])
+def test_cli_import_adds_nothing_when_a_row_is_bad(tmp_path, capsys, bad, error):
+    state_file = str(tmp_path / "todo_state.json")
+    tasks = tmp_path / "tasks.csv"
+    tasks.write_text(f"text,state,due\na,today,\nb,completed,\n{bad}\nd,today,\n")
+    with pytest.raises(SystemExit) as exited:
+        main(["--state-file", state_file, "import", str(tasks)])
+    assert exited.value.code == 1
+    assert error in capsys.readouterr().err
+    assert len(TodoStore(state_file).items) == 0
+    tasks.write_text("text,state,due\na,today,\nb,completed,\n")
+    main(["--state-file", state_file, "import", str(tasks)])
+    assert "Imported 2 tasks" in capsys.readouterr().out
+    reloaded = TodoStore(state_file)
+    assert (reloaded.ids("today"), reloaded.ids("completed")) == ([0], [1])
@@ -0,0 +1,312 @@
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# the packed image and its index, written next to the sources by ``build``
+ATLAS_IMAGE = "atlas.png"
+ATLAS_INDEX = "atlas.json"
+# images wider or taller than this are left out of the atlas and loaded on their own
+ATLAS_MAX_SIDE = 512
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+# ─── PNG ─────────────────────────────────────────────────────────
+
+def _paeth(a: int, b: int, c: int) -> int:
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def read_png(path: Path) -> Tuple[int, int, bytearray]:
+    """Decodes an 8-bit RGB or RGBA PNG; returns its width, height and RGBA rows.
+
+    Only ``build`` decodes in Python; the apps leave decoding to Tk.
+    """
+    data = path.read_bytes()
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError(f"{path} is not a PNG")
+    pos = len(PNG_SIGNATURE)
+    header = b""
+    compressed = []
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        if kind == b"IHDR":
+            header = body
+        elif kind == b"IDAT":
+            compressed.append(body)
+        elif kind == b"IEND":
+            break
+        pos += 12 + length
+    width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", header)
+    if depth != 8 or color not in (2, 6) or interlace:
+        raise ValueError(f"{path}: only non-interlaced 8-bit RGB and RGBA PNGs can be packed")
+    channels = 4 if color == 6 else 3
+    stride = width * channels
+    raw = zlib.decompress(b"".join(compressed))
+    pixels = bytearray()
+    previous = bytearray(stride)
+    for y in range(height):
+        start = y * (stride + 1)
+        kind = raw[start]
+        row = bytearray(raw[start + 1:start + 1 + stride])
+        for x in range(stride):
+            left = row[x - channels] if x >= channels else 0
+            if kind == 1:
+                row[x] = (row[x] + left) & 0xFF
+            elif kind == 2:
+                row[x] = (row[x] + previous[x]) & 0xFF
+            elif kind == 3:
+                row[x] = (row[x] + ((left + previous[x]) >> 1)) & 0xFF
+            elif kind == 4:
+                up_left = previous[x - channels] if x >= channels else 0
+                row[x] = (row[x] + _paeth(left, previous[x], up_left)) & 0xFF
+        previous = row
+        if channels == 3:
+            rgba = bytearray(width * 4)
+            rgba[0::4], rgba[1::4], rgba[2::4] = row[0::3], row[1::3], row[2::3]
+            rgba[3::4] = b"\xff" * width
+            row = rgba
+        pixels += row
+    return width, height, pixels
+
+
+def write_png(path: Path, width: int, height: int, pixels: bytes):
+    """Writes RGBA rows as a PNG."""
+    stride = width * 4
+    raw = b"".join(b"\x00" + pixels[y * stride:(y + 1) * stride] for y in range(height))
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    path.write_bytes(
+        PNG_SIGNATURE
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 9))
+        + chunk(b"IEND", b"")
+    )
+
+
+# ─── ATLAS ───────────────────────────────────────────────────────
+
+def _shelf_pack(sizes: Dict[str, Tuple[int, int]]) -> Tuple[int, int, Dict[str, Tuple[int, int]]]:
+    """Places rectangles on shelves, tallest first; returns the atlas size and each one's corner."""
+    area = sum(w * h for w, h in sizes.values())
+    width = max(max(w for w, _ in sizes.values()), int((area * 1.2) ** 0.5))
+    places = {}
+    x = y = shelf = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda kv: (-kv[1][1], kv[0])):
+        if x + w > width:
+            x, y, shelf = 0, y + shelf, 0
+        places[name] = (x, y)
+        x += w
+        shelf = max(shelf, h)
+    return width, y + shelf, places
+
+
+def build_atlas(folder: Path) -> Dict:
+    """Packs the PNGs in ``folder`` into one atlas image; returns the index it writes.
+
+    Images with identical pixels share a region, so the two list backgrounds
+    of the To-Do-List cost one.
+    """
+    folder = Path(folder)
+    images = {}
+    for path in sorted(folder.glob("*.png")):
+        if path.name == ATLAS_IMAGE:
+            continue
+        try:
+            width, height, pixels = read_png(path)
+        except ValueError as e:
+            print(f"skipped {e}", file=sys.stderr)
+            continue
+        if max(width, height) <= ATLAS_MAX_SIDE:
+            images[path.name] = (width, height, bytes(pixels), path.stat().st_size)
+    # one region per distinct image
+    regions: Dict[Tuple[int, int, bytes], str] = {}
+    for name, (width, height, pixels, _) in images.items():
+        regions.setdefault((width, height, pixels), name)
+    width, height, places = _shelf_pack({name: key[:2] for key, name in regions.items()})
+
+    sheet = bytearray(width * height * 4)
+    for (w, h, pixels), name in regions.items():
+        x, y = places[name]
+        for row in range(h):
+            start = ((y + row) * width + x) * 4
+            sheet[start:start + w * 4] = pixels[row * w * 4:(row + 1) * w * 4]
+    write_png(folder / ATLAS_IMAGE, width, height, sheet)
+
+    index = {"size": [width, height], "images": {}}
+    for name, (w, h, pixels, size) in images.items():
+        x, y = places[regions[(w, h, pixels)]]
+        # the source's byte size, so an edited source is noticed and loaded on its own
+        index["images"][name] = {"x": x, "y": y, "width": w, "height": h, "bytes": size}
+    (folder / ATLAS_INDEX).write_text(json.dumps(index, indent=1, sort_keys=True) + "\n")
+    return index
+
+
+# ─── LOADER ──────────────────────────────────────────────────────
+
+class AssetLoader:
+    """The images of one assets folder as PhotoImages, decoded on first use.
+
+    Images packed by ``build`` are cut from the atlas, which Tk decodes
+    once for all of them; anything else is read from its own file. Each
+    image is made once per Tk interpreter and reused by every window and
+    popup of it, so use ``shared`` rather than the constructor.
+    """
+
+    # (folder, Tk interpreter) -> its loader
+    _shared: Dict[Tuple[str, object], "AssetLoader"] = {}
+
+    def __init__(self, folder: Path, master):
+        self.folder = Path(folder)
+        self.master = master
+        self._images: Dict[str, object] = {}
+        self._atlas = None
+        self._index: Optional[Dict] = None
+        # (what, seconds) for every decode and cut, for report()
+        self.timings: List[Tuple[str, float]] = []
+
+    @classmethod
+    def shared(cls, folder: Path, master) -> "AssetLoader":
+        key = (str(Path(folder).resolve()), master.tk)
+        loader = cls._shared.get(key)
+        if loader is None:
+            loader = cls._shared[key] = cls(folder, master)
+        return loader
+
+    def _atlas_entry(self, name: str) -> Optional[Dict]:
+        if self._index is None:
+            try:
+                self._index = json.loads((self.folder / ATLAS_INDEX).read_text())["images"]
+            except (OSError, ValueError, KeyError):
+                self._index = {}
+        entry = self._index.get(name)
+        if entry is None:
+            return None
+        try:
+            if os.stat(self.folder / name).st_size != entry["bytes"]:
+                return None
+        except OSError:
+            # the source may be left out of a packaged app; the atlas still has it
+            pass
+        return entry
+
+    def image(self, name: str):
+        """The PhotoImage of ``name`` (a file in the folder), made on first use."""
+        image = self._images.get(name)
+        if image is not None:
+            return image
+        from tkinter import PhotoImage
+
+        start = time.perf_counter()
+        entry = self._atlas_entry(name)
+        if entry is None:
+            image = PhotoImage(master=self.master, file=self.folder / name)
+            what = f"decode {name}"
+        else:
+            if self._atlas is None:
+                self._atlas = PhotoImage(master=self.master, file=self.folder / ATLAS_IMAGE)
+                self.timings.append((f"decode {ATLAS_IMAGE}", time.perf_counter() - start))
+                start = time.perf_counter()
+            x, y = entry["x"], entry["y"]
+            image = PhotoImage(master=self.master, width=entry["width"], height=entry["height"])
+            image.tk.call(image, "copy", self._atlas,
+                          "-from", x, y, x + entry["width"], y + entry["height"])
+            what = f"cut {name}"
+        self.timings.append((what, time.perf_counter() - start))
+        self._images[name] = image
+        return image
+
+    def lazy(self, files: Dict[str, str]) -> "LazyImages":
+        """A dict of ``files``' keys to their images, each made when first looked up."""
+        return LazyImages(self, files)
+
+    def report(self, stream=sys.stderr):
+        total = 0.0
+        for what, seconds in self.timings:
+            total += seconds
+            print(f"{seconds * 1000:8.2f} ms  {what}", file=stream)
+        print(f"{total * 1000:8.2f} ms  {len(self._images)} images from {self.folder}", file=stream)
+
+
+class LazyImages(dict):
+    """Stands in for a dict of preloaded images; a missing key loads its file."""
+
+    def __init__(self, loader: AssetLoader, files: Dict[str, str]):
+        super().__init__()
+        self._loader = loader
+        self._files = files
+
+    def __missing__(self, key: str):
+        image = self[key] = self._loader.image(self._files[key])
+        return image
+
+
+def compare(folder: Path, repeat: int) -> Dict[str, float]:
+    """Times a cold load of every image in ``folder`` from separate files and from the atlas.
+
+    Opens a hidden Tk root, so it needs a display (run under xvfb-run without one).
+    """
+    import tkinter
+
+    with open(Path(folder) / ATLAS_INDEX) as f:
+        names = sorted(json.load(f)["images"])
+    root = tkinter.Tk()
+    root.withdraw()
+    best = {"files": float("inf"), "atlas": float("inf")}
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            images = [tkinter.PhotoImage(master=root, file=Path(folder) / name) for name in names]
+            best["files"] = min(best["files"], time.perf_counter() - start)
+            del images
+            loader = AssetLoader(folder, root)
+            start = time.perf_counter()
+            for name in names:
+                loader.image(name)
+            best["atlas"] = min(best["atlas"], time.perf_counter() - start)
+            del loader
+    finally:
+        root.destroy()
+    return best
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Pack the Tk apps' PNG assets into atlases and time loading them")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="write atlas.png and atlas.json into each folder")
+    build.add_argument("folders", nargs="+")
+    report = commands.add_parser("report", help="compare a cold load from separate files with the atlas")
+    report.add_argument("folders", nargs="+")
+    report.add_argument("--repeat", type=int, default=5, help="loads timed per folder; the best is reported")
+    args = parser.parse_args(argv)
+
+    for folder in args.folders:
+        if args.command == "build":
+            index = build_atlas(Path(folder))
+            width, height = index["size"]
+            print(f"{folder}: {len(index['images'])} images in a {width}x{height} atlas")
+        else:
+            try:
+                best = compare(Path(folder), args.repeat)
+            except Exception as e:  # no display: run under xvfb-run
+                parser.exit(1, f"Error: {e}\n")
+            saving = best["files"] - best["atlas"]
+            print(f"{folder}: files {best['files'] * 1000:.2f} ms, atlas {best['atlas'] * 1000:.2f} ms "
+                  f"(saves {saving * 1000:.2f} ms, {saving / best['files']:.0%})")
+
+
+if __name__ == "__main__":
+    main()